@@ -1,58 +1,613 @@
-from flask import Flask, jsonify
-import pandas as pd
-from flask_cors import CORS
-import math
-
-app = Flask(__name__)
-CORS(app)  # Enable CORS for frontend requests
-
-# Function to replace NaN with null
-def replace_nan_with_null(obj):
-    """
-    Recursively replace NaN values with null in a dictionary or list.
-    """
-    if isinstance(obj, float) and math.isnan(obj):
-        return None
-    elif isinstance(obj, dict):
-        return {key: replace_nan_with_null(value) for key, value in obj.items()}
-    elif isinstance(obj, list):
-        return [replace_nan_with_null(item) for item in obj]
-    return obj
-
-# Load trading signals
-def load_signals():
-    try:
-        df = pd.read_csv("scripts/data/trading_signals.csv")
-        # Replace NaN values with null
-        sanitized_data = replace_nan_with_null(df.to_dict(orient="records"))
-        return sanitized_data
-    except Exception as e:
-        return {"error": str(e)}
-
-@app.route("/api/trade-signals", methods=["GET"])
-def get_trade_signals():
-    """API to fetch latest trading signals."""
-    signals = load_signals()
-    return jsonify(signals)
-
-@app.route("/api/backtest-results", methods=["GET"])
-def get_backtest_results():
-    """API to fetch latest backtesting results."""
-    try:
-        df = pd.read_csv("scripts/data/backtest_results.csv")
-        # Replace NaN values with null
-        sanitized_data = replace_nan_with_null(df.to_dict(orient="records"))
-        return jsonify(sanitized_data)
-    except Exception as e:
-        return jsonify({"error": str(e)})
-
-@app.route("/")
-def home():
-    return "Flask app is running!"
-
-if __name__ == "__main__":
-    app.run(debug=True, port=5000)
-
-
-# http://localhost:5000/api/trade-signals
-# http://localhost:5000/api/backtest-results
\ No newline at end of file
+from flask import Flask, Response, jsonify, request
+import pandas as pd
+from flask_cors import CORS
+from collections import deque
+import hashlib
+import io
+import os
+import queue
+import threading
+import time
+import uuid
+import numpy as np
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+app = Flask(__name__)
+CORS(app)  # Enable CORS for frontend requests
+
+# Data files, from the environment if set; relative paths are taken from
+# this directory rather than the working directory
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SIGNALS_FILE = os.path.join(BASE_DIR, os.getenv("SIGNALS_FILE", "scripts/data/trading_signals.csv"))
+BACKTEST_RESULTS_FILE = os.path.join(BASE_DIR, os.getenv("BACKTEST_RESULTS_FILE", "scripts/data/backtest_results.csv"))
+
+# Values derived from data files, keyed by (kind, path): ((mtime_ns, size), value)
+_file_cache = {}
+_file_cache_lock = threading.Lock()
+
+def cached_for_file(path, kind, build):
+    """
+    Return build(path), reusing the last result until the file's mtime or size changes.
+    """
+    stat = os.stat(path)
+    version = (stat.st_mtime_ns, stat.st_size)
+    key = (kind, path)
+    cached = _file_cache.get(key)
+    if cached and cached[0] == version:
+        return cached[1]
+
+    with _file_cache_lock:
+        # Another request may have refreshed the entry while we waited
+        cached = _file_cache.get(key)
+        if cached and cached[0] == version:
+            return cached[1]
+        value = build(path)
+        _file_cache[key] = (version, value)
+        return value
+
+def _json_default(value):
+    """Encode the values orjson has no native type for (pandas/NumPy scalars)."""
+    if value is pd.NaT or value is pd.NA:
+        return None
+    if isinstance(value, (pd.Timestamp, pd.Timedelta)):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+def dump_json(value):
+    """JSON bytes of a plain value (dicts, lists, scalars) with orjson, else Flask's encoder."""
+    if HAS_ORJSON:
+        return orjson.dumps(value, default=_json_default)
+    return app.json.dumps(value).encode("utf-8")
+
+def _column_values(series):
+    """
+    A column as a list of JSON-ready values. Datetimes become ISO 8601
+    strings (UTC with "Z" when tz-aware) at the coarsest of s/ms/us/ns that
+    keeps every value exact; NaT becomes None.
+    """
+    if not pd.api.types.is_datetime64_any_dtype(series.dtype):
+        return series.tolist()
+    aware = series.dt.tz is not None
+    if aware:
+        series = series.dt.tz_convert("UTC").dt.tz_localize(None)
+    values = series.to_numpy(dtype="datetime64[ns]")
+    ns = values[~np.isnat(values)].view(np.int64)
+    unit = next((unit for unit, step in (("s", 10**9), ("ms", 10**6), ("us", 10**3)) if not (ns % step).any()), "ns")
+    text = np.datetime_as_string(values, unit=unit, timezone="UTC" if aware else "naive")
+    return [None if value == "NaT" else value for value in text.tolist()]
+
+def serialize_records(df):
+    """
+    Serialize a DataFrame as a JSON array of records: NaN (and inf) as null,
+    datetimes as ISO 8601 strings.
+
+    Each column becomes a Python list in one C call and orjson encodes the
+    records in one pass, so no value is visited in Python. Without orjson,
+    DataFrame.to_json does the same (floats rounded to 15 decimals).
+    """
+    if not HAS_ORJSON:
+        return df.to_json(orient="records", date_format="iso", double_precision=15).encode("utf-8")
+    columns = [str(column) for column in df.columns]
+    values = [_column_values(df.iloc[:, position]) for position in range(df.shape[1])]
+    return orjson.dumps([dict(zip(columns, row)) for row in zip(*values)], default=_json_default)
+
+def _build_payload(path):
+    body = serialize_records(pd.read_csv(path))
+    return body, hashlib.sha1(body).hexdigest()
+
+def load_cached_payload(path):
+    """
+    Return (body, etag) for a CSV file served as a JSON array of records.
+
+    The parsed and serialized body is cached until the file changes, so
+    polling clients don't re-read unchanged files.
+    """
+    return cached_for_file(path, "payload", _build_payload)
+
+def cached_json_response(path):
+    """Serve a cached CSV payload with an ETag, answering If-None-Match with 304."""
+    try:
+        body, etag = load_cached_payload(path)
+    except Exception as e:
+        return jsonify({"error": str(e)})
+    response = Response(body, mimetype="application/json")
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
+class StaleCursorError(ValueError):
+    """A cursor's row is no longer in the file (it was rewritten): start over from since."""
+
+class TimestampIndex:
+    """
+    Rows of a CSV sorted by (timestamp, file row), with the sort keys kept
+    as NumPy arrays so range and cursor lookups are binary searches.
+
+    A cursor is "<timestamp ns>:<file row>:<row hash>". File row numbers
+    only stay valid while the file is appended to (delta runs); when it is
+    rewritten (a full generate_signals run) the row a cursor points at may
+    now hold another post, so the hash of the row's content is checked and
+    a cursor whose row changed is rejected as stale instead of skipping or
+    repeating rows.
+    """
+
+    def __init__(self, df, timestamp_column="timestamp"):
+        times = pd.to_datetime(df[timestamp_column]).to_numpy(dtype="datetime64[ns]").view(np.int64)
+        rows = np.arange(len(df))
+        order = np.lexsort((rows, times))
+        # Per file row: timestamp and content hash, to validate cursors
+        self.row_times = times
+        self.row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy() & 0xFFFFFFFF
+        self.df = df.iloc[order].reset_index(drop=True)
+        self.times = times[order]
+        self.rows = rows[order]
+
+    @classmethod
+    def from_csv(cls, path):
+        return cls(pd.read_csv(path))
+
+    def lower_bound(self, timestamp_ns):
+        """Position of the first row at or after `timestamp_ns`."""
+        return int(np.searchsorted(self.times, timestamp_ns, side="left"))
+
+    def upper_bound(self, timestamp_ns):
+        """Position just past the last row at or before `timestamp_ns`."""
+        return int(np.searchsorted(self.times, timestamp_ns, side="right"))
+
+    def after_cursor(self, cursor):
+        """Position of the first row strictly after the row a cursor points at."""
+        timestamp_ns, row, row_hash = cursor
+        if row >= len(self.row_times) or self.row_times[row] != timestamp_ns or self.row_hashes[row] != row_hash:
+            raise StaleCursorError("Cursor is stale: the signals file was rewritten. Query again without it.")
+        lo = self.lower_bound(timestamp_ns)
+        hi = self.upper_bound(timestamp_ns)
+        return lo + int(np.searchsorted(self.rows[lo:hi], row, side="right"))
+
+    def cursor_at(self, position):
+        row = self.rows[position]
+        return f"{self.times[position]}:{row}:{self.row_hashes[row]:08x}"
+
+def parse_cursor(value):
+    timestamp_ns, row, row_hash = value.split(":")
+    return int(timestamp_ns), int(row), int(row_hash, 16)
+
+def parse_timestamp(value):
+    return pd.Timestamp(value).to_datetime64().astype("datetime64[ns]").view(np.int64)
+
+def query_signals(path, args):
+    """
+    Filter, page and project trade signals using the cached timestamp index.
+
+    Query parameters:
+        since / until: inclusive timestamp bounds (any format pandas parses)
+        cursor: `next_cursor` from a previous page; returns the rows after it
+            (StaleCursorError once the file was rewritten, see TimestampIndex)
+        limit: maximum number of rows to return
+        fields: comma-separated columns to include
+
+    Returns:
+        Dict with the selected `signals` (DataFrame), the `next_cursor` (the
+        last row returned, or the position the page started at when it is
+        empty, so a caught-up client can keep polling for new rows; None
+        only when no row precedes that position) and `has_more` (rows in
+        range remain after this page)
+    """
+    index = cached_for_file(path, "timestamp_index", TimestampIndex.from_csv)
+
+    start, stop = 0, len(index.times)
+    if args.get("since"):
+        start = index.lower_bound(parse_timestamp(args["since"]))
+    if args.get("until"):
+        stop = index.upper_bound(parse_timestamp(args["until"]))
+    if args.get("cursor"):
+        start = max(start, index.after_cursor(parse_cursor(args["cursor"])))
+
+    end = stop
+    if args.get("limit"):
+        limit = int(args["limit"])
+        if limit < 1:
+            raise ValueError("limit must be a positive integer")
+        end = min(stop, start + limit)
+    end = max(start, end)
+
+    columns = list(index.df.columns)
+    if args.get("fields"):
+        columns = [field.strip() for field in args["fields"].split(",") if field.strip()]
+        unknown = [field for field in columns if field not in index.df.columns]
+        if unknown:
+            raise ValueError(f"Unknown fields: {unknown}")
+
+    if end > start:
+        next_cursor = index.cursor_at(end - 1)
+    elif start > 0:
+        next_cursor = index.cursor_at(start - 1)
+    else:
+        next_cursor = args.get("cursor") or None
+    return {
+        "signals": index.df.iloc[start:end][columns],
+        "next_cursor": next_cursor,
+        "has_more": end < stop,
+    }
+
+@app.route("/api/trade-signals", methods=["GET"])
+def get_trade_signals():
+    """
+    API to fetch latest trading signals.
+
+    Without query parameters the whole file is returned as a JSON array.
+    With since/until/cursor/limit/fields (see query_signals) the response is
+    {"signals": [...], "next_cursor": ..., "has_more": ...}.
+    """
+    if not any(request.args.get(name) for name in ("since", "until", "cursor", "limit", "fields")):
+        return cached_json_response(SIGNALS_FILE)
+    try:
+        page = query_signals(SIGNALS_FILE, request.args)
+        body = b'{"signals":' + serialize_records(page["signals"]) + \
+            b',"next_cursor":' + dump_json(page["next_cursor"]) + \
+            b',"has_more":' + dump_json(page["has_more"]) + b"}"
+        return Response(body, mimetype="application/json")
+    except StaleCursorError as e:
+        return jsonify({"error": str(e), "stale_cursor": True}), 409
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)})
+
+@app.route("/api/backtest-results", methods=["GET"])
+def get_backtest_results():
+    """API to fetch latest backtesting results."""
+    return cached_json_response(BACKTEST_RESULTS_FILE)
+
+# Push stream (/api/stream): seconds between checks of the data files
+STREAM_POLL_INTERVAL = float(os.getenv("STREAM_POLL_INTERVAL", "1.0"))
+# Seconds between keep-alive comments on an idle stream
+STREAM_HEARTBEAT = 15
+# Events kept for clients reconnecting with Last-Event-ID
+STREAM_REPLAY = 256
+# Events a slow client may fall behind before it is told to reset
+STREAM_QUEUE_SIZE = 1024
+# Open streams per process. Under gunicorn's gthread workers each stream
+# holds one of the worker's WEB_THREADS threads for as long as it is open,
+# so two are left for the other endpoints; streams past the cap get a 503
+STREAM_MAX_CLIENTS = int(os.getenv("STREAM_MAX_CLIENTS", max(int(os.getenv("WEB_THREADS", "16")) - 2, 1)))
+
+def format_event(event, data, event_id=None):
+    """Encode one server-sent event; `data` is JSON bytes (newlines split into data lines)."""
+    head = f"id: {event_id}\n".encode() if event_id is not None else b""
+    return head + f"event: {event}\n".encode() + b"data: " + data.replace(b"\n", b"\ndata: ") + b"\n\n"
+
+class HubFullError(RuntimeError):
+    """Raised when a stream would take the hub past its subscriber limit."""
+
+class Subscriber:
+    def __init__(self, topics, queue_size):
+        self.topics = topics
+        self.queue = queue.Queue(queue_size)
+
+class EventHub:
+    """
+    Fan-out of server-sent events to every connected client.
+
+    Each event is serialized once and the same bytes are queued for every
+    subscriber of its topic. A client whose queue fills up has it replaced
+    by a single reset event (the client refetches and the stream goes on),
+    so one stalled client never blocks the others.
+    The last events are kept so a reconnecting client resumes from its
+    Last-Event-ID; ids carry a per-process epoch, so ids from another
+    process (or before a restart) get a reset instead.
+    At most `max_subscribers` are connected at once (None: no limit).
+    """
+
+    def __init__(self, replay=STREAM_REPLAY, queue_size=STREAM_QUEUE_SIZE, max_subscribers=None):
+        self.epoch = uuid.uuid4().hex[:8]
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._history = deque(maxlen=replay)
+        self._next_id = 1
+
+    def publish(self, topic, event, data):
+        """Send `data` (JSON bytes, or anything app.json can dump) as `event` to `topic` subscribers."""
+        if not isinstance(data, bytes):
+            data = dump_json(data)
+        with self._lock:
+            event_id = self._next_id
+            self._next_id += 1
+            message = format_event(event, data, f"{self.epoch}-{event_id}")
+            self._history.append((event_id, topic, message))
+            for subscriber in self._subscribers:
+                if topic in subscriber.topics:
+                    self._deliver(subscriber, message)
+
+    def _deliver(self, subscriber, message):
+        try:
+            subscriber.queue.put_nowait(message)
+        except queue.Full:
+            # Too far behind: drop what is queued and have the client refetch
+            while not subscriber.queue.empty():
+                subscriber.queue.get_nowait()
+            subscriber.queue.put_nowait(self._reset_event())
+
+    def _reset_event(self):
+        # Carries the latest id, so a reconnect after refetching resumes from here
+        return format_event("reset", b"{}", f"{self.epoch}-{self._next_id - 1}")
+
+    def subscribe(self, topics, last_event_id=None):
+        """
+        Register a subscriber; returns it with the events it missed since
+        `last_event_id` (or a reset when they are no longer kept).
+        Raises HubFullError when max_subscribers are already connected.
+        """
+        subscriber = Subscriber(set(topics), self.queue_size)
+        with self._lock:
+            if self.max_subscribers is not None and len(self._subscribers) >= self.max_subscribers:
+                raise HubFullError(f"Stream limit reached ({self.max_subscribers} open streams)")
+            backlog = []
+            if last_event_id:
+                epoch, _, seen = last_event_id.partition("-")
+                seen = int(seen) if seen.isdigit() else -1
+                oldest = self._history[0][0] if self._history else self._next_id
+                if epoch != self.epoch or seen < oldest - 1 or seen >= self._next_id:
+                    backlog = [self._reset_event()]
+                else:
+                    backlog = [message for event_id, topic, message in self._history
+                               if event_id > seen and topic in subscriber.topics]
+            self._subscribers.add(subscriber)
+        return subscriber, backlog
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+event_hub = EventHub(max_subscribers=STREAM_MAX_CLIENTS)
+
+def publish_event(topic, event, data):
+    """In-process publish hook: push an event to /api/stream clients of `topic`."""
+    event_hub.publish(topic, event, data)
+
+class CsvTail:
+    """
+    Complete rows appended to a CSV since the last read.
+
+    The first read only finds the end of the file. A file that shrank, or
+    whose bytes before the read position changed (rewritten rather than
+    appended to), is reported as rewritten and followed from its new end.
+    A partly written last line is left for the next read.
+    """
+
+    MARK_BYTES = 64
+
+    def __init__(self, path):
+        self.path = path
+        self.offset = None
+        self.header = b""
+        self.mark = b""
+        self.mtime = None
+
+    def _seek_end(self, f, size):
+        f.seek(0)
+        self.header = f.readline()
+        f.seek(max(size - 65536, 0))
+        tail = f.read()
+        self.offset = size - len(tail) + tail.rfind(b"\n") + 1
+        self._read_mark(f)
+
+    def _read_mark(self, f):
+        f.seek(max(self.offset - self.MARK_BYTES, 0))
+        self.mark = f.read(min(self.offset, self.MARK_BYTES))
+
+    def read_new(self):
+        """
+        Returns:
+            Tuple of (DataFrame of new rows or None, rewritten flag)
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None, False
+        if self.offset is not None and stat.st_size == self.offset and stat.st_mtime_ns == self.mtime:
+            return None, False
+        self.mtime = stat.st_mtime_ns
+        with open(self.path, "rb") as f:
+            if self.offset is None:
+                self._seek_end(f, stat.st_size)
+                return None, False
+            f.seek(max(self.offset - len(self.mark), 0))
+            if stat.st_size < self.offset or f.read(len(self.mark)) != self.mark:
+                self._seek_end(f, stat.st_size)
+                return None, True
+            chunk = f.read(stat.st_size - self.offset)
+            end = chunk.rfind(b"\n") + 1
+            if not end:
+                return None, False
+            self.offset += end
+            self._read_mark(f)
+        return pd.read_csv(io.BytesIO(self.header + chunk[:end])), False
+
+class FileWatcher:
+    """
+    One background thread per process that polls the data files and
+    publishes what changed, so any number of clients share one reader.
+
+    New signal rows are sent as "signals" events (a rewritten file as
+    "signals_reset"); a changed backtest results file is sent whole as a
+    "backtest" event, from the same cache the REST endpoint serves.
+    """
+
+    def __init__(self, hub, interval=STREAM_POLL_INTERVAL):
+        self.hub = hub
+        self.interval = interval
+        self._thread = None
+        self._lock = threading.Lock()
+        self._signals = None
+        self._backtest_version = None
+        self._polled = False
+
+    def start(self):
+        """Start the thread if it isn't running (it runs until the process exits)."""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self.poll()
+                self._thread = threading.Thread(target=self._run, name="stream-file-watcher", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.poll()
+            except Exception as e:
+                app.logger.warning(f"⚠️ Stream file watcher: {e}")
+
+    def poll(self):
+        """Check the data files once and publish their changes."""
+        if self._signals is None or self._signals.path != SIGNALS_FILE:
+            self._signals = CsvTail(SIGNALS_FILE)
+        rows, rewritten = self._signals.read_new()
+        if rewritten:
+            self.hub.publish("signals", "signals_reset", {})
+        elif rows is not None and len(rows):
+            self.hub.publish("signals", "signals", b'{"signals":' + serialize_records(rows) + b"}")
+
+        try:
+            stat = os.stat(BACKTEST_RESULTS_FILE)
+            version = (BACKTEST_RESULTS_FILE, stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            version = None
+        if self._polled and version is not None and version != self._backtest_version:
+            body, _ = load_cached_payload(BACKTEST_RESULTS_FILE)
+            self.hub.publish("backtest", "backtest", body)
+        self._backtest_version = version
+        self._polled = True
+
+file_watcher = FileWatcher(event_hub)
+
+STREAM_TOPICS = ("signals", "backtest")
+
+@app.route("/api/stream", methods=["GET"])
+def stream_events():
+    """
+    Server-sent events pushing data as it is written, instead of polling.
+
+    Query parameters:
+        topics: comma-separated subset of "signals,backtest" (default: both)
+
+    Events:
+        signals: {"signals": [...]} rows appended to the signals file
+        signals_reset: the signals file was rewritten; refetch /api/trade-signals
+        backtest: new backtest results, as /api/backtest-results returns them
+        reset: events were missed; refetch both endpoints
+
+    Answers 503 (with Retry-After) once STREAM_MAX_CLIENTS streams are open
+    in this process, so streams can't take every worker thread.
+    """
+    topics = [topic.strip() for topic in request.args.get("topics", ",".join(STREAM_TOPICS)).split(",") if topic.strip()]
+    unknown = [topic for topic in topics if topic not in STREAM_TOPICS]
+    if unknown:
+        return jsonify({"error": f"Unknown topics: {unknown}"}), 400
+    file_watcher.start()
+    try:
+        subscriber, backlog = event_hub.subscribe(topics, request.headers.get("Last-Event-ID"))
+    except HubFullError as e:
+        response = jsonify({"error": str(e)})
+        response.headers["Retry-After"] = "30"
+        return response, 503
+
+    def generate():
+        try:
+            yield b"retry: 3000\n\n"
+            for message in backlog:
+                yield message
+            while True:
+                try:
+                    message = subscriber.queue.get(timeout=STREAM_HEARTBEAT)
+                except queue.Empty:
+                    yield b": keep-alive\n\n"
+                    continue
+                yield message
+        finally:
+            event_hub.unsubscribe(subscriber)
+
+    response = Response(generate(), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"  # don't let proxies buffer the stream
+    return response
+
+def data_status():
+    """
+    Load (or reuse) every cached view of the data files.
+
+    Returns:
+        Dict of file -> {"path", "ready", "error"}
+    """
+    loaders = {
+        "trade_signals": (SIGNALS_FILE, [
+            load_cached_payload,
+            lambda path: cached_for_file(path, "timestamp_index", TimestampIndex.from_csv),
+        ]),
+        "backtest_results": (BACKTEST_RESULTS_FILE, [load_cached_payload]),
+    }
+    status = {}
+    for name, (path, builds) in loaders.items():
+        try:
+            for build in builds:
+                build(path)
+            status[name] = {"path": path, "ready": True, "error": None}
+        except Exception as e:
+            status[name] = {"path": path, "ready": False, "error": str(e)}
+    return status
+
+def preload_data():
+    """
+    Parse and serialize the data files up front, so the first requests
+    don't pay for it. Under gunicorn (gunicorn.conf.py) this runs once in
+    the master and the forked workers share the caches copy-on-write.
+    """
+    for name, status in data_status().items():
+        if status["ready"]:
+            app.logger.info(f"✅ Preloaded {name} from {status['path']}")
+        else:
+            app.logger.warning(f"⚠️ Could not preload {name}: {status['error']}")
+
+@app.route("/healthz", methods=["GET"])
+def healthz():
+    """Liveness: the process is up and answering."""
+    return jsonify({"status": "ok"})
+
+@app.route("/readyz", methods=["GET"])
+def readyz():
+    """Readiness: every data file is loaded and servable (503 with the errors otherwise)."""
+    status = data_status()
+    ready = all(file["ready"] for file in status.values())
+    return jsonify({"ready": ready, "files": status}), 200 if ready else 503
+
+@app.route("/")
+def home():
+    return "Flask app is running!"
+
+if __name__ == "__main__":
+    # Development server. In production run gunicorn from this directory:
+    #   gunicorn -c gunicorn.conf.py app:app
+    app.run(
+        debug=os.getenv("FLASK_DEBUG") == "1",
+        host=os.getenv("WEB_HOST", "127.0.0.1"),
+        port=int(os.getenv("WEB_PORT", "5000")),
+        threaded=True
+    )
+
+
+# http://localhost:5000/api/trade-signals
+# http://localhost:5000/api/backtest-results
+# http://localhost:5000/api/stream
+# http://localhost:5000/readyz
\ No newline at end of file
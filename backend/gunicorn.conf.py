@@ -0,0 +1,33 @@
+import gc
+import multiprocessing
+import os
+
+# Production server for the API, run from backend/:
+#   gunicorn -c gunicorn.conf.py app:app
+# Settings come from the environment (see app.py for the data file paths).
+
+bind = os.getenv("WEB_BIND", "0.0.0.0:5000")
+workers = int(os.getenv("WEB_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+# Threaded workers: every open /api/stream connection holds one thread, so
+# app.py caps streams per worker at STREAM_MAX_CLIENTS (default WEB_THREADS - 2)
+# and answers 503 past it, leaving threads for the other endpoints
+worker_class = "gthread"
+threads = int(os.getenv("WEB_THREADS", "16"))
+timeout = int(os.getenv("WEB_TIMEOUT", "60"))
+keepalive = 5
+accesslog = os.getenv("WEB_ACCESS_LOG")  # "-" for stdout
+
+# Import the app once in the master so the workers fork with it loaded
+preload_app = True
+
+
+def when_ready(server):
+    """Load the datasets in the master before any worker is forked."""
+    import app
+
+    app.preload_data()
+    # Move everything loaded so far out of the garbage collector's reach:
+    # collections in the workers would otherwise write to (and so copy)
+    # every page holding the shared objects
+    gc.freeze()
+    server.log.info(f"Preloaded data; {gc.get_freeze_count()} objects frozen for copy-on-write sharing")
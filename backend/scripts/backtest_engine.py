@@ -0,0 +1,209 @@
+import numpy as np
+from typing import Tuple
+
+# Trade action codes emitted by the event loop
+BUY, SELL, STOP_LOSS, TAKE_PROFIT = 0, 1, 2, 3
+ACTION_NAMES = {BUY: "BUY", SELL: "SELL", STOP_LOSS: "STOP_LOSS", TAKE_PROFIT: "TAKE_PROFIT"}
+
+# Scan size used when looking ahead for the exit of an open position
+_MIN_CHUNK = 64
+_MAX_CHUNK = 65536
+
+
+def build_signal_masks(
+    close: np.ndarray,
+    signal: np.ndarray,
+    confidence: np.ndarray,
+    sma: np.ndarray,
+    rsi: np.ndarray,
+    upper_band: np.ndarray,
+    min_confidence: float = 0.6,
+    warmup: int = 0
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Precompute boolean entry/exit masks for every bar.
+
+    NaN indicators compare as False, exactly like the row-wise checks did.
+    Bars before `warmup` are never tradable.
+
+    Returns:
+        Tuple of (entry_mask, exit_mask)
+    """
+    confident = confidence >= min_confidence
+    entry_mask = (
+        (signal == "BUY") &
+        confident &
+        (close > sma) &
+        (rsi < 70) &
+        (close < upper_band)
+    )
+    exit_mask = (signal == "SELL") & (
+        confident |
+        (close < sma) |
+        (rsi > 70) |
+        (close > upper_band)
+    )
+    entry_mask[:warmup] = False
+    exit_mask[:warmup] = False
+    return entry_mask, exit_mask
+
+
+def run_event_loop(
+    close: np.ndarray,
+    entry_mask: np.ndarray,
+    exit_mask: np.ndarray,
+    initial_balance: float = 1000,
+    stop_loss_pct: float = 0.05,
+    take_profit_pct: float = 0.1
+) -> Tuple[float, np.ndarray, np.ndarray]:
+    """
+    Run the stop-loss / take-profit / signal state machine over price arrays.
+
+    While flat the loop jumps straight to the next entry bar; while holding it
+    scans ahead in vectorized chunks for the first stop, target or exit bar.
+    A position still open on the last bar is closed there with a SELL.
+
+    Returns:
+        Tuple of (final_balance, trade_bar_indices, trade_action_codes)
+    """
+    balance, trade_idx, trade_codes, _, _ = simulate_positions(
+        close, entry_mask, exit_mask, initial_balance, stop_loss_pct, take_profit_pct
+    )
+    return balance, trade_idx, trade_codes
+
+
+def simulate_positions(
+    close: np.ndarray,
+    entry_mask: np.ndarray,
+    exit_mask: np.ndarray,
+    initial_balance: float = 1000,
+    stop_loss_pct: float = 0.05,
+    take_profit_pct: float = 0.1,
+    position_size: float = 1.0,
+    fee_rate: float = 0.0,
+    slippage: float = 0.0
+) -> Tuple[float, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    run_event_loop with position sizing and trading costs.
+
+    Each entry invests `position_size` of the current balance. Fills are
+    `slippage` worse than the close (buys above, sells below) and pay
+    `fee_rate` of their notional. Stops and targets are still measured on
+    closes, as in run_event_loop, which this reduces to with the defaults.
+
+    Returns:
+        Tuple of (final_balance, trade_bar_indices, trade_action_codes,
+        units_held_after_each_trade, cash_after_each_trade)
+    """
+    close = np.asarray(close, dtype=float)
+    n = len(close)
+    entries = np.flatnonzero(entry_mask)
+
+    balance = initial_balance
+    holdings = 0.0
+    cash = initial_balance
+    trade_idx = []
+    trade_codes = []
+    trade_units = []
+    trade_cash = []
+    i = 0
+
+    while i < n:
+        # Flat: jump to the next bar where the entry conditions hold
+        if not balance > 0:
+            break
+        k = np.searchsorted(entries, i)
+        if k == len(entries):
+            break
+        i = int(entries[k])
+        entry_price = close[i]
+        invested = balance * position_size
+        cash = balance - invested
+        holdings = invested * (1 - fee_rate) / (entry_price * (1 + slippage))
+        balance = 0
+        trade_idx.append(i)
+        trade_codes.append(BUY)
+        trade_units.append(holdings)
+        trade_cash.append(cash)
+        if not holdings > 0:
+            break
+
+        # Holding: find the first bar that stops out, takes profit or exits
+        start = i + 1
+        chunk = _MIN_CHUNK
+        exit_bar = -1
+        while start < n:
+            stop = min(start + chunk, n)
+            loss_pct = (close[start:stop] - entry_price) / entry_price
+            stopped = loss_pct <= -stop_loss_pct
+            profited = loss_pct >= take_profit_pct
+            hit = stopped | profited | exit_mask[start:stop]
+            if hit.any():
+                j = int(hit.argmax())
+                exit_bar = start + j
+                code = STOP_LOSS if stopped[j] else TAKE_PROFIT if profited[j] else SELL
+                break
+            start = stop
+            chunk = min(chunk * 2, _MAX_CHUNK)
+
+        if exit_bar < 0:
+            break
+        balance = cash + _sale_value(holdings, close[exit_bar], fee_rate, slippage)
+        holdings = 0.0
+        cash = balance
+        trade_idx.append(exit_bar)
+        trade_codes.append(code)
+        trade_units.append(0.0)
+        trade_cash.append(cash)
+        i = exit_bar + 1
+
+    # Close any remaining position
+    if holdings > 0 and n:
+        balance = cash + _sale_value(holdings, close[-1], fee_rate, slippage)
+        trade_idx.append(n - 1)
+        trade_codes.append(SELL)
+        trade_units.append(0.0)
+        trade_cash.append(balance)
+
+    return (
+        balance,
+        np.asarray(trade_idx, dtype=np.int64),
+        np.asarray(trade_codes, dtype=np.int8),
+        np.asarray(trade_units, dtype=float),
+        np.asarray(trade_cash, dtype=float)
+    )
+
+
+def _sale_value(units: float, price: float, fee_rate: float, slippage: float) -> float:
+    if not fee_rate and not slippage:
+        return units * price
+    return units * price * (1 - slippage) * (1 - fee_rate)
+
+
+def equity_curve(
+    close: np.ndarray,
+    trade_idx: np.ndarray,
+    trade_units: np.ndarray,
+    trade_cash: np.ndarray,
+    initial_balance: float = 1000
+) -> np.ndarray:
+    """
+    Mark-to-market account value on every bar from simulate_positions output.
+
+    The holdings and cash left by the last trade at or before each bar are
+    valued at that bar's close.
+    """
+    close = np.asarray(close, dtype=float)
+    trade_idx = np.asarray(trade_idx, dtype=np.int64)
+    # Forward-fill the last trade number over the bars (indices are sorted;
+    # of several trades on one bar the last counts)
+    last_trade = np.full(len(close), -1, dtype=np.int64)
+    final = np.flatnonzero(np.append(trade_idx[1:] != trade_idx[:-1], True)) if len(trade_idx) else trade_idx
+    last_trade[trade_idx[final]] = final
+    last_trade = np.maximum.accumulate(last_trade)
+    traded = last_trade >= 0
+    last_trade = np.maximum(last_trade, 0)
+    units = np.where(traded, trade_units[last_trade] if len(trade_units) else 0.0, 0.0)
+    cash = np.where(traded, trade_cash[last_trade] if len(trade_cash) else 0.0, initial_balance)
+    # Flat bars are worth their cash even where there is no price yet
+    return cash + np.where(units != 0, units * close, 0.0)
@@ -1,253 +1,312 @@
-import pandas as pd
-import numpy as np
-from typing import Tuple, List
-from datetime import datetime
-
-def backtest_trading_strategy(
-    sentiment_file: str = "data/trading_signals.csv",
-    price_file: str = "data/historical_prices.csv",
-    output_file: str = "data/backtest_results.csv",
-    initial_balance: float = 1000,
-    stop_loss_pct: float = 0.05,
-    take_profit_pct: float = 0.1,
-    moving_avg_window: int = 20,
-    min_confidence: float = 0.6
-) -> Tuple[float, float, List]:
-    """
-    Enhanced trading strategy with risk management and technical indicators.
-    
-    Args:
-        sentiment_file: Path to sentiment signals CSV
-        price_file: Path to price data CSV
-        output_file: Path to save results
-        initial_balance: Starting capital
-        stop_loss_pct: Stop loss percentage (default 5%)
-        take_profit_pct: Take profit percentage (default 10%)
-        moving_avg_window: Window for moving average calculation
-        min_confidence: Minimum sentiment confidence to trigger trade
-    
-    Returns:
-        Tuple of (final_balance, ROI, trades_list)
-    """
-    # Load and prepare data
-    signals = pd.read_csv(sentiment_file)
-    prices = pd.read_csv(price_file)
-    
-    signals["timestamp"] = pd.to_datetime(signals["timestamp"])
-    prices["timestamp"] = pd.to_datetime(prices["timestamp"])
-    
-    # Merge datasets
-    data = pd.merge_asof(
-        signals.sort_values("timestamp"),
-        prices.sort_values("timestamp"),
-        on="timestamp"
-    )
-    
-    # Add technical indicators
-    data["SMA"] = data["close"].rolling(window=moving_avg_window).mean()
-    data["STD"] = data["close"].rolling(window=moving_avg_window).std()
-    data["Upper_Band"] = data["SMA"] + (data["STD"] * 2)
-    data["Lower_Band"] = data["SMA"] - (data["STD"] * 2)
-    data["RSI"] = calculate_rsi(data["close"])
-    
-    # Initialize trading variables
-    balance = initial_balance
-    btc_holdings = 0
-    trades = []
-    entry_price = 0
-    
-    # Trading loop
-    for i, row in data.iterrows():
-        current_price = row["close"]
-        
-        # Skip if not enough data for indicators
-        if i < moving_avg_window:
-            continue
-            
-        # Check stop loss and take profit if holding position
-        if btc_holdings > 0:
-            loss_pct = (current_price - entry_price) / entry_price
-            
-            # Stop loss hit
-            if loss_pct <= -stop_loss_pct:
-                balance = btc_holdings * current_price
-                trades.append(("STOP_LOSS", row["timestamp"], current_price))
-                btc_holdings = 0
-                continue
-                
-            # Take profit hit
-            if loss_pct >= take_profit_pct:
-                balance = btc_holdings * current_price
-                trades.append(("TAKE_PROFIT", row["timestamp"], current_price))
-                btc_holdings = 0
-                continue
-        
-        # Entry conditions
-        if row["signal"] == "BUY" and balance > 0:
-            # Additional conditions for buy entry
-            if (
-                row.get("confidence", 1.0) >= min_confidence and  # Check sentiment confidence
-                current_price > row["SMA"] and                    # Price above MA
-                row["RSI"] < 70 and                              # Not overbought
-                current_price < row["Upper_Band"]                 # Not at upper band
-            ):
-                btc_holdings = balance / current_price
-                balance = 0
-                entry_price = current_price
-                trades.append(("BUY", row["timestamp"], current_price))
-                
-        # Exit conditions
-        elif row["signal"] == "SELL" and btc_holdings > 0:
-            # Additional conditions for sell exit
-            if (
-                row.get("confidence", 1.0) >= min_confidence or   # High confidence sell signal
-                current_price < row["SMA"] or                     # Price below MA
-                row["RSI"] > 70 or                               # Overbought
-                current_price > row["Upper_Band"]                 # At upper band
-            ):
-                balance = btc_holdings * current_price
-                btc_holdings = 0
-                trades.append(("SELL", row["timestamp"], current_price))
-    
-    # Close any remaining position
-    if btc_holdings > 0:
-        balance = btc_holdings * data.iloc[-1]["close"]
-        trades.append(("SELL", data.iloc[-1]["timestamp"], data.iloc[-1]["close"]))
-    
-    # Calculate performance metrics
-    profit = ((balance - initial_balance) / initial_balance) * 100
-    win_rate = calculate_win_rate(trades)
-    max_drawdown = calculate_max_drawdown(trades, initial_balance)
-    profit_factor = calculate_profit_factor(trades)
-    
-    # Create DataFrame with trades
-    results_df = pd.DataFrame(trades, columns=["action", "timestamp", "price"])
-    
-    # Calculate trade-specific metrics
-    results_df["profit_loss"] = 0.0
-    for i in range(1, len(results_df)):
-        if results_df.iloc[i]["action"] in ["SELL", "TAKE_PROFIT", "STOP_LOSS"]:
-            results_df.iloc[i, results_df.columns.get_loc("profit_loss")] = \
-                results_df.iloc[i]["price"] - results_df.iloc[i-1]["price"]
-    
-    # Calculate cumulative metrics
-    results_df["cumulative_profit_loss"] = results_df["profit_loss"].cumsum()
-    results_df["running_balance"] = initial_balance + results_df["cumulative_profit_loss"]
-    
-    # Add summary metrics to a separate DataFrame
-    summary_metrics = pd.DataFrame([{
-        "metric_name": "Backtest Summary",
-        "timestamp": datetime.now(),
-        "value": "",
-        "details": "Performance Metrics"
-    }, {
-        "metric_name": "Initial Balance",
-        "timestamp": results_df.iloc[0]["timestamp"] if not results_df.empty else None,
-        "value": f"${initial_balance:.2f}",
-        "details": "Starting capital"
-    }, {
-        "metric_name": "Final Balance",
-        "timestamp": results_df.iloc[-1]["timestamp"] if not results_df.empty else None,
-        "value": f"${balance:.2f}",
-        "details": "Ending capital"
-    }, {
-        "metric_name": "Total Return",
-        "timestamp": results_df.iloc[-1]["timestamp"] if not results_df.empty else None,
-        "value": f"{profit:.2f}%",
-        "details": "Return on Investment"
-    }, {
-        "metric_name": "Win Rate",
-        "timestamp": results_df.iloc[-1]["timestamp"] if not results_df.empty else None,
-        "value": f"{win_rate:.2%}",
-        "details": "Percentage of profitable trades"
-    }, {
-        "metric_name": "Max Drawdown",
-        "timestamp": results_df.iloc[-1]["timestamp"] if not results_df.empty else None,
-        "value": f"{max_drawdown:.2%}",
-        "details": "Maximum peak to trough decline"
-    }, {
-        "metric_name": "Profit Factor",
-        "timestamp": results_df.iloc[-1]["timestamp"] if not results_df.empty else None,
-        "value": f"{profit_factor:.2f}",
-        "details": "Ratio of gross profit to gross loss"
-    }, {
-        "metric_name": "Total Trades",
-        "timestamp": results_df.iloc[-1]["timestamp"] if not results_df.empty else None,
-        "value": str(len(trades)),
-        "details": "Number of trades executed"
-    }])
-    
-    # Combine trades and summary metrics
-    final_results = pd.concat([
-        summary_metrics,
-        results_df.assign(
-            metric_name="Trade",
-            value=lambda x: x["price"].astype(str),
-            details=lambda x: "Trade execution"
-        )[["metric_name", "timestamp", "value", "details", "action", "price", "profit_loss", "running_balance"]]
-    ]).reset_index(drop=True)
-    
-    # Save to CSV
-    final_results.to_csv(output_file, index=False)
-    
-    # Print summary
-    print(f"✅ Backtesting complete! Final Balance: ${balance:.2f} ({profit:.2f}% ROI)")
-    print(f"✅ Win Rate: {win_rate:.2%}")
-    print(f"📊 Max Drawdown: {max_drawdown:.2%}")
-    print(f"📈 Profit Factor: {profit_factor:.2f}")
-    print(f"💾 Results saved to {output_file}")
-    
-    return balance, profit, trades
-
-def calculate_rsi(prices: pd.Series, period: int = 14) -> pd.Series:
-    """Calculate Relative Strength Index."""
-    delta = prices.diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-    
-    rs = gain / loss
-    return 100 - (100 / (1 + rs))
-
-def calculate_win_rate(trades: List) -> float:
-    """Calculate win rate from trades list."""
-    profitable_trades = 0
-    total_trades = 0
-    
-    for i in range(1, len(trades)):
-        if trades[i][0] in ["SELL", "TAKE_PROFIT"]:
-            total_trades += 1
-            if trades[i][2] > trades[i-1][2]:  # Exit price > Entry price
-                profitable_trades += 1
-                
-    return profitable_trades / max(1, total_trades)
-
-def calculate_max_drawdown(trades: List, initial_balance: float) -> float:
-    """Calculate maximum drawdown percentage."""
-    peak = initial_balance
-    max_dd = 0
-    
-    for trade in trades:
-        if trade[0] == "BUY":
-            current_value = initial_balance * (trade[2] / trades[0][2])
-            max_dd = min(max_dd, (current_value - peak) / peak)
-            peak = max(peak, current_value)
-            
-    return abs(max_dd)
-
-def calculate_profit_factor(trades: List) -> float:
-    """Calculate profit factor (gross profit / gross loss)."""
-    gross_profit = 0
-    gross_loss = 0
-    
-    for i in range(1, len(trades)):
-        if trades[i][0] in ["SELL", "TAKE_PROFIT", "STOP_LOSS"]:
-            profit = trades[i][2] - trades[i-1][2]
-            if profit > 0:
-                gross_profit += profit
-            else:
-                gross_loss += abs(profit)
-                
-    return gross_profit / max(gross_loss, 1)
-
-if __name__ == "__main__":
+import pandas as pd
+import numpy as np
+from typing import Tuple, List, Optional
+from datetime import datetime
+from backtest_engine import ACTION_NAMES, build_signal_masks, run_event_loop
+from indicators import IndicatorCache, calculate_rsi, default_cache, fingerprint
+from profiling import profiled, stage
+from storage import load_table, save_table
+from trade_metrics import (
+    action_codes,
+    ledger_from_prices,
+    max_drawdown as metrics_max_drawdown,
+    performance_metrics,
+    periods_per_year,
+    profit_factor as metrics_profit_factor,
+    round_trip_pnl,
+    win_rate as metrics_win_rate
+)
+
+@profiled("backtest_strategy")
+def backtest_trading_strategy(
+    sentiment_file: str = "data/trading_signals.csv",
+    price_file: str = "data/historical_prices.csv",
+    output_file: str = "data/backtest_results.csv",
+    initial_balance: float = 1000,
+    stop_loss_pct: float = 0.05,
+    take_profit_pct: float = 0.1,
+    moving_avg_window: int = 20,
+    min_confidence: float = 0.6
+) -> Tuple[float, float, List]:
+    """
+    Enhanced trading strategy with risk management and technical indicators.
+    
+    Args:
+        sentiment_file: Path to sentiment signals CSV
+        price_file: Path to price data CSV
+        output_file: Path to save results
+        initial_balance: Starting capital
+        stop_loss_pct: Stop loss percentage (default 5%)
+        take_profit_pct: Take profit percentage (default 10%)
+        moving_avg_window: Window for moving average calculation
+        min_confidence: Minimum sentiment confidence to trigger trade
+    
+    Returns:
+        Tuple of (final_balance, ROI, trades_list)
+    """
+    data = load_backtest_data(sentiment_file, price_file)
+    with stage("indicators", rows=len(data)):
+        add_indicators(data, moving_avg_window)
+    with stage("trading_loop", rows=len(data)):
+        balance, trade_idx, trade_codes = simulate_backtest(
+            data,
+            initial_balance=initial_balance,
+            stop_loss_pct=stop_loss_pct,
+            take_profit_pct=take_profit_pct,
+            moving_avg_window=moving_avg_window,
+            min_confidence=min_confidence
+        )
+        trades = trades_list(data, trade_idx, trade_codes)
+    
+    # Calculate performance metrics on the mark-to-market equity curve
+    with stage("metrics", rows=len(data)):
+        close = data["close"].to_numpy(dtype=float)
+        trade_units, trade_cash = ledger_from_prices(trade_codes, close[trade_idx], initial_balance)
+        metrics = performance_metrics(
+            close, trade_idx, trade_units, trade_cash, initial_balance,
+            periods=periods_per_year(data["timestamp"])
+        )
+    profit = ((balance - initial_balance) / initial_balance) * 100
+    win_rate = metrics["win_rate"]
+    max_drawdown = metrics["max_drawdown"]
+    profit_factor = metrics["profit_factor"]
+    
+    # Create DataFrame with trades
+    results_df = pd.DataFrame(trades, columns=["action", "timestamp", "price"])
+    
+    # Cash P&L of each round trip, booked on its exit row
+    results_df["profit_loss"] = 0.0
+    results_df.loc[results_df.index[1::2], "profit_loss"] = round_trip_pnl(trade_cash, initial_balance)
+    
+    # Calculate cumulative metrics
+    results_df["cumulative_profit_loss"] = results_df["profit_loss"].cumsum()
+    results_df["running_balance"] = initial_balance + results_df["cumulative_profit_loss"]
+    
+    # Add summary metrics to a separate DataFrame
+    summary_metrics = pd.DataFrame([{
+        "metric_name": "Backtest Summary",
+        "timestamp": datetime.now(),
+        "value": "",
+        "details": "Performance Metrics"
+    }, {
+        "metric_name": "Initial Balance",
+        "timestamp": results_df.iloc[0]["timestamp"] if not results_df.empty else None,
+        "value": f"${initial_balance:.2f}",
+        "details": "Starting capital"
+    }, {
+        "metric_name": "Final Balance",
+        "timestamp": results_df.iloc[-1]["timestamp"] if not results_df.empty else None,
+        "value": f"${balance:.2f}",
+        "details": "Ending capital"
+    }, {
+        "metric_name": "Total Return",
+        "timestamp": results_df.iloc[-1]["timestamp"] if not results_df.empty else None,
+        "value": f"{profit:.2f}%",
+        "details": "Return on Investment"
+    }, {
+        "metric_name": "Win Rate",
+        "timestamp": results_df.iloc[-1]["timestamp"] if not results_df.empty else None,
+        "value": f"{win_rate:.2%}",
+        "details": "Percentage of profitable trades"
+    }, {
+        "metric_name": "Max Drawdown",
+        "timestamp": results_df.iloc[-1]["timestamp"] if not results_df.empty else None,
+        "value": f"{max_drawdown:.2%}",
+        "details": "Maximum peak to trough decline"
+    }, {
+        "metric_name": "Profit Factor",
+        "timestamp": results_df.iloc[-1]["timestamp"] if not results_df.empty else None,
+        "value": f"{profit_factor:.2f}",
+        "details": "Ratio of gross profit to gross loss"
+    }, {
+        "metric_name": "Sharpe Ratio",
+        "timestamp": results_df.iloc[-1]["timestamp"] if not results_df.empty else None,
+        "value": f"{metrics['sharpe_ratio']:.2f}",
+        "details": "Annualized return over volatility"
+    }, {
+        "metric_name": "Sortino Ratio",
+        "timestamp": results_df.iloc[-1]["timestamp"] if not results_df.empty else None,
+        "value": f"{metrics['sortino_ratio']:.2f}",
+        "details": "Annualized return over downside volatility"
+    }, {
+        "metric_name": "Exposure",
+        "timestamp": results_df.iloc[-1]["timestamp"] if not results_df.empty else None,
+        "value": f"{metrics['exposure']:.2%}",
+        "details": "Share of time in a position"
+    }, {
+        "metric_name": "Total Trades",
+        "timestamp": results_df.iloc[-1]["timestamp"] if not results_df.empty else None,
+        "value": str(len(trades)),
+        "details": "Number of trades executed"
+    }])
+    
+    # Combine trades and summary metrics
+    final_results = pd.concat([
+        summary_metrics,
+        results_df.assign(
+            metric_name="Trade",
+            value=lambda x: x["price"].astype(str),
+            details=lambda x: "Trade execution"
+        )[["metric_name", "timestamp", "value", "details", "action", "price", "profit_loss", "running_balance"]]
+    ]).reset_index(drop=True)
+    
+    # Save results
+    with stage("write_results", rows=len(final_results)):
+        save_table(final_results, output_file)
+    
+    # Print summary
+    print(f"✅ Backtesting complete! Final Balance: ${balance:.2f} ({profit:.2f}% ROI)")
+    print(f"✅ Win Rate: {win_rate:.2%}")
+    print(f"📊 Max Drawdown: {max_drawdown:.2%}")
+    print(f"📈 Profit Factor: {profit_factor:.2f}")
+    print(f"📈 Sharpe Ratio: {metrics['sharpe_ratio']:.2f} | Sortino Ratio: {metrics['sortino_ratio']:.2f}")
+    print(f"⏱️ Exposure: {metrics['exposure']:.2%}")
+    print(f"💾 Results saved to {output_file}")
+    
+    return balance, profit, trades
+
+def load_backtest_data(
+    sentiment_file: str = "data/trading_signals.csv",
+    price_file: str = "data/historical_prices.csv"
+) -> pd.DataFrame:
+    """
+    Load sentiment signals and prices and align them with an as-of merge.
+    
+    The signals can be per-post (trading_signals) or per-bar
+    (sentiment_features), which gives one row per bar.
+    """
+    with stage("load_data") as loaded:
+        signals = load_table(sentiment_file, parse_dates=["timestamp"])
+        prices = load_table(price_file, columns=["timestamp", "close"], parse_dates=["timestamp"])
+        loaded["rows"] = len(signals) + len(prices)
+    
+    # Merge datasets (on one timestamp resolution, which merge_asof requires)
+    with stage("merge_asof", rows=len(signals)):
+        return pd.merge_asof(
+            signals.assign(timestamp=signals["timestamp"].astype("datetime64[ns]")).sort_values("timestamp"),
+            prices.assign(timestamp=prices["timestamp"].astype("datetime64[ns]")).sort_values("timestamp"),
+            on="timestamp"
+        )
+
+def add_indicators(
+    data: pd.DataFrame,
+    moving_avg_window: int = 20,
+    cache: Optional[IndicatorCache] = None
+) -> pd.DataFrame:
+    """
+    Add SMA, Bollinger Bands and RSI columns to the merged data in place.
+    
+    Indicators are looked up in `cache` (default: the process-wide
+    indicators.default_cache), so repeat calls over the same prices only
+    pay for the ones not computed yet.
+    """
+    cache = cache or default_cache
+    close = data["close"].to_numpy(dtype=float)
+    key = fingerprint(close)
+    data["SMA"] = cache.get(close, "sma", moving_avg_window, key)
+    data["STD"] = cache.get(close, "std", moving_avg_window, key)
+    data["Upper_Band"] = cache.get(close, "upper_band", moving_avg_window, key)
+    data["Lower_Band"] = cache.get(close, "lower_band", moving_avg_window, key)
+    data["RSI"] = cache.get(close, "rsi", 14, key)
+    return data
+
+def run_backtest(
+    data: pd.DataFrame,
+    initial_balance: float = 1000,
+    stop_loss_pct: float = 0.05,
+    take_profit_pct: float = 0.1,
+    moving_avg_window: int = 20,
+    min_confidence: float = 0.6
+) -> Tuple[float, List]:
+    """
+    Run the trading rules over merged data that already carries indicators.
+    
+    Entry/exit conditions are evaluated as boolean masks and the position
+    state machine runs over plain NumPy arrays (see backtest_engine).
+    
+    Returns:
+        Tuple of (final_balance, trades_list)
+    """
+    balance, trade_idx, trade_codes = simulate_backtest(
+        data,
+        initial_balance=initial_balance,
+        stop_loss_pct=stop_loss_pct,
+        take_profit_pct=take_profit_pct,
+        moving_avg_window=moving_avg_window,
+        min_confidence=min_confidence
+    )
+    return balance, trades_list(data, trade_idx, trade_codes)
+
+def simulate_backtest(
+    data: pd.DataFrame,
+    initial_balance: float = 1000,
+    stop_loss_pct: float = 0.05,
+    take_profit_pct: float = 0.1,
+    moving_avg_window: int = 20,
+    min_confidence: float = 0.6
+) -> Tuple[float, np.ndarray, np.ndarray]:
+    """
+    run_backtest without building the trades list.
+    
+    Returns:
+        Tuple of (final_balance, trade_bar_indices, trade_action_codes)
+    """
+    close = data["close"].to_numpy(dtype=float)
+    if "confidence" in data.columns:
+        confidence = data["confidence"].to_numpy(dtype=float)
+    else:
+        confidence = np.ones(len(data))
+    
+    entry_mask, exit_mask = build_signal_masks(
+        close,
+        data["signal"].to_numpy(dtype=object),
+        confidence,
+        data["SMA"].to_numpy(dtype=float),
+        data["RSI"].to_numpy(dtype=float),
+        data["Upper_Band"].to_numpy(dtype=float),
+        min_confidence=min_confidence,
+        warmup=moving_avg_window
+    )
+    return run_event_loop(
+        close, entry_mask, exit_mask,
+        initial_balance=initial_balance,
+        stop_loss_pct=stop_loss_pct,
+        take_profit_pct=take_profit_pct
+    )
+
+def trades_list(data: pd.DataFrame, trade_idx: np.ndarray, trade_codes: np.ndarray) -> List:
+    """(action, timestamp, price) tuples for the trades of a simulation."""
+    timestamps = data["timestamp"].iloc[trade_idx].tolist()
+    prices = data["close"].to_numpy(dtype=float)[trade_idx].tolist()
+    return [
+        (ACTION_NAMES[code], ts, price)
+        for code, ts, price in zip(trade_codes.tolist(), timestamps, prices)
+    ]
+
+def _trade_ledger(trades: List, initial_balance: float = 1000) -> Tuple[np.ndarray, np.ndarray]:
+    codes = action_codes([trade[0] for trade in trades])
+    prices = np.array([trade[2] for trade in trades], dtype=float)
+    return ledger_from_prices(codes, prices, initial_balance)
+
+def calculate_win_rate(trades: List) -> float:
+    """Calculate win rate (share of round trips closed at a profit) from trades list."""
+    _, cash = _trade_ledger(trades)
+    return metrics_win_rate(round_trip_pnl(cash))
+
+def calculate_max_drawdown(trades: List, initial_balance: float) -> float:
+    """
+    Calculate maximum drawdown percentage of the account value at the trades
+    (see trade_metrics.performance_metrics for the bar-by-bar drawdown).
+    """
+    units, cash = _trade_ledger(trades, initial_balance)
+    prices = np.array([trade[2] for trade in trades], dtype=float)
+    equity = np.concatenate(([initial_balance], cash + units * prices))
+    return metrics_max_drawdown(equity)
+
+def calculate_profit_factor(trades: List) -> float:
+    """Calculate profit factor (gross profit / gross loss) from trades list."""
+    _, cash = _trade_ledger(trades)
+    return metrics_profit_factor(round_trip_pnl(cash))
+
+if __name__ == "__main__":
     backtest_trading_strategy()
\ No newline at end of file
@@ -0,0 +1,108 @@
+import time
+import argparse
+import threading
+import http.client
+from urllib.parse import urlsplit
+import numpy as np
+
+DEFAULT_URL = "http://127.0.0.1:5000"
+DEFAULT_PATHS = ["/api/trade-signals", "/api/backtest-results"]
+
+
+def _client(base, path, deadline, latencies, errors, sizes, lock):
+    """One keep-alive client sending `path` back to back until `deadline`."""
+    url = urlsplit(base)
+    connection = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=60)
+    own_latencies, own_errors, size = [], 0, 0
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            connection.request("GET", path)
+            response = connection.getresponse()
+            body = response.read()
+            if response.status != 200:
+                own_errors += 1
+                continue
+            size = len(body)
+        except (OSError, http.client.HTTPException):
+            own_errors += 1
+            connection.close()
+            connection = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=60)
+            continue
+        own_latencies.append(time.perf_counter() - start)
+    connection.close()
+    with lock:
+        latencies.extend(own_latencies)
+        errors.append(own_errors)
+        sizes.append(size)
+
+
+def load_test(base=DEFAULT_URL, path="/api/trade-signals", clients=16, duration=10.0, warmup=1.0):
+    """
+    Hammer one endpoint of a running server with concurrent keep-alive clients.
+
+    Args:
+        base: Server URL, e.g. http://127.0.0.1:5000
+        path: Endpoint path (with query string)
+        clients: Concurrent connections, each sending requests back to back
+        duration: Seconds to measure
+        warmup: Seconds of requests before measuring (fills server caches)
+
+    Returns:
+        Dict with requests, errors, requests_per_sec, p50_ms/p90_ms/p99_ms/max_ms
+        latencies and response_mb
+    """
+    lock = threading.Lock()
+    if warmup:
+        _client(base, path, time.perf_counter() + warmup, [], [], [], lock)
+
+    latencies, errors, sizes = [], [], []
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(target=_client, args=(base, path, deadline, latencies, errors, sizes, lock), daemon=True)
+        for _ in range(clients)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies_ms = np.array(latencies) * 1000
+    p50, p90, p99 = np.percentile(latencies_ms, [50, 90, 99]) if len(latencies_ms) else (np.nan,) * 3
+    return {
+        "path": path,
+        "clients": clients,
+        "requests": len(latencies_ms),
+        "errors": int(sum(errors)),
+        "requests_per_sec": len(latencies_ms) / elapsed,
+        "p50_ms": float(p50),
+        "p90_ms": float(p90),
+        "p99_ms": float(p99),
+        "max_ms": float(latencies_ms.max()) if len(latencies_ms) else np.nan,
+        "response_mb": max(sizes, default=0) / 2**20,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the API endpoints of a running server.")
+    parser.add_argument("--url", default=DEFAULT_URL, help="Server URL")
+    parser.add_argument("--paths", nargs="+", default=DEFAULT_PATHS, help="Endpoints to test, one after another")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 16, 64], help="Concurrent clients (one run per value)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per run")
+    args = parser.parse_args(argv)
+
+    results = []
+    for path in args.paths:
+        for clients in args.clients:
+            result = load_test(args.url, path, clients, args.duration)
+            results.append(result)
+            print(f"⏱️ {path:28s} {clients:4d} clients {result['requests_per_sec']:9,.1f} req/s  "
+                  f"p50 {result['p50_ms']:8.1f} ms  p99 {result['p99_ms']:8.1f} ms  "
+                  f"errors {result['errors']}  ({result['response_mb']:.2f} MB per response)")
+    return results
+
+
+if __name__ == "__main__":
+    main()
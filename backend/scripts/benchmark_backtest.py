@@ -0,0 +1,87 @@
+import time
+import pandas as pd
+from backtest_strategy import add_indicators, run_backtest
+from synthetic_data import make_price_bars, make_trading_signals
+
+def reference_backtest(data, initial_balance=1000, stop_loss_pct=0.05, take_profit_pct=0.1,
+                       moving_avg_window=20, min_confidence=0.6):
+    """Original row-by-row iterrows loop, kept to check the array engine against."""
+    balance = initial_balance
+    btc_holdings = 0
+    trades = []
+    entry_price = 0
+
+    for i, row in data.iterrows():
+        current_price = row["close"]
+        if i < moving_avg_window:
+            continue
+        if btc_holdings > 0:
+            loss_pct = (current_price - entry_price) / entry_price
+            if loss_pct <= -stop_loss_pct:
+                balance = btc_holdings * current_price
+                trades.append(("STOP_LOSS", row["timestamp"], current_price))
+                btc_holdings = 0
+                continue
+            if loss_pct >= take_profit_pct:
+                balance = btc_holdings * current_price
+                trades.append(("TAKE_PROFIT", row["timestamp"], current_price))
+                btc_holdings = 0
+                continue
+        if row["signal"] == "BUY" and balance > 0:
+            if (
+                row.get("confidence", 1.0) >= min_confidence and
+                current_price > row["SMA"] and
+                row["RSI"] < 70 and
+                current_price < row["Upper_Band"]
+            ):
+                btc_holdings = balance / current_price
+                balance = 0
+                entry_price = current_price
+                trades.append(("BUY", row["timestamp"], current_price))
+        elif row["signal"] == "SELL" and btc_holdings > 0:
+            if (
+                row.get("confidence", 1.0) >= min_confidence or
+                current_price < row["SMA"] or
+                row["RSI"] > 70 or
+                current_price > row["Upper_Band"]
+            ):
+                balance = btc_holdings * current_price
+                btc_holdings = 0
+                trades.append(("SELL", row["timestamp"], current_price))
+
+    if btc_holdings > 0:
+        balance = btc_holdings * data.iloc[-1]["close"]
+        trades.append(("SELL", data.iloc[-1]["timestamp"], data.iloc[-1]["close"]))
+    return balance, trades
+
+def make_backtest_data(n, seed=42):
+    """Merged signal/price frame with indicators, as backtest_trading_strategy builds it."""
+    signals = make_trading_signals(n, seed=seed)
+    prices = make_price_bars(n, seed=seed)
+    data = pd.merge_asof(signals, prices, on="timestamp")
+    return add_indicators(data)
+
+def benchmark_backtest(n_rows=1_000_000, reference_rows=20_000):
+    """Compare rows/sec of the array engine against the iterrows loop."""
+    data = make_backtest_data(n_rows)
+    sample = data.iloc[:reference_rows].copy()
+
+    start = time.perf_counter()
+    ref_balance, ref_trades = reference_backtest(sample)
+    reference_rate = reference_rows / (time.perf_counter() - start)
+
+    balance, trades = run_backtest(sample)
+    if trades != ref_trades or balance != ref_balance:
+        raise AssertionError("Array engine diverged from the reference loop")
+
+    start = time.perf_counter()
+    balance, trades = run_backtest(data)
+    engine_rate = n_rows / (time.perf_counter() - start)
+
+    print(f"🐢 iterrows loop: {reference_rate:,.0f} rows/sec ({len(ref_trades)} trades on {reference_rows:,} rows)")
+    print(f"🚀 array engine:  {engine_rate:,.0f} rows/sec ({len(trades)} trades on {n_rows:,} rows)")
+    print(f"📈 Speedup: {engine_rate / reference_rate:.0f}x")
+    return engine_rate / reference_rate
+
+if __name__ == "__main__":
+    benchmark_backtest()
@@ -0,0 +1,96 @@
+import os
+import sys
+import math
+import time
+import json
+import tempfile
+from synthetic_data import make_backtest_results, make_trading_signals
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import app as backend
+
+
+def replace_nan_with_null(obj):
+    """Original recursive NaN scrubbing, kept to check serialize_records against."""
+    if isinstance(obj, float) and math.isnan(obj):
+        return None
+    elif isinstance(obj, dict):
+        return {key: replace_nan_with_null(value) for key, value in obj.items()}
+    elif isinstance(obj, list):
+        return [replace_nan_with_null(item) for item in obj]
+    return obj
+
+
+def reference_records(df):
+    """Original serialization: records dicts, NaN scrubbed in Python, then jsonify's encoder."""
+    return backend.app.json.dumps(replace_nan_with_null(df.to_dict(orient="records"))).encode("utf-8")
+
+
+def _cpu(func, repeat):
+    """Least CPU seconds of `repeat` calls (CPU, not wall time, is what a busy server runs out of)."""
+    best = None
+    for _ in range(repeat):
+        start = time.process_time()
+        func()
+        seconds = time.process_time() - start
+        best = seconds if best is None else min(best, seconds)
+    return best
+
+
+def benchmark_serialization(n_rows=100_000, repeat=3, seed=42):
+    """
+    Time the per-request CPU of both endpoints on `n_rows`-row files, old
+    serializer against serialize_records.
+
+    Serialization is timed on its own and as part of a cold request (file
+    changed, so parse + serialize), which is what every client pays after
+    each pipeline run.
+    """
+    backend_path = backend.SIGNALS_FILE, backend.BACKTEST_RESULTS_FILE
+    results = {}
+    with tempfile.TemporaryDirectory() as data_dir:
+        files = {
+            "/api/trade-signals": (os.path.join(data_dir, "trading_signals.csv"), make_trading_signals(n_rows, seed=seed)),
+            "/api/backtest-results": (os.path.join(data_dir, "backtest_results.csv"), make_backtest_results(n_rows, seed=seed)),
+        }
+        for path, df in files.values():
+            df.to_csv(path, index=False)
+        backend.SIGNALS_FILE = files["/api/trade-signals"][0]
+        backend.BACKTEST_RESULTS_FILE = files["/api/backtest-results"][0]
+        client = backend.app.test_client()
+        try:
+            for url, (path, _) in files.items():
+                df = backend.pd.read_csv(path)
+                if json.loads(backend.serialize_records(df)) != json.loads(reference_records(df)):
+                    raise AssertionError(f"serialize_records diverged from the original output for {url}")
+
+                def cold_request():
+                    backend._file_cache.clear()
+                    response = client.get(url)
+                    if response.status_code != 200:
+                        raise RuntimeError(f"{url} answered {response.status_code}")
+
+                serializer = backend.serialize_records
+                new_serialize = _cpu(lambda: serializer(df), repeat)
+                new_request = _cpu(cold_request, repeat)
+                backend.serialize_records = reference_records
+                try:
+                    old_serialize = _cpu(lambda: reference_records(df), repeat)
+                    old_request = _cpu(cold_request, repeat)
+                finally:
+                    backend.serialize_records = serializer
+
+                results[url] = {
+                    "serialize_cpu_before": old_serialize, "serialize_cpu_after": new_serialize,
+                    "request_cpu_before": old_request, "request_cpu_after": new_request,
+                }
+                print(f"🐢 {url:22s} serialize {old_serialize * 1000:8.1f} ms CPU, cold request {old_request * 1000:8.1f} ms CPU ({n_rows:,} rows)")
+                print(f"🚀 {url:22s} serialize {new_serialize * 1000:8.1f} ms CPU, cold request {new_request * 1000:8.1f} ms CPU "
+                      f"({old_serialize / new_serialize:.1f}x / {old_request / new_request:.1f}x)")
+        finally:
+            backend.SIGNALS_FILE, backend.BACKTEST_RESULTS_FILE = backend_path
+    return results
+
+
+if __name__ == "__main__":
+    benchmark_serialization()
@@ -0,0 +1,101 @@
+import sys
+import time
+import numpy as np
+import pandas as pd
+from sentiment_analysis import label_sentiment, score_texts, sia, tally_quantile, tally_scores
+from synthetic_data import make_sentiment_posts
+
+def reference_labels(df):
+    """Original per-row labeling, kept to check label_sentiment against."""
+    lower_threshold = df["sentiment_score"].quantile(0.25)
+    upper_threshold = df["sentiment_score"].quantile(0.75)
+    return df["sentiment_score"].apply(
+        lambda score: "bullish" if score > upper_threshold else
+                      "bearish" if score < lower_threshold else
+                      "bullish" if df.loc[df["sentiment_score"] == score, "upvotes"].values[0] > 10 else "bearish"
+    ).to_numpy()
+
+def untied_posts(n, seed=42):
+    """Synthetic posts whose sentiment scores are all distinct."""
+    posts = make_sentiment_posts(n, seed=seed)
+    rng = np.random.default_rng(seed)
+    posts["sentiment_score"] = rng.permutation(np.linspace(-1, 1, n))
+    return posts
+
+# Hand-built labeling cases: (name, scores, upvotes, expected labels) with
+# the default 0.25/0.75 quantiles and upvote threshold of 10
+LABELING_CASES = [
+    # Thresholds -0.15 / 0.225: the two 0.0 posts are labelled by their own
+    # upvotes (the per-row original used the first one's for both)
+    ("equal scores", [-0.8, -0.2, 0.0, 0.0, 0.3, 0.9], [0, 0, 50, 2, 0, 0],
+     ["bearish", "bearish", "bullish", "bearish", "bullish", "bullish"]),
+    # Thresholds land exactly on -0.5 / 0.5: a score equal to one is
+    # neither above nor below it, so its upvotes decide
+    ("quantile edges", [-1.0, -0.5, 0.0, 0.5, 1.0], [50, 50, 0, 0, 0],
+     ["bearish", "bullish", "bearish", "bearish", "bullish"]),
+    # All scores equal: upvotes decide, and exactly 10 is not above the threshold
+    ("upvote threshold", [0.0, 0.0, 0.0], [10, 11, 0],
+     ["bearish", "bullish", "bearish"]),
+]
+
+def check_labeling():
+    """
+    Check label_sentiment on the hand-built LABELING_CASES, with quantiles
+    over the scores and with thresholds from a score tally (as delta runs
+    label). Runs in well under a second.
+    """
+    for name, scores, upvotes, expected in LABELING_CASES:
+        tally = tally_scores(scores)
+        thresholds = (tally_quantile(tally, 0.25), tally_quantile(tally, 0.75))
+        for labels in (label_sentiment(scores, upvotes), label_sentiment(scores, upvotes, thresholds=thresholds)):
+            if labels.tolist() != expected:
+                raise AssertionError(f"Labels for '{name}' were {labels.tolist()}, expected {expected}")
+    print(f"✅ label_sentiment passed {len(LABELING_CASES)} hand-built cases")
+
+def benchmark_labeling(n_rows=1_000_000, reference_rows=5_000):
+    """Check vectorized labels against the original on untied scores and time both."""
+    sample = untied_posts(reference_rows)
+    start = time.perf_counter()
+    expected = reference_labels(sample)
+    reference_rate = reference_rows / (time.perf_counter() - start)
+    labels = label_sentiment(sample["sentiment_score"], sample["upvotes"])
+    if not (labels == expected).all():
+        raise AssertionError("Vectorized labels diverged from the original labeling")
+
+    posts = untied_posts(n_rows)
+    start = time.perf_counter()
+    label_sentiment(posts["sentiment_score"], posts["upvotes"])
+    vectorized_rate = n_rows / (time.perf_counter() - start)
+
+    print(f"🐢 per-row labeling:    {reference_rate:,.0f} posts/sec on {reference_rows:,} posts")
+    print(f"🚀 vectorized labeling: {vectorized_rate:,.0f} posts/sec on {n_rows:,} posts")
+    return vectorized_rate / reference_rate
+
+def benchmark_scoring(n_posts=200_000, processes_list=(1, 2, 4), duplicate_share=0.3):
+    """Time batched VADER scoring at several worker counts against the per-row path."""
+    posts = make_sentiment_posts(n_posts)
+    rng = np.random.default_rng(7)
+    # Make titles mostly unique, with a share of reposts
+    texts = posts["cleaned_text"] + " " + pd.Series(rng.integers(0, 10**9, n_posts)).astype(str)
+    reposts = rng.random(n_posts) < duplicate_share
+    texts[reposts] = texts.sample(int(reposts.sum()), replace=True, random_state=7).to_numpy()
+
+    sample = texts.iloc[:10_000]
+    start = time.perf_counter()
+    sample.apply(lambda text: sia.polarity_scores(text)["compound"])
+    print(f"🐢 per-row scoring: {len(sample) / (time.perf_counter() - start):,.0f} posts/sec")
+
+    rates = {}
+    for processes in processes_list:
+        start = time.perf_counter()
+        score_texts(texts, processes=processes)
+        rates[processes] = n_posts / (time.perf_counter() - start)
+        print(f"🚀 batched scoring, {processes} worker(s): {rates[processes]:,.0f} posts/sec")
+    return rates
+
+if __name__ == "__main__":
+    # --check only runs the quick labeling check
+    check_labeling()
+    if "--check" not in sys.argv:
+        benchmark_labeling()
+        benchmark_scoring()
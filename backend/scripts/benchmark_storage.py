@@ -0,0 +1,57 @@
+import os
+import sys
+import json
+import time
+import resource
+import tempfile
+import subprocess
+from synthetic_data import make_price_bars, make_sentiment_posts
+
+FORMATS = ["csv", "parquet", "feather"]
+
+def run_pipeline(data_dir):
+    """Signal generation + backtest over the tables in data_dir (runs in a child process)."""
+    from generate_signals import generate_trading_signals
+    from backtest_strategy import backtest_trading_strategy
+
+    start = time.perf_counter()
+    generate_trading_signals(
+        input_file=os.path.join(data_dir, "reddit_sentiment.csv"),
+        output_file=os.path.join(data_dir, "trading_signals.csv")
+    )
+    backtest_trading_strategy(
+        sentiment_file=os.path.join(data_dir, "trading_signals.csv"),
+        price_file=os.path.join(data_dir, "historical_prices.csv"),
+        output_file=os.path.join(data_dir, "backtest_results.csv")
+    )
+    return {
+        "seconds": time.perf_counter() - start,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+def benchmark_storage(n_rows=1_000_000):
+    """Compare end-to-end pipeline time and peak RSS for each storage format."""
+    from storage import save_table
+
+    posts = make_sentiment_posts(n_rows)
+    prices = make_price_bars(n_rows)
+    results = {}
+    for fmt in FORMATS:
+        with tempfile.TemporaryDirectory() as data_dir:
+            save_table(posts, os.path.join(data_dir, "reddit_sentiment.csv"), fmt=fmt, export_csv=False)
+            save_table(prices, os.path.join(data_dir, "historical_prices.csv"), fmt=fmt, export_csv=False)
+            # Fresh interpreter per format so peak RSS isn't shared between runs
+            env = {**os.environ, "DATA_FORMAT": fmt, "DATA_EXPORT_CSV": "0"}
+            output = subprocess.run(
+                [sys.executable, __file__, "--run", data_dir],
+                env=env, capture_output=True, text=True, check=True
+            ).stdout
+            results[fmt] = json.loads(output.strip().splitlines()[-1])
+            print(f"📦 {fmt:8s} {results[fmt]['seconds']:7.2f}s  peak RSS {results[fmt]['peak_rss_mb']:8.1f} MB")
+    return results
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--run":
+        print(json.dumps(run_pipeline(sys.argv[2])))
+    else:
+        benchmark_storage()
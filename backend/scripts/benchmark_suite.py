@@ -0,0 +1,307 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import subprocess
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+from profiling import profile_run
+from synthetic_data import (
+    make_backtest_results,
+    make_onchain_rows,
+    make_price_bars,
+    make_reddit_posts,
+    make_sentiment_posts,
+    make_trading_signals
+)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_FILE = "data/benchmark_results.json"
+BASELINE_FILE = "data/benchmark_baseline.json"
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+# A case regresses when throughput drops or peak memory grows by more than this
+DEFAULT_TOLERANCE = 0.2
+# Requests timed per endpoint once its cache is warm
+API_REQUESTS = 20
+
+
+def write_dataset(data_dir, n, seed=42):
+    """Write seeded inputs of every stage with `n` rows each (one price bar per minute)."""
+    from storage import save_table
+    from combine_data import ONCHAIN_COLUMNS
+
+    tables = {
+        "reddit_cleaned.csv": make_reddit_posts(n, seed=seed),
+        "reddit_sentiment.csv": make_sentiment_posts(n, seed=seed),
+        "trading_signals.csv": make_trading_signals(n, seed=seed),
+        "historical_prices.csv": make_price_bars(n, seed=seed),
+        # Hourly rows for 5 pools and one Aave reserve over the same span
+        "onchain_uniswap_pool_hour_data.csv": make_onchain_rows(max(n // 12, 5), freq="1h", columns=ONCHAIN_COLUMNS["uniswap"], seed=seed),
+        "onchain_aave_reserve_history.csv": make_onchain_rows(max(n // 60, 1), freq="1h", entities=1, columns=ONCHAIN_COLUMNS["aave"], seed=seed + 1),
+    }
+    for name, df in tables.items():
+        save_table(df, os.path.join(data_dir, name), export_csv=False)
+    # The API serves CSV files directly
+    tables["trading_signals.csv"].to_csv(os.path.join(data_dir, "api_trading_signals.csv"), index=False)
+    make_backtest_results(n, seed=seed).to_csv(os.path.join(data_dir, "api_backtest_results.csv"), index=False)
+
+
+def _path(data_dir, name):
+    return os.path.join(data_dir, name)
+
+
+def _case_analyze_sentiment(data_dir):
+    from sentiment_analysis import analyze_sentiment
+    analyze_sentiment(_path(data_dir, "reddit_cleaned.csv"), _path(data_dir, "out_reddit_sentiment.csv"))
+    return {}
+
+
+def _case_generate_trading_signals(data_dir):
+    from generate_signals import generate_trading_signals
+    generate_trading_signals(_path(data_dir, "reddit_sentiment.csv"), _path(data_dir, "out_trading_signals.csv"))
+    return {}
+
+
+def _case_sentiment_features(data_dir):
+    from sentiment_features import build_sentiment_features
+    build_sentiment_features(
+        _path(data_dir, "reddit_sentiment.csv"),
+        _path(data_dir, "historical_prices.csv"),
+        _path(data_dir, "out_sentiment_features.csv")
+    )
+    return {}
+
+
+def _case_merge_data(data_dir):
+    from combine_data import merge_data
+    merge_data(
+        sentiment_file=_path(data_dir, "reddit_sentiment.csv"),
+        uniswap_file=_path(data_dir, "onchain_uniswap_pool_hour_data.csv"),
+        aave_file=_path(data_dir, "onchain_aave_reserve_history.csv"),
+        price_file=_path(data_dir, "historical_prices.csv"),
+        output_file=_path(data_dir, "out_merged_data.csv"),
+        aave_reserve=None
+    )
+    return {}
+
+
+def _case_backtest_trading_strategy(data_dir):
+    from backtest_strategy import backtest_trading_strategy
+    backtest_trading_strategy(
+        sentiment_file=_path(data_dir, "trading_signals.csv"),
+        price_file=_path(data_dir, "historical_prices.csv"),
+        output_file=_path(data_dir, "out_backtest_results.csv")
+    )
+    return {}
+
+
+def _api_client(data_dir):
+    sys.path.insert(0, BACKEND_DIR)
+    import app as backend
+    backend.SIGNALS_FILE = _path(data_dir, "api_trading_signals.csv")
+    backend.BACKTEST_RESULTS_FILE = _path(data_dir, "api_backtest_results.csv")
+    return backend.app.test_client()
+
+
+def _time_requests(client, url):
+    """Cold request (parse + serialize) inside the timed case, then warm requests/sec."""
+    response = client.get(url)
+    if response.status_code != 200:
+        raise RuntimeError(f"{url} answered {response.status_code}")
+    start = time.perf_counter()
+    for _ in range(API_REQUESTS):
+        client.get(url)
+    warm = API_REQUESTS / (time.perf_counter() - start)
+    return {"response_mb": round(len(response.data) / 2**20, 2), "warm_requests_per_sec": round(warm, 1)}
+
+
+def _case_api_trade_signals(data_dir):
+    return _time_requests(_api_client(data_dir), "/api/trade-signals")
+
+
+def _case_api_trade_signals_page(data_dir):
+    return _time_requests(_api_client(data_dir), "/api/trade-signals?limit=500&fields=timestamp,signal")
+
+
+def _case_api_backtest_results(data_dir):
+    return _time_requests(_api_client(data_dir), "/api/backtest-results")
+
+
+# Benchmark name -> function timed in a fresh interpreter on a dataset directory
+CASES = {
+    "analyze_sentiment": _case_analyze_sentiment,
+    "generate_trading_signals": _case_generate_trading_signals,
+    "sentiment_features": _case_sentiment_features,
+    "merge_data": _case_merge_data,
+    "backtest_trading_strategy": _case_backtest_trading_strategy,
+    "api_trade_signals": _case_api_trade_signals,
+    "api_trade_signals_page": _case_api_trade_signals_page,
+    "api_backtest_results": _case_api_backtest_results,
+}
+
+
+def run_case(case, data_dir, repeat=1):
+    """
+    Time one case in this process (best of `repeat`).
+
+    The case runs inside a profiling run, so the result also carries the
+    peak RSS sampled while it ran and its per-stage seconds (per call).
+    """
+    best, extra = None, {}
+    with profile_run(f"benchmark_{case}", report_dir=data_dir) as run:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            extra = CASES[case](data_dir)
+            seconds = time.perf_counter() - start
+            best = seconds if best is None else min(best, seconds)
+    with open(run["report_file"]) as f:
+        report = json.load(f)
+    return {
+        "seconds": best,
+        "peak_rss_mb": report["peak_rss_mb"],
+        "stages": {
+            stage["stage"].split("/", 1)[1]: round(stage["seconds"] / stage["calls"], 6)
+            for stage in report["stages"] if "/" in stage["stage"]
+        },
+        **extra,
+    }
+
+
+def environment():
+    """What a result depends on besides the code, so baselines are only compared like for like."""
+    from storage import DATA_FORMAT, EXPORT_CSV
+    return {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "data_format": DATA_FORMAT,
+        "export_csv": EXPORT_CSV,
+    }
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, cases=None, repeat=1, seed=42):
+    """
+    Time every case on seeded synthetic data of each size.
+
+    Each (case, size) runs in a fresh interpreter on a dataset written once
+    per size, so peak RSS is the case's own and import/cache state never
+    leaks between cases.
+
+    Returns:
+        Dict with the environment and one result per (case, rows): seconds,
+        rows_per_sec, peak_rss_mb and case extras (e.g. warm API req/s)
+    """
+    cases = list(cases or CASES)
+    unknown = [case for case in cases if case not in CASES]
+    if unknown:
+        raise ValueError(f"Unknown benchmark cases: {unknown}. Expected some of {list(CASES)}")
+
+    results = []
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as data_dir:
+            start = time.perf_counter()
+            write_dataset(data_dir, n, seed)
+            print(f"🧪 {n:,} rows: synthetic data written in {time.perf_counter() - start:.1f}s")
+            for case in cases:
+                output = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), "--run", case, data_dir, str(repeat)],
+                    capture_output=True, text=True
+                )
+                if output.returncode != 0:
+                    print(f"❌ {case} failed on {n:,} rows:\n{output.stderr.strip()[-2000:]}")
+                    results.append({"case": case, "rows": n, "error": output.stderr.strip().splitlines()[-1:]})
+                    continue
+                result = {"case": case, "rows": n, **json.loads(output.stdout.strip().splitlines()[-1])}
+                result["rows_per_sec"] = n / result["seconds"] if result["seconds"] else None
+                results.append(result)
+                print(f"⏱️ {case:26s} {n:>10,} rows {result['seconds']:9.3f}s "
+                      f"{result['rows_per_sec']:>14,.0f} rows/s  peak RSS {result['peak_rss_mb'] or 0:8.1f} MB")
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "environment": environment(),
+        "results": results,
+    }
+
+
+def compare_to_baseline(report, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Flag cases slower or bigger than the baseline by more than `tolerance`.
+
+    Returns:
+        List of regression dicts (case, rows, metric, baseline, current, change)
+    """
+    if baseline.get("environment") != report.get("environment"):
+        print(f"⚠️ Baseline environment differs: {baseline.get('environment')} vs {report.get('environment')}")
+    expected = {(r["case"], r["rows"]): r for r in baseline.get("results", []) if "error" not in r}
+    regressions = []
+    for result in report["results"]:
+        base = expected.get((result["case"], result["rows"]))
+        if base is None:
+            continue
+        if "error" in result:
+            regressions.append({"case": result["case"], "rows": result["rows"], "metric": "error",
+                                "baseline": None, "current": result["error"], "change": None})
+            continue
+        checks = [
+            ("rows_per_sec", result["rows_per_sec"], base.get("rows_per_sec"), -1),
+            ("peak_rss_mb", result["peak_rss_mb"], base.get("peak_rss_mb"), 1),
+        ]
+        for metric, current, previous, direction in checks:
+            if not current or not previous:
+                continue
+            change = current / previous - 1
+            flagged = change * direction > tolerance
+            print(f"{'❌' if flagged else '✅'} {result['case']:26s} {result['rows']:>10,} rows "
+                  f"{metric:13s} {previous:14,.1f} -> {current:14,.1f} ({change:+.1%})")
+            if flagged:
+                regressions.append({"case": result["case"], "rows": result["rows"], "metric": metric,
+                                    "baseline": previous, "current": current, "change": change})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline stages on synthetic data.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Rows per dataset (10^3 to 10^7)")
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), help="Cases to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per case; the fastest counts")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=RESULTS_FILE, help="Where this run's results go")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="Baseline to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Allowed slowdown/growth, e.g. 0.2")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.sizes, args.cases, args.repeat, args.seed)
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Results saved to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Baseline saved to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"⚠️ No baseline at {args.baseline}; run with --save-baseline to create one.")
+        return 0
+    with open(args.baseline) as f:
+        regressions = compare_to_baseline(report, json.load(f), args.tolerance)
+    if regressions:
+        print(f"❌ {len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+        return 1
+    print("✅ No regressions against the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 5 and sys.argv[1] == "--run":
+        print(json.dumps(run_case(sys.argv[2], sys.argv[3], int(sys.argv[4]))))
+    else:
+        sys.exit(main())
@@ -0,0 +1,55 @@
+import re
+import time
+import numpy as np
+import pandas as pd
+from nltk.tokenize import word_tokenize
+from text_normalization import STOP_WORDS, lemmatize, normalize_series
+
+def reference_clean(text):
+    """Original two-pass cleaning (preprocess_text.clean_text, then sentiment_analysis.preprocess_text)."""
+    text = text.lower()
+    text = re.sub(r"http\S+|www\S+|https\S+", "", text)
+    text = re.sub(r"[^\w\s]", "", text)
+    text = " ".join([word for word in word_tokenize(text) if word not in STOP_WORDS])
+    text = re.sub(r"http\S+|www\S+|https\S+", "", text, flags=re.MULTILINE)
+    text = re.sub(r"[^a-zA-Z\s]", "", text)
+    text = text.lower()
+    text = " ".join([word for word in text.split() if word not in STOP_WORDS])
+    return " ".join([lemmatize(word) for word in text.split()])
+
+def make_titles(n, seed=42):
+    """Seeded Reddit-style titles with URLs, numbers and punctuation."""
+    rng = np.random.default_rng(seed)
+    words = np.array([
+        "Bitcoin", "is", "going", "to", "the", "MOON!", "HODL", "$BTC", "ETH", "dumped",
+        "20%", "today?", "FUD", "everywhere...", "https://example.com/post", "rekt", "2025", "bull-run",
+    ])
+    lengths = rng.integers(4, 16, n)
+    tokens = words[rng.integers(0, len(words), lengths.sum())]
+    return pd.Series([" ".join(chunk) for chunk in np.split(tokens, np.cumsum(lengths)[:-1])])
+
+def benchmark_text(n_titles=200_000, reference_titles=20_000):
+    """Report chars/sec for the original two-pass cleaning and the shared normalizer."""
+    titles = make_titles(n_titles)
+    sample = titles.iloc[:reference_titles]
+    total_chars = titles.str.len().sum()
+    sample_chars = sample.str.len().sum()
+
+    start = time.perf_counter()
+    expected = sample.map(reference_clean)
+    print(f"🐢 two-pass cleaning:  {sample_chars / (time.perf_counter() - start):,.0f} chars/sec")
+
+    rates = {}
+    for vectorized in (False, True):
+        start = time.perf_counter()
+        cleaned = normalize_series(titles, vectorized=vectorized)
+        rates[vectorized] = total_chars / (time.perf_counter() - start)
+        label = "vectorized .str" if vectorized else "per-row"
+        print(f"🚀 single pass ({label}): {rates[vectorized]:,.0f} chars/sec")
+
+    matches = (cleaned.iloc[:reference_titles] == expected).mean()
+    print(f"🔍 {matches:.2%} of titles clean identically to the two-pass path")
+    return rates
+
+if __name__ == "__main__":
+    benchmark_text()
@@ -1,16 +1,180 @@
-import ccxt
-import pandas as pd
-
-def fetch_crypto_prices(symbol="BTC/USDT", timeframe="1h", limit=1000):
-    """Fetch historical crypto price data from Binance."""
-    binance = ccxt.binance()
-    ohlcv = binance.fetch_ohlcv(symbol, timeframe, limit=limit)
-    
-    df = pd.DataFrame(ohlcv, columns=["timestamp", "open", "high", "low", "close", "volume"])
-    df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms")  # Convert to readable date
-    df.to_csv("data/historical_prices.csv", index=False)
-    
-    print(f"✅ {len(df)} historical price records saved.")
-
-if __name__ == "__main__":
-    fetch_crypto_prices()
+import time
+import logging
+import ccxt
+import pandas as pd
+from pathlib import Path
+from storage import load_table, save_table, table_exists
+
+OHLCV_COLUMNS = ["timestamp", "open", "high", "low", "close", "volume"]
+# Partitioned OHLCV store: <OHLCV_DIR>/<BASE-QUOTE>/<timeframe>/<YYYY-MM>.<format>
+OHLCV_DIR = "data/ohlcv"
+TIMEFRAME_UNITS = {"m": 60_000, "h": 3_600_000, "d": 86_400_000, "w": 604_800_000}
+
+def fetch_crypto_prices(symbol="BTC/USDT", timeframe="1h", limit=1000):
+    """Fetch historical crypto price data from Binance."""
+    binance = ccxt.binance()
+    ohlcv = binance.fetch_ohlcv(symbol, timeframe, limit=limit)
+    
+    df = pd.DataFrame(ohlcv, columns=["timestamp", "open", "high", "low", "close", "volume"])
+    df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms")  # Convert to readable date
+    save_table(df, "data/historical_prices.csv")
+    
+    print(f"✅ {len(df)} historical price records saved.")
+
+def timeframe_ms(timeframe):
+    """Length of a ccxt timeframe string ("1m", "4h", "1d", "1w") in milliseconds."""
+    amount, unit = timeframe[:-1], timeframe[-1]
+    if unit not in TIMEFRAME_UNITS or not amount.isdigit():
+        raise ValueError(f"Unsupported timeframe '{timeframe}'. Expected e.g. 1m, 15m, 1h, 4h, 1d, 1w.")
+    return int(amount) * TIMEFRAME_UNITS[unit]
+
+def partition_path(symbol, timeframe, month, store_dir=OHLCV_DIR):
+    """Store path of one symbol/timeframe/month partition (extension set by storage)."""
+    return Path(store_dir) / symbol.replace("/", "-") / timeframe / f"{month}.csv"
+
+def load_ohlcv(symbol="BTC/USDT", timeframe="1h", start=None, end=None, store_dir=OHLCV_DIR):
+    """
+    Read stored bars for a symbol/timeframe, optionally limited to [start, end).
+
+    Only the month partitions overlapping the range are read.
+
+    Returns:
+        DataFrame with the historical_prices columns, sorted by timestamp
+    """
+    directory = partition_path(symbol, timeframe, "x", store_dir).parent
+    months = sorted({path.stem for path in directory.glob("*-*.*")}) if directory.exists() else []
+    if start is not None:
+        months = [month for month in months if month >= pd.Timestamp(start).strftime("%Y-%m")]
+    if end is not None:
+        months = [month for month in months if month <= pd.Timestamp(end).strftime("%Y-%m")]
+
+    frames = [load_table(partition_path(symbol, timeframe, month, store_dir), parse_dates=["timestamp"]) for month in months]
+    if not frames:
+        return pd.DataFrame({column: pd.Series(dtype="datetime64[ns]" if column == "timestamp" else float) for column in OHLCV_COLUMNS})
+    df = pd.concat(frames, ignore_index=True)
+    if start is not None:
+        df = df[df["timestamp"] >= pd.Timestamp(start)]
+    if end is not None:
+        df = df[df["timestamp"] < pd.Timestamp(end)]
+    return df.sort_values("timestamp", ignore_index=True)
+
+def store_ohlcv(df, symbol, timeframe, store_dir=OHLCV_DIR):
+    """Merge bars into their month partitions, replacing bars with the same timestamp."""
+    for month, bars in df.groupby(df["timestamp"].dt.strftime("%Y-%m")):
+        path = partition_path(symbol, timeframe, month, store_dir)
+        if table_exists(path):
+            bars = pd.concat([load_table(path, parse_dates=["timestamp"]), bars], ignore_index=True)
+        bars = bars.drop_duplicates("timestamp", keep="last").sort_values("timestamp", ignore_index=True)
+        save_table(bars[OHLCV_COLUMNS], path, export_csv=False)
+
+def find_gaps(timestamps, start, end, timeframe):
+    """
+    Missing bars between start and end, as (first_missing, last_missing) pairs.
+
+    Expected bars are every `timeframe` step from `start` (floored to the
+    timeframe) up to but excluding `end`.
+    """
+    step = pd.Timedelta(milliseconds=timeframe_ms(timeframe))
+    expected = pd.date_range(pd.Timestamp(start).floor(step), pd.Timestamp(end), freq=step, inclusive="left")
+    missing = expected.difference(pd.DatetimeIndex(timestamps))
+    if missing.empty:
+        return []
+    run_starts = [0] + [i for i in range(1, len(missing)) if missing[i] - missing[i - 1] != step]
+    run_ends = [i - 1 for i in run_starts[1:]] + [len(missing) - 1]
+    return [(missing[first], missing[last]) for first, last in zip(run_starts, run_ends)]
+
+def fetch_range(exchange, symbol, timeframe, start, end, page_limit=1000, max_retries=5, backoff=1.0, on_page=None):
+    """
+    Page through [start, end] with `since`, one exchange call per page.
+
+    Rate limits are left to the exchange (ccxt's enableRateLimit); throttling
+    and network errors are retried with exponential backoff. `on_page` is
+    called with each page's DataFrame so progress is stored as it arrives.
+
+    Returns:
+        Number of bars fetched
+    """
+    step = timeframe_ms(timeframe)
+    since = int(pd.Timestamp(start).value // 1_000_000)
+    until = int(pd.Timestamp(end).value // 1_000_000)
+    fetched = 0
+    while since <= until:
+        for attempt in range(max_retries + 1):
+            try:
+                ohlcv = exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=page_limit)
+                break
+            except ccxt.NetworkError as error:  # includes RateLimitExceeded and DDoSProtection
+                if attempt == max_retries:
+                    raise
+                delay = backoff * 2 ** attempt
+                logging.warning(f"⚠️ {symbol} {timeframe}: {type(error).__name__}, retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+        ohlcv = [bar for bar in ohlcv if since <= bar[0] <= until]
+        if not ohlcv:
+            break
+        page = pd.DataFrame(ohlcv, columns=OHLCV_COLUMNS)
+        page["timestamp"] = pd.to_datetime(page["timestamp"], unit="ms")
+        if on_page:
+            on_page(page)
+        fetched += len(page)
+        since = ohlcv[-1][0] + step
+    return fetched
+
+def backfill_ohlcv(
+    symbols=("BTC/USDT",),
+    timeframe="1h",
+    start="2024-01-01",
+    end=None,
+    exchange=None,
+    store_dir=OHLCV_DIR,
+    page_limit=1000,
+    export_file="data/historical_prices.csv"
+):
+    """
+    Backfill OHLCV history for several symbols into the partitioned store.
+
+    Each run compares the store with the bars expected between `start` and
+    `end` (default: the last closed bar) and only fetches the gaps, so
+    repeat runs just add the newest bars. Pages are written to their month
+    partitions as they arrive, so an interrupted backfill keeps its progress.
+    Bars the exchange never had (outages) stay gaps and are asked for again
+    on later runs.
+
+    Args:
+        symbols: Market symbols, e.g. ("BTC/USDT", "ETH/USDT")
+        timeframe: ccxt timeframe
+        start, end: Range to cover (anything pandas can parse)
+        exchange: ccxt-style exchange (defaults to rate-limited Binance)
+        store_dir: Root of the partitioned store
+        page_limit: Bars requested per call
+        export_file: Where the first symbol's range is saved for the
+            backtest (historical_prices layout); None to skip
+
+    Returns:
+        Dict of symbol -> bars fetched this run
+    """
+    exchange = exchange or ccxt.binance({"enableRateLimit": True})
+    step = pd.Timedelta(milliseconds=timeframe_ms(timeframe))
+    end = pd.Timestamp(end) if end is not None else pd.Timestamp.now("UTC").tz_localize(None).floor(step)
+
+    fetched = {}
+    for symbol in symbols:
+        stored = load_ohlcv(symbol, timeframe, start, end, store_dir)
+        gaps = find_gaps(stored["timestamp"], start, end, timeframe)
+        fetched[symbol] = 0
+        for first, last in gaps:
+            fetched[symbol] += fetch_range(
+                exchange, symbol, timeframe, first, last, page_limit,
+                on_page=lambda page: store_ohlcv(page, symbol, timeframe, store_dir)
+            )
+        print(f"✅ {symbol} {timeframe}: {fetched[symbol]} bars fetched to fill {len(gaps)} gap(s).")
+
+    if export_file and symbols:
+        df = load_ohlcv(symbols[0], timeframe, start, end, store_dir)
+        save_table(df, export_file)
+        print(f"✅ {len(df)} historical price records saved.")
+    return fetched
+
+if __name__ == "__main__":
+    backfill_ohlcv()
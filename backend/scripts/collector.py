@@ -0,0 +1,327 @@
+import os
+import time
+import random
+import asyncio
+import requests
+import pandas as pd
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+from storage import save_table
+from bitcoin_prices import OHLCV_DIR, load_ohlcv, store_ohlcv
+from reddit_store import ingest_posts, load_seen
+from fetch_onchain_data import (
+    AAVE_QUERY, GRAPH_API_URL_AAVE, GRAPH_API_URL_UNISWAP, UNISWAP_POOLS_QUERY,
+    save_aave_data, save_uniswap_data
+)
+
+try:
+    import aiohttp
+    HAS_AIOHTTP = True
+except ImportError:
+    HAS_AIOHTTP = False
+
+# Load environment variables
+load_dotenv()
+
+REDDIT_API_URL = os.getenv("REDDIT_API_URL", "https://www.reddit.com")
+BINANCE_API_URL = os.getenv("BINANCE_API_URL", "https://api.binance.com")
+USER_AGENT = os.getenv("REDDIT_USER_AGENT") or "crypto-ai-bot-collector/1.0"
+
+# Requests per second and concurrent requests allowed per source
+SOURCE_LIMITS = {
+    "reddit": {"rate": 1.0, "concurrency": 4},
+    "uniswap": {"rate": 5.0, "concurrency": 2},
+    "aave": {"rate": 5.0, "concurrency": 2},
+    "binance": {"rate": 10.0, "concurrency": 2},
+}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class TransientError(Exception):
+    """A request failure worth retrying (throttling, 5xx, dropped connection, timeout)."""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+def _retry_after(headers):
+    value = headers.get("Retry-After")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+class RateLimiter:
+    """Spaces request starts at least 1/rate seconds apart."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = 0.0
+
+    async def wait(self):
+        now = time.monotonic()
+        start = max(now, self._next)
+        self._next = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    def pause(self, seconds):
+        """Hold back every request of this source, e.g. after a 429 with Retry-After."""
+        self._next = max(self._next, time.monotonic() + seconds)
+
+class AiohttpTransport:
+    """Non-blocking requests over one pooled aiohttp session."""
+
+    def __init__(self, pool_size=16, timeout=30):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.session = None
+
+    async def __aenter__(self):
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.pool_size),
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.session.close()
+
+    async def request(self, method, url, params=None, json=None, headers=None):
+        try:
+            async with self.session.request(method, url, params=params, json=json, headers=headers) as response:
+                if response.status in RETRY_STATUSES:
+                    raise TransientError(f"HTTP {response.status} from {url}", _retry_after(response.headers))
+                response.raise_for_status()
+                return await response.json(content_type=None)
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as error:
+            raise TransientError(f"{type(error).__name__} from {url}") from error
+
+class ThreadedTransport:
+    """
+    Fallback when aiohttp is not installed: blocking requests on a pooled
+    requests.Session, run on a thread pool so the event loop stays free.
+    """
+
+    def __init__(self, pool_size=16, timeout=30):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.session = None
+        self.executor = None
+
+    async def __aenter__(self):
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, max_retries=0)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.executor = ThreadPoolExecutor(self.pool_size)
+        return self
+
+    async def __aexit__(self, *exc):
+        self.executor.shutdown(wait=True)
+        self.session.close()
+
+    async def request(self, method, url, params=None, json=None, headers=None):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self._request, method, url, params, json, headers)
+
+    def _request(self, method, url, params, json, headers):
+        try:
+            response = self.session.request(method, url, params=params, json=json, headers=headers, timeout=self.timeout)
+        except (requests.ConnectionError, requests.Timeout) as error:
+            raise TransientError(f"{type(error).__name__} from {url}") from error
+        if response.status_code in RETRY_STATUSES:
+            raise TransientError(f"HTTP {response.status_code} from {url}", _retry_after(response.headers))
+        response.raise_for_status()
+        return response.json()
+
+class Collector:
+    """
+    Runs requests for many sources concurrently over one connection pool.
+
+    Each source has its own rate limiter and concurrency cap (SOURCE_LIMITS),
+    so a slow or throttled source never holds up the others. Transient
+    failures are retried with exponential backoff and jitter; a Retry-After
+    header pauses the whole source for that long.
+    """
+
+    def __init__(self, limits=None, transport=None, max_retries=4, backoff=0.5, timeout=30):
+        self.limits = {**SOURCE_LIMITS, **(limits or {})}
+        pool_size = sum(limit["concurrency"] for limit in self.limits.values())
+        transport_class = AiohttpTransport if HAS_AIOHTTP else ThreadedTransport
+        self.transport = transport or transport_class(pool_size=pool_size, timeout=timeout)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._sources = {}
+
+    async def __aenter__(self):
+        await self.transport.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.transport.__aexit__(*exc)
+
+    def _source(self, name):
+        if name not in self._sources:
+            limit = self.limits.get(name, {"rate": None, "concurrency": 4})
+            self._sources[name] = (RateLimiter(limit["rate"]), asyncio.Semaphore(limit["concurrency"]))
+        return self._sources[name]
+
+    async def request(self, source, method, url, **kwargs):
+        """Send one request for `source`, retrying transient failures. Returns the decoded JSON."""
+        limiter, semaphore = self._source(source)
+        for attempt in range(self.max_retries + 1):
+            async with semaphore:
+                await limiter.wait()
+                try:
+                    return await self.transport.request(method, url, **kwargs)
+                except TransientError as error:
+                    if attempt == self.max_retries:
+                        raise
+                    if error.retry_after is not None:
+                        limiter.pause(error.retry_after)
+                        delay = 0.0
+                    else:
+                        delay = self.backoff * 2 ** attempt * random.uniform(0.5, 1.5)
+            await asyncio.sleep(delay)
+
+async def fetch_subreddit(collector, subreddit_name, listing="new", limit=100, base_url=REDDIT_API_URL):
+    """
+    Page through a subreddit listing on Reddit's public JSON API.
+
+    Returns:
+        List of posts with the PRAW attributes reddit_store.ingest_posts reads
+    """
+    posts, after = [], None
+    while len(posts) < limit:
+        params = {"limit": min(100, limit - len(posts)), "raw_json": 1}
+        if after:
+            params["after"] = after
+        listing_page = await collector.request(
+            "reddit", "GET", f"{base_url}/r/{subreddit_name}/{listing}.json",
+            params=params, headers={"User-Agent": USER_AGENT}
+        )
+        children = listing_page["data"]["children"]
+        posts.extend(
+            SimpleNamespace(
+                id=child["data"]["id"],
+                title=child["data"]["title"],
+                score=child["data"]["score"],
+                num_comments=child["data"]["num_comments"],
+                created_utc=child["data"]["created_utc"]
+            )
+            for child in children
+        )
+        after = listing_page["data"].get("after")
+        if not children or not after:
+            break
+    return posts[:limit]
+
+async def fetch_graphql(collector, source, url, query, variables=None):
+    """POST one GraphQL query for `source` and return the decoded response."""
+    payload = {"query": query}
+    if variables:
+        payload["variables"] = variables
+    return await collector.request(source, "POST", url, json=payload)
+
+async def fetch_klines(collector, symbol="BTCUSDT", interval="1h", limit=1000, base_url=BINANCE_API_URL):
+    """Fetch OHLCV candles from Binance's REST API, in the historical_prices layout."""
+    klines = await collector.request(
+        "binance", "GET", f"{base_url}/api/v3/klines",
+        params={"symbol": symbol, "interval": interval, "limit": limit}
+    )
+    df = pd.DataFrame([kline[:6] for kline in klines], columns=["timestamp", "open", "high", "low", "close", "volume"])
+    df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms")
+    return df.astype({column: float for column in ["open", "high", "low", "close", "volume"]})
+
+async def collect(
+    subreddits=("cryptocurrency", "bitcoin", "ethereum"),
+    listing="new",
+    reddit_limit=100,
+    symbol="BTCUSDT",
+    interval="1h",
+    price_limit=1000,
+    reddit_url=REDDIT_API_URL,
+    uniswap_url=GRAPH_API_URL_UNISWAP,
+    aave_url=GRAPH_API_URL_AAVE,
+    binance_url=BINANCE_API_URL,
+    limits=None
+):
+    """
+    Fetch every subreddit, the Uniswap and Aave queries and the price candles concurrently.
+
+    A failing source does not cancel the others; its entry in the result is
+    the exception instead.
+
+    Returns:
+        Dict with "reddit" ({subreddit: posts}), "uniswap", "aave" and "prices"
+    """
+    async with Collector(limits=limits) as collector:
+        jobs = {
+            **{
+                ("reddit", name): fetch_subreddit(collector, name, listing, reddit_limit, reddit_url)
+                for name in subreddits
+            },
+            ("uniswap", None): fetch_graphql(collector, "uniswap", uniswap_url, UNISWAP_POOLS_QUERY),
+            ("aave", None): fetch_graphql(collector, "aave", aave_url, AAVE_QUERY),
+            ("prices", None): fetch_klines(collector, symbol, interval, price_limit, binance_url),
+        }
+        results = await asyncio.gather(*jobs.values(), return_exceptions=True)
+
+    collected = {"reddit": {}}
+    for (source, name), result in zip(jobs, results):
+        if source == "reddit":
+            collected["reddit"][name] = result
+        else:
+            collected[source] = result
+    return collected
+
+def run_collection(
+    listing="new",
+    price_symbol="BTC/USDT",
+    interval="1h",
+    price_file="data/historical_prices.csv",
+    store_dir=OHLCV_DIR,
+    **collect_kwargs
+):
+    """
+    Collect all sources concurrently, then store them like the single-source fetchers.
+
+    Reddit posts go through reddit_store.ingest_posts (deduplicated appends,
+    against one index of the store built per run), on-chain responses
+    through fetch_onchain_data's savers. Candles are merged into the partitioned OHLCV store (bitcoin_prices.store_ohlcv),
+    and `price_file` is re-exported from the stored history, so backfilled
+    bars are kept. Sources that failed are reported and skipped.
+    """
+    start = time.perf_counter()
+    collected = asyncio.run(collect(
+        listing=listing, symbol=price_symbol.replace("/", ""), interval=interval, **collect_kwargs
+    ))
+    print(f"⏱️ Collected all sources in {time.perf_counter() - start:.2f}s")
+
+    # One dedup index for every subreddit instead of re-reading the store each time
+    seen = load_seen()
+    for name, posts in collected["reddit"].items():
+        if isinstance(posts, Exception):
+            print(f"❌ r/{name} failed: {posts}")
+        else:
+            ingest_posts(posts, name, listing=listing, seen=seen)
+
+    for source, save in (("uniswap", save_uniswap_data), ("aave", save_aave_data)):
+        if isinstance(collected[source], Exception):
+            print(f"❌ {source} failed: {collected[source]}")
+        else:
+            save(collected[source])
+
+    if isinstance(collected["prices"], Exception):
+        print(f"❌ prices failed: {collected['prices']}")
+    else:
+        store_ohlcv(collected["prices"], price_symbol, interval, store_dir)
+        history = load_ohlcv(price_symbol, interval, store_dir=store_dir)
+        save_table(history, price_file)
+        print(f"✅ {len(collected['prices'])} candles stored; {len(history)} historical price records saved.")
+    return collected
+
+if __name__ == "__main__":
+    run_collection()
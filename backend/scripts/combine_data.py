@@ -1,75 +1,234 @@
-import pandas as pd
-import logging
-from pathlib import Path
-
-# Set up logging
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
-
-def merge_data(
-    sentiment_file="data/reddit_sentiment.csv",
-    uniswap_file="data/onchain_uniswap_data.csv",
-    aave_file="data/onchain_aave_tokens.csv",
-    price_file="data/historical_prices.csv",
-    output_file="data/merged_data.csv"
-):
-    """
-    Merge sentiment data with on-chain data (Uniswap & Aave) and market prices.
-    Ensures all sentiment data is preserved while aligning on-chain & price data.
-    """
-
-    try:
-        # Check if input files exist
-        for file in [sentiment_file, uniswap_file, aave_file, price_file]:
-            if not Path(file).exists():
-                raise FileNotFoundError(f"Input file not found: {file}")
-
-        # Load datasets
-        logging.info("Loading datasets...")
-        df_sentiment = pd.read_csv(sentiment_file)
-        df_uniswap = pd.read_csv(uniswap_file)
-        df_aave = pd.read_csv(aave_file)
-        df_prices = pd.read_csv(price_file)
-
-        # Ensure 'timestamp' column exists in all DataFrames
-        for df_name, df in {"Sentiment": df_sentiment, "Uniswap": df_uniswap, "Aave": df_aave, "Prices": df_prices}.items():
-            if "timestamp" not in df.columns:
-                logging.warning(f"⚠️ 'timestamp' column missing in {df_name} data.")
-                df["timestamp"] = pd.Series([None] * len(df))  # Fill with NaNs to prevent errors
-
-        # Convert timestamps to datetime where available
-        logging.info("Converting timestamps to datetime...")
-        for df in [df_sentiment, df_uniswap, df_aave, df_prices]:
-            if "timestamp" in df.columns:
-                df["timestamp"] = pd.to_datetime(df["timestamp"])
-
-        # **Merge On-Chain Data (Uniswap & Aave) Using Forward Fill**
-        logging.info("Merging Uniswap & Aave data with sentiment...")
-        df_merged = df_sentiment.copy()
-        if "timestamp" in df_uniswap.columns:
-            df_merged = df_merged.merge(df_uniswap, on="timestamp", how="left")
-        if "timestamp" in df_aave.columns:
-            df_merged = df_merged.merge(df_aave, on="timestamp", how="left")
-
-        # **Merge Market Price Data (Ensure 'close' exists)**
-        logging.info("Merging price data...")
-        if "timestamp" in df_prices.columns and "close" in df_prices.columns:
-            df_merged = df_merged.merge(df_prices[["timestamp", "close"]], on="timestamp", how="left")
-        else:
-            logging.warning("⚠️ Price data missing 'timestamp' or 'close' column.")
-
-        # **Fill Missing Values Using Forward Fill**
-        df_merged.fillna(method="ffill", inplace=True)
-        df_merged.fillna(0, inplace=True)  # Ensure no NaN values remain
-
-        # Save merged data
-        output_path = Path(output_file)
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        df_merged.to_csv(output_path, index=False)
-        logging.info(f"✅ Merged data saved to {output_file} with {len(df_merged)} rows")
-
-    except Exception as e:
-        logging.error(f"❌ Error during merge: {e}")
-        raise
-
-if __name__ == "__main__":
-    merge_data()
+import pandas as pd
+import logging
+from profiling import profiled, stage
+from storage import TableWriter, load_table, save_table, table_exists
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# How old a source row may be and still be joined to a post (per source)
+DEFAULT_STALENESS = {"prices": "2h", "uniswap": "2D", "aave": "2D"}
+# On-chain columns joined to the posts. Uniswap pool-hours are summed over
+# pools, so only additive columns are taken (not prices, fee tiers or the
+# raw unix times); Aave history is one reserve's rates and liquidity, as
+# those can't be added up across reserves.
+ONCHAIN_COLUMNS = {
+    "uniswap": ["volumeUSD", "tvlUSD", "feesUSD", "txCount"],
+    "aave": ["liquidityRate", "variableBorrowRate", "utilizationRate", "totalLiquidity", "availableLiquidity"],
+}
+
+def prepare_source(df, columns=None, prefix=None, agg="last"):
+    """
+    Get one source ready for an as-of join.
+
+    Rows are sorted by timestamp and collapsed to one row per timestamp:
+    agg="last" keeps the latest row, agg="sum" adds up the numeric columns
+    (e.g. volume over all pools of an hour; select additive `columns` only).
+    Integer columns become float so unmatched rows (NaN) don't change dtypes
+    between chunks.
+
+    Returns:
+        Prepared DataFrame, or None if the source has no timestamp column
+    """
+    if "timestamp" not in df.columns:
+        return None
+    if columns:
+        df = df[["timestamp"] + [column for column in columns if column in df.columns and column != "timestamp"]]
+    df = df.dropna(subset=["timestamp"])
+    df = df.assign(timestamp=pd.to_datetime(df["timestamp"]).astype("datetime64[ns]"))
+
+    if agg == "sum":
+        df = df.groupby("timestamp", sort=True).sum(numeric_only=True).reset_index()
+    else:
+        df = df.sort_values("timestamp", kind="stable").drop_duplicates("timestamp", keep="last")
+
+    int_columns = df.select_dtypes(include=["integer", "bool"]).columns
+    df = df.astype({column: float for column in int_columns})
+    if prefix:
+        df = df.rename(columns={column: f"{prefix}_{column}" for column in df.columns if column != "timestamp"})
+    return df.reset_index(drop=True)
+
+def asof_join(base, sources, tolerance=None, staleness=None):
+    """
+    Join each source's latest row at or before every base timestamp.
+
+    The base is sorted once and each source is matched in one sorted
+    merge_asof pass against its timestamps only, so no intermediate merged
+    frames are built; the matched columns are concatenated at the end.
+    A source row older than the source's staleness limit (else `tolerance`)
+    is not used and leaves NaN.
+
+    Args:
+        base: Frame with a timestamp column (e.g. sentiment posts)
+        sources: Dict of name -> prepared source (see prepare_source)
+        tolerance: Default maximum age, e.g. "2h" (None: unlimited)
+        staleness: Dict of name -> maximum age overriding `tolerance`
+
+    Returns:
+        Base rows in time order with every source's columns added
+    """
+    staleness = staleness or {}
+    base = base.dropna(subset=["timestamp"])
+    base = base.assign(timestamp=pd.to_datetime(base["timestamp"]).astype("datetime64[ns]"))
+    if not base["timestamp"].is_monotonic_increasing:
+        base = base.sort_values("timestamp", kind="stable")
+    base = base.reset_index(drop=True)
+
+    keys = base[["timestamp"]]
+    parts = [base]
+    for name, source in sources.items():
+        limit = staleness.get(name, tolerance)
+        joined = pd.merge_asof(
+            keys, source, on="timestamp", direction="backward",
+            tolerance=pd.Timedelta(limit) if limit is not None else None
+        )
+        parts.append(joined.drop(columns="timestamp"))
+    return pd.concat(parts, axis=1)
+
+def _chunk_edges(timestamps, chunk_freq):
+    """Boundaries of the time partitions covering all timestamps (the last one is open-ended)."""
+    first, last = timestamps.min(), timestamps.max()
+    edges = pd.date_range(first.floor("D"), last, freq=chunk_freq)
+    edges = [edge for edge in edges if edge > first]
+    return [first] + edges + [None]
+
+@profiled("combine_data")
+def merge_data(
+    sentiment_file="data/reddit_sentiment.csv",
+    uniswap_file="data/onchain_uniswap_pool_hour_data.csv",
+    aave_file="data/onchain_aave_reserve_history.csv",
+    price_file="data/historical_prices.csv",
+    output_file="data/merged_data.csv",
+    aave_reserve="WBTC",
+    tolerance=None,
+    staleness=None,
+    chunk_freq=None,
+    fill_value=None
+):
+    """
+    Merge sentiment data with on-chain data (Uniswap & Aave) and market prices.
+    Ensures all sentiment data is preserved while aligning on-chain & price data.
+
+    Each post gets the latest price bar and on-chain values at or before its
+    timestamp (as-of join), as long as they are not older than the source's
+    staleness limit (DEFAULT_STALENESS, overridden by `staleness`, else
+    `tolerance`). The on-chain inputs are onchain_extract's histories:
+    Uniswap pool-hours, whose additive columns (ONCHAIN_COLUMNS) are summed
+    over the pools of each hour, and the Aave reserve history of
+    `aave_reserve` (None: every row, for a single-reserve table). Their
+    columns are prefixed with the source name; sources without a timestamp
+    column (snapshots) are skipped. Values that stay missing are NaN unless
+    `fill_value` is given.
+
+    With `chunk_freq` (e.g. "7D", "MS") posts are merged one time partition
+    at a time, reading only the source rows each partition needs and
+    streaming the output, so memory stays bounded for long histories
+    (parquet/feather inputs; CSV inputs are still read whole per partition).
+
+    Returns:
+        output_file in both modes (the table is not kept in memory when
+        chunked); read it back with storage.load_table
+    """
+
+    try:
+        # Check if input files exist
+        for file in [sentiment_file, uniswap_file, aave_file, price_file]:
+            if not table_exists(file):
+                raise FileNotFoundError(f"Input file not found: {file}")
+
+        staleness = {**DEFAULT_STALENESS, **(staleness or {})}
+        source_specs = {
+            "uniswap": {"path": uniswap_file, "prefix": "uniswap", "columns": ONCHAIN_COLUMNS["uniswap"], "agg": "sum"},
+            "aave": {
+                "path": aave_file, "prefix": "aave", "columns": ONCHAIN_COLUMNS["aave"],
+                "filters": [("reserve_symbol", "==", aave_reserve)] if aave_reserve else [],
+            },
+            "prices": {"path": price_file, "columns": ["close"]},
+        }
+
+        def load_sources(filters=None):
+            sources = {}
+            for name, spec in source_specs.items():
+                source_filters = spec.get("filters", []) + (filters(name) if filters else [])
+                with stage(f"load_{name}") as loaded:
+                    # A snapshot without timestamps is read unfiltered and skipped below
+                    df = load_table(spec["path"], parse_dates=["timestamp"], filters=source_filters or None)
+                    loaded["rows"] = len(df)
+                with stage(f"prepare_{name}", rows=len(df)):
+                    prepared = prepare_source(df, spec.get("columns"), spec.get("prefix"), spec.get("agg", "last"))
+                if prepared is None:
+                    logging.warning(f"⚠️ 'timestamp' column missing in {name} data; skipping it.")
+                    continue
+                sources[name] = prepared
+            return sources
+
+        def finish(df):
+            return df.fillna(fill_value) if fill_value is not None else df
+
+        if chunk_freq is None:
+            logging.info("Loading datasets...")
+            with stage("load_sentiment") as loaded:
+                df_sentiment = load_table(sentiment_file, parse_dates=["timestamp"])
+                loaded["rows"] = len(df_sentiment)
+            sources = load_sources()
+            logging.info("As-of joining price & on-chain data to sentiment...")
+            with stage("asof_join", rows=len(df_sentiment)):
+                df_merged = finish(asof_join(df_sentiment, sources, tolerance, staleness))
+            with stage("write_results", rows=len(df_merged)):
+                save_table(df_merged, output_file)
+            logging.info(f"✅ Merged data saved to {output_file} with {len(df_merged)} rows")
+            return output_file
+
+        # Time-partitioned merge: each partition only loads the source rows it
+        # can match, plus the last row seen before it (carried over). Without a
+        # staleness limit the first partition reads a source's whole history
+        # before it.
+        timestamps = load_table(sentiment_file, columns=["timestamp"], parse_dates=["timestamp"])["timestamp"].dropna()
+        if timestamps.empty:
+            raise ValueError(f"No timestamped rows in {sentiment_file}")
+        edges = _chunk_edges(timestamps, chunk_freq)
+        carry = {}
+        rows = 0
+        with TableWriter(output_file) as writer:
+            for chunk_start, chunk_end in zip(edges[:-1], edges[1:]):
+                def source_range(name):
+                    limit = staleness.get(name, tolerance)
+                    if carry.get(name) is not None:
+                        lower = chunk_start
+                    elif limit is not None:
+                        lower = chunk_start - pd.Timedelta(limit)
+                    else:
+                        lower = None
+                    bounds = [("timestamp", "<", chunk_end)] if chunk_end is not None else []
+                    return bounds + [("timestamp", ">=", lower)] if lower is not None else bounds
+
+                sources = load_sources(source_range)
+                for name, source in sources.items():
+                    if carry.get(name) is not None:
+                        source = pd.concat([carry[name], source], ignore_index=True)
+                        sources[name] = source
+                    if not source.empty:
+                        carry[name] = source.iloc[[-1]]
+
+                bounds = [("timestamp", ">=", chunk_start)]
+                if chunk_end is not None:
+                    bounds.append(("timestamp", "<", chunk_end))
+                with stage("load_sentiment") as loaded:
+                    df_sentiment = load_table(sentiment_file, parse_dates=["timestamp"], filters=bounds)
+                    loaded["rows"] = len(df_sentiment)
+                if df_sentiment.empty:
+                    continue
+                with stage("asof_join", rows=len(df_sentiment)):
+                    merged = finish(asof_join(df_sentiment, sources, tolerance, staleness))
+                with stage("write_results", rows=len(merged)):
+                    writer.write(merged)
+            rows = writer.rows
+        logging.info(f"✅ Merged data saved to {output_file} with {rows} rows ({len(edges) - 1} partitions)")
+        return output_file
+
+    except Exception as e:
+        logging.error(f"❌ Error during merge: {e}")
+        raise
+
+if __name__ == "__main__":
+    merge_data()
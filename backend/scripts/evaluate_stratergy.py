@@ -1,60 +1,73 @@
-import pandas as pd
-import numpy as np
-
-def evaluate_strategy(backtest_results="data/backtest_results.csv", initial_balance=1000):
-    """Evaluate the trading strategy's accuracy and profitability."""
-
-    # Load backtest results
-    try:
-        df = pd.read_csv(backtest_results)
-        if df.empty:
-            print("❌ No trades executed. Check strategy conditions.")
-            return
-    except FileNotFoundError:
-        print(f"❌ Error: {backtest_results} file not found.")
-        return
-    
-    # Ensure required columns exist
-    required_columns = ["action", "timestamp", "price"]
-    if not all(col in df.columns for col in required_columns):
-        print(f"❌ Missing required columns {required_columns} in results file.")
-        return
-
-    # Calculate Total Return (ROI %)
-    final_balance = df.iloc[-1]["price"] if "FINAL SELL" in df["action"].values else initial_balance
-    roi = ((final_balance - initial_balance) / initial_balance) * 100
-
-    # Count profitable trades (Win Rate)
-    wins = sum(1 for i in range(1, len(df)) if df.iloc[i]["action"] in ["SELL", "TAKE-PROFIT"] and df.iloc[i]["price"] > df.iloc[i-1]["price"])
-    total_trades = len(df) // 2  # Every Buy-Sell pair counts as one trade
-    win_rate = (wins / total_trades) * 100 if total_trades > 0 else 0
-
-    # Calculate Sharpe Ratio (Risk-Adjusted Return)
-    returns = df["price"].pct_change().dropna()
-    sharpe_ratio = (returns.mean() / returns.std()) * np.sqrt(252) if returns.std() != 0 else 0
-
-    # Calculate Max Drawdown (Worst Loss)
-    rolling_max = df["price"].cummax()
-    drawdown = (rolling_max - df["price"]) / rolling_max
-    max_drawdown = drawdown.max() * 100  # Convert to percentage
-
-    # Calculate Profit Factor (Total Profit / Total Loss)
-    profit_trades = [df.iloc[i]["price"] - df.iloc[i-1]["price"] for i in range(1, len(df)) if df.iloc[i]["action"] in ["SELL", "TAKE-PROFIT"] and df.iloc[i]["price"] > df.iloc[i-1]["price"]]
-    loss_trades = [df.iloc[i-1]["price"] - df.iloc[i]["price"] for i in range(1, len(df)) if df.iloc[i]["action"] == "STOP-LOSS" and df.iloc[i]["price"] < df.iloc[i-1]["price"]]
-    
-    total_profit = sum(profit_trades)
-    total_loss = sum(loss_trades)
-    profit_factor = (total_profit / abs(total_loss)) if total_loss != 0 else float('inf')
-
-    # Display Results
-    print("\n📈 **Trading Strategy Performance:**")
-    print(f"✅ ROI (%): {roi:.2f}%")
-    print(f"✅ Win Rate: {win_rate:.2f}%")
-    print(f"✅ Sharpe Ratio: {sharpe_ratio:.2f}")
-    print(f"✅ Max Drawdown: {max_drawdown:.2f}%")
-    print(f"✅ Profit Factor: {profit_factor:.2f}")
-    print(f"✅ Total Trades Executed: {total_trades}")
-
-# Run Evaluation
-if __name__ == "__main__":
-    evaluate_strategy()
+import pandas as pd
+import numpy as np
+from backtest_engine import BUY
+from storage import load_table, table_exists
+from trade_metrics import action_codes, ledger_from_prices, performance_metrics, periods_per_year
+
+def evaluate_strategy(backtest_results="data/backtest_results.csv", initial_balance=1000, price_file="data/historical_prices.csv"):
+    """
+    Evaluate the trading strategy's accuracy and profitability.
+
+    The trade rows of the backtest results are replayed as all-in trades and
+    marked to market on the `price_file` bars they span (or only at the
+    trades if it is missing), then scored with trade_metrics.
+    """
+
+    # Load backtest results
+    if not table_exists(backtest_results):
+        print(f"❌ Error: {backtest_results} file not found.")
+        return
+    df = load_table(backtest_results, parse_dates=["timestamp"])
+
+    # Ensure required columns exist
+    required_columns = ["action", "timestamp", "price"]
+    if not all(col in df.columns for col in required_columns):
+        print(f"❌ Missing required columns {required_columns} in results file.")
+        return
+
+    # Keep the trade rows, from the first entry on (the summary rows have no action)
+    df = df[df["action"].notna()].reset_index(drop=True)
+    codes = action_codes(df["action"])
+    df, codes = df[codes >= 0], codes[codes >= 0]
+    first_entry = np.flatnonzero(codes == BUY)
+    if not len(first_entry):
+        print("❌ No trades executed. Check strategy conditions.")
+        return
+    df, codes = df.iloc[first_entry[0]:], codes[first_entry[0]:]
+    trade_prices = df["price"].to_numpy(dtype=float)
+    trade_units, trade_cash = ledger_from_prices(codes, trade_prices, initial_balance)
+
+    # Mark to market on the price bars the trades were filled on
+    trade_times = df["timestamp"].to_numpy(dtype="datetime64[ns]")
+    if table_exists(price_file):
+        prices = load_table(price_file, columns=["timestamp", "close"], parse_dates=["timestamp"]).sort_values("timestamp")
+        # Only the bars from the first entry's bar to the last exit count
+        prices = prices[prices["timestamp"] <= trade_times[-1]]
+        prices = prices.iloc[max(int((prices["timestamp"] <= trade_times[0]).sum()) - 1, 0):]
+        bar_times = prices["timestamp"].to_numpy(dtype="datetime64[ns]")
+        close = prices["close"].to_numpy(dtype=float)
+        trade_idx = np.maximum(np.searchsorted(bar_times, trade_times, side="right") - 1, 0)
+    else:
+        bar_times, close = trade_times, trade_prices
+        trade_idx = np.arange(len(df))
+    metrics = performance_metrics(
+        close, trade_idx, trade_units, trade_cash, initial_balance,
+        periods=periods_per_year(bar_times)
+    )
+    round_trips = len(trade_cash) // 2
+
+    # Display Results
+    print("\n📈 **Trading Strategy Performance:**")
+    print(f"✅ ROI (%): {metrics['roi']:.2f}%")
+    print(f"✅ Win Rate: {metrics['win_rate']:.2%}")
+    print(f"✅ Sharpe Ratio: {metrics['sharpe_ratio']:.2f}")
+    print(f"✅ Sortino Ratio: {metrics['sortino_ratio']:.2f}")
+    print(f"✅ Max Drawdown: {metrics['max_drawdown']:.2%}")
+    print(f"✅ Profit Factor: {metrics['profit_factor']:.2f}")
+    print(f"✅ Exposure: {metrics['exposure']:.2%}")
+    print(f"✅ Total Trades Executed: {round_trips}")
+    return metrics
+
+# Run Evaluation
+if __name__ == "__main__":
+    evaluate_strategy()
@@ -0,0 +1,53 @@
+import zlib
+import ccxt
+import pandas as pd
+from synthetic_data import make_price_bars
+from bitcoin_prices import timeframe_ms
+
+class FakeExchange:
+    """
+    Offline stand-in for a ccxt exchange's fetch_ohlcv, for backfill tests.
+
+    Serves seeded random-walk bars (synthetic_data.make_price_bars) for any
+    symbol between `start` and `end`, capped at `max_limit` bars per call
+    like Binance. `missing` timestamps are never returned (exchange outages)
+    and every `fail_every`-th call raises ccxt.RateLimitExceeded. `calls`
+    records each (symbol, timeframe, since, limit) request.
+    """
+
+    def __init__(self, start="2024-01-01", end="2024-04-01", timeframe="1h", max_limit=1000, missing=(), fail_every=None):
+        self.timeframe = timeframe
+        self.max_limit = max_limit
+        self.fail_every = fail_every
+        self.calls = []
+        self._start = pd.Timestamp(start)
+        self._end = pd.Timestamp(end)
+        self._missing = {int(pd.Timestamp(ts).value // 1_000_000) for ts in missing}
+        self._bars = {}
+        self.rateLimit = 0
+        self.enableRateLimit = True
+
+    def _symbol_bars(self, symbol):
+        if symbol not in self._bars:
+            step = pd.Timedelta(milliseconds=timeframe_ms(self.timeframe))
+            n = len(pd.date_range(self._start, self._end, freq=step, inclusive="left"))
+            df = make_price_bars(n, start=self._start, freq=step, seed=zlib.crc32(symbol.encode()))
+            times = df["timestamp"].dt.as_unit("ms").astype("int64").tolist()
+            prices = df[["open", "high", "low", "close", "volume"]].values.tolist()
+            self._bars[symbol] = [
+                [time] + bar for time, bar in zip(times, prices) if time not in self._missing
+            ]
+        return self._bars[symbol]
+
+    def fetch_ohlcv(self, symbol, timeframe="1m", since=None, limit=None, params=None):
+        self.calls.append((symbol, timeframe, since, limit))
+        if self.fail_every and len(self.calls) % self.fail_every == 0:
+            raise ccxt.RateLimitExceeded("fake exchange: too many requests")
+        if timeframe != self.timeframe:
+            raise ccxt.BadRequest(f"fake exchange only serves {self.timeframe} bars")
+
+        bars = self._symbol_bars(symbol)
+        limit = min(limit or self.max_limit, self.max_limit)
+        if since is None:
+            return [list(bar) for bar in bars[-limit:]]
+        return [list(bar) for bar in bars if bar[0] >= since][:limit]
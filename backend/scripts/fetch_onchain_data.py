@@ -1,99 +1,136 @@
-import requests
-import pandas as pd
-import os
-from dotenv import load_dotenv
-
-# Load API keys (No API key required for The Graph, but store URLs in .env)
-load_dotenv()
-GRAPH_API_URL_UNISWAP = os.getenv("GRAPH_API_URL_UNISWAP", "https://api.thegraph.com/subgraphs/name/uniswap/uniswap-v3")
-GRAPH_API_URL_AAVE = os.getenv("GRAPH_API_URL_AAVE", "https://api.thegraph.com/subgraphs/name/aave/protocol-v2")
-
-# Function to fetch Uniswap trading volume & liquidity
-def fetch_uniswap_data():
-    query = """
-    {
-      pools(first: 5, orderBy: volumeUSD, orderDirection: desc) {
-        id
-        volumeUSD
-        totalValueLockedUSD
-        token0 { symbol }
-        token1 { symbol }
-      }
-    }
-    """
-    response = requests.post(GRAPH_API_URL_UNISWAP, json={"query": query}).json()
-    
-    if "errors" in response:
-        print(f"❌ GraphQL Error (Uniswap): {response['errors'][0]['message']}")
-        return
-
-    pools = response.get("data", {}).get("pools", [])
-
-    if pools:
-        df = pd.DataFrame(pools)
-        df.to_csv("data/onchain_uniswap_data.csv", index=False)
-        print("✅ Uniswap data saved to data/onchain_uniswap_data.csv")
-    else:
-        print("⚠️ No Uniswap data found!")
-
-# Function to fetch Aave token, reward token, and totalLiquidity data
-def fetch_aave_data():
-    query = """
-    {
-      tokens(first: 5) {
-        id
-        name
-        symbol
-        decimals
-      }
-      rewardTokens(first: 5) {
-        id
-        token { id }
-        type
-        _distributionEnd
-      }
-      # reserves(first: 5, orderBy: totalLiquidity, orderDirection: desc) {
-      #   id
-      #   symbol
-      #   totalLiquidity
-      # }
-    }
-    """
-    response = requests.post(GRAPH_API_URL_AAVE, json={"query": query}).json()
-
-    if "errors" in response:
-        print(f"❌ GraphQL Error (Aave): {response['errors'][0]['message']}")
-        return
-
-    # Extract data from API response
-    tokens = response.get("data", {}).get("tokens", [])
-    reward_tokens = response.get("data", {}).get("rewardTokens", [])
-    reserves = response.get("data", {}).get("reserves", [])
-
-    # Save token data
-    if tokens:
-        df_tokens = pd.DataFrame(tokens)
-        df_tokens.to_csv("data/onchain_aave_tokens.csv", index=False)
-        print("✅ Aave token data saved to data/onchain_aave_tokens.csv")
-    else:
-        print("⚠️ No Aave tokens found!")
-
-    # Save reward token data
-    if reward_tokens:
-        df_rewards = pd.DataFrame(reward_tokens)
-        df_rewards.to_csv("data/onchain_aave_rewards.csv", index=False)
-        print("✅ Aave reward token data saved to data/onchain_aave_rewards.csv")
-    else:
-        print("⚠️ No Aave reward tokens found!")
-
-    # Save reserves (liquidity data)
-    if reserves:
-        df_reserves = pd.DataFrame(reserves)
-        df_reserves.to_csv("data/onchain_aave_liquidity.csv", index=False)
-        print("✅ Aave liquidity data saved to data/onchain_aave_liquidity.csv")
-    else:
-        print("⚠️ No Aave liquidity data found!")
-
-if __name__ == "__main__":
-    fetch_uniswap_data()
-    fetch_aave_data()
+import requests
+import pandas as pd
+import os
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from storage import save_table
+
+# Load API keys (No API key required for The Graph, but store URLs in .env)
+load_dotenv()
+GRAPH_API_URL_UNISWAP = os.getenv("GRAPH_API_URL_UNISWAP", "https://api.thegraph.com/subgraphs/name/uniswap/uniswap-v3")
+GRAPH_API_URL_AAVE = os.getenv("GRAPH_API_URL_AAVE", "https://api.thegraph.com/subgraphs/name/aave/protocol-v2")
+REQUEST_TIMEOUT = float(os.getenv("GRAPH_API_TIMEOUT", "30"))
+
+def make_session(retries=4, backoff_factor=0.5, pool_size=10):
+    """HTTP session with pooled keep-alive connections and retries with backoff on 429/5xx."""
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=None,
+        respect_retry_after_header=True
+    )
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=pool_size, pool_maxsize=pool_size)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+# Shared by every query in this module so connections are reused
+session = make_session()
+
+def post_graphql(url, query, variables=None):
+    """POST a GraphQL query through the shared session and return the decoded response."""
+    payload = {"query": query}
+    if variables:
+        payload["variables"] = variables
+    response = session.post(url, json=payload, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    return response.json()
+
+UNISWAP_POOLS_QUERY = """
+    {
+      pools(first: 5, orderBy: volumeUSD, orderDirection: desc) {
+        id
+        volumeUSD
+        totalValueLockedUSD
+        token0 { symbol }
+        token1 { symbol }
+      }
+    }
+    """
+
+# Function to fetch Uniswap trading volume & liquidity
+def fetch_uniswap_data():
+    save_uniswap_data(post_graphql(GRAPH_API_URL_UNISWAP, UNISWAP_POOLS_QUERY))
+
+def save_uniswap_data(response):
+    """Save the pools of a Uniswap GraphQL response."""
+    if "errors" in response:
+        print(f"❌ GraphQL Error (Uniswap): {response['errors'][0]['message']}")
+        return
+
+    pools = response.get("data", {}).get("pools", [])
+
+    if pools:
+        df = pd.DataFrame(pools)
+        save_table(df, "data/onchain_uniswap_data.csv")
+        print("✅ Uniswap data saved to data/onchain_uniswap_data.csv")
+    else:
+        print("⚠️ No Uniswap data found!")
+
+AAVE_QUERY = """
+    {
+      tokens(first: 5) {
+        id
+        name
+        symbol
+        decimals
+      }
+      rewardTokens(first: 5) {
+        id
+        token { id }
+        type
+        _distributionEnd
+      }
+      # reserves(first: 5, orderBy: totalLiquidity, orderDirection: desc) {
+      #   id
+      #   symbol
+      #   totalLiquidity
+      # }
+    }
+    """
+
+# Function to fetch Aave token, reward token, and totalLiquidity data
+def fetch_aave_data():
+    save_aave_data(post_graphql(GRAPH_API_URL_AAVE, AAVE_QUERY))
+
+def save_aave_data(response):
+    """Save the tokens, reward tokens and reserves of an Aave GraphQL response."""
+    if "errors" in response:
+        print(f"❌ GraphQL Error (Aave): {response['errors'][0]['message']}")
+        return
+
+    # Extract data from API response
+    tokens = response.get("data", {}).get("tokens", [])
+    reward_tokens = response.get("data", {}).get("rewardTokens", [])
+    reserves = response.get("data", {}).get("reserves", [])
+
+    # Save token data
+    if tokens:
+        df_tokens = pd.DataFrame(tokens)
+        save_table(df_tokens, "data/onchain_aave_tokens.csv")
+        print("✅ Aave token data saved to data/onchain_aave_tokens.csv")
+    else:
+        print("⚠️ No Aave tokens found!")
+
+    # Save reward token data
+    if reward_tokens:
+        df_rewards = pd.DataFrame(reward_tokens)
+        save_table(df_rewards, "data/onchain_aave_rewards.csv")
+        print("✅ Aave reward token data saved to data/onchain_aave_rewards.csv")
+    else:
+        print("⚠️ No Aave reward tokens found!")
+
+    # Save reserves (liquidity data)
+    if reserves:
+        df_reserves = pd.DataFrame(reserves)
+        save_table(df_reserves, "data/onchain_aave_liquidity.csv")
+        print("✅ Aave liquidity data saved to data/onchain_aave_liquidity.csv")
+    else:
+        print("⚠️ No Aave liquidity data found!")
+
+if __name__ == "__main__":
+    fetch_uniswap_data()
+    fetch_aave_data()
@@ -1,33 +1,66 @@
-import praw
-import os
-import pandas as pd
-from dotenv import load_dotenv
-from datetime import datetime
-
-# Load API keys from .env
-load_dotenv()
-
-REDDIT_CLIENT_ID = os.getenv("REDDIT_CLIENT_ID")
-REDDIT_CLIENT_SECRET = os.getenv("REDDIT_CLIENT_SECRET")
-USER_AGENT = os.getenv("REDDIT_USER_AGENT")
-
-# Initialize Reddit API client
-reddit = praw.Reddit(client_id=REDDIT_CLIENT_ID, client_secret=REDDIT_CLIENT_SECRET, user_agent=USER_AGENT)
-
-def fetch_reddit_posts(subreddit_name="cryptocurrency", limit=1000):
-    """Fetch top posts from a subreddit with timestamps."""
-    subreddit = reddit.subreddit(subreddit_name)
-    posts = [{
-        "title": post.title, 
-        "upvotes": post.score, 
-        "comments": post.num_comments, 
-        "timestamp": datetime.utcfromtimestamp(post.created_utc).strftime('%Y-%m-%d %H:%M:%S')
-    } for post in subreddit.hot(limit=limit)]
-    
-    df = pd.DataFrame(posts)
-    df.to_csv("data/reddit_data.csv", index=False)
-    print(f"✅ {len(df)} posts saved to reddit_data.csv")
-
-# Example usage
-if __name__ == "__main__":
-    fetch_reddit_posts()
+import praw
+import os
+import pandas as pd
+from dotenv import load_dotenv
+from datetime import datetime
+from storage import save_table
+from reddit_store import ingest_posts
+
+# Load API keys from .env
+load_dotenv()
+
+REDDIT_CLIENT_ID = os.getenv("REDDIT_CLIENT_ID")
+REDDIT_CLIENT_SECRET = os.getenv("REDDIT_CLIENT_SECRET")
+USER_AGENT = os.getenv("REDDIT_USER_AGENT")
+
+# Initialize Reddit API client
+reddit = praw.Reddit(client_id=REDDIT_CLIENT_ID, client_secret=REDDIT_CLIENT_SECRET, user_agent=USER_AGENT)
+
+def fetch_reddit_posts(subreddit_name="cryptocurrency", limit=1000):
+    """Fetch top posts from a subreddit with timestamps."""
+    subreddit = reddit.subreddit(subreddit_name)
+    posts = [{
+        "title": post.title, 
+        "upvotes": post.score, 
+        "comments": post.num_comments, 
+        "timestamp": datetime.utcfromtimestamp(post.created_utc).replace(microsecond=0)
+    } for post in subreddit.hot(limit=limit)]
+    
+    df = pd.DataFrame(posts)
+    save_table(df, "data/reddit_data.csv")
+    print(f"✅ {len(df)} posts saved to reddit_data.csv")
+
+def ingest_reddit_posts(
+    subreddit_name="cryptocurrency",
+    limit=1000,
+    listing="hot",
+    reddit_client=None,
+    store_file="data/reddit_data.csv"
+):
+    """
+    Append only unseen posts to the Reddit store instead of overwriting it.
+
+    Posts are skipped when their ID or title hash is already in the store.
+    The newest post time ingested per subreddit and listing is kept as a
+    high-water mark; with listing="new" the fetch stops as soon as it
+    reaches posts at or below it, so repeat runs only page through new
+    posts. Other listings keep their own marks, so a "hot" run never moves
+    the mark a "new" run stops at past posts it hasn't stored.
+
+    Args:
+        subreddit_name: Subreddit to read
+        limit: Maximum posts to request
+        listing: "hot", "new" or "top"
+        reddit_client: PRAW-like client (defaults to the configured one)
+        store_file: Append-only post store
+
+    Returns:
+        DataFrame of the posts that were added
+    """
+    reddit_client = reddit_client or reddit
+    posts = getattr(reddit_client.subreddit(subreddit_name), listing)(limit=limit)
+    return ingest_posts(posts, subreddit_name, listing=listing, store_file=store_file)
+
+# Example usage
+if __name__ == "__main__":
+    ingest_reddit_posts()
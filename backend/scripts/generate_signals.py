@@ -1,60 +1,181 @@
-import os
-import pandas as pd
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
-
-def generate_trading_signals(input_file="data/reddit_sentiment.csv", output_file="data/trading_signals.csv", window=10):
-    """Generate Buy/Sell/Hold signals based on Reddit sentiment trends."""
-
-    # Load the data
-    df = pd.read_csv(input_file)
-
-    # Debugging: Print columns to verify
-    print("Columns in the input file:", df.columns)
-
-    # Check if 'sentiment_label' column exists
-    if "sentiment_label" not in df.columns:
-        print("⚠️ No 'sentiment_label' column found. Run sentiment analysis first.")
-        return
-
-    # Check if 'timestamp' column exists (or an alternative name)
-    timestamp_column = "timestamp"  # Default column name
-    if timestamp_column not in df.columns:
-        # Look for alternative column names (e.g., 'date', 'time', 'created_at')
-        possible_timestamp_columns = ["date", "time", "created_at", "datetime"]
-        for col in possible_timestamp_columns:
-            if col in df.columns:
-                timestamp_column = col
-                print(f"⚠️ 'timestamp' column not found. Using '{col}' as the timestamp column.")
-                break
-        else:
-            raise KeyError(f"No timestamp column found. Expected one of: {['timestamp'] + possible_timestamp_columns}")
-
-    # Convert timestamp to datetime (if not already)
-    if not pd.api.types.is_datetime64_any_dtype(df[timestamp_column]):
-        df[timestamp_column] = pd.to_datetime(df[timestamp_column])
-
-    # Convert sentiment to numerical values
-    df["bullish"] = (df["sentiment_label"] == "bullish").astype(int)
-    df["bearish"] = (df["sentiment_label"] == "bearish").astype(int)
-
-    # Calculate rolling sentiment trend (last 'window' posts)
-    df["bullish_trend"] = df["bullish"].rolling(window=window, min_periods=1).mean()
-    df["bearish_trend"] = df["bearish"].rolling(window=window, min_periods=1).mean()
-
-    # Generate Buy/Sell/Hold signals
-    df["signal"] = df.apply(
-        lambda row: "BUY" if row["bullish_trend"] > 0.6 else 
-                    "SELL" if row["bearish_trend"] > 0.6 else "HOLD", 
-        axis=1
-    )
-
-    # Save signals to file
-    df[[timestamp_column, "sentiment_label", "bullish_trend", "bearish_trend", "signal"]].to_csv(output_file, index=False)
-    print(f"✅ Trading signals saved to {output_file}")
-
-# Run trading signal generation
-if __name__ == "__main__":
-    generate_trading_signals()
\ No newline at end of file
+import os
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+from storage import append_table, load_table, save_table
+from pipeline_state import mark_processed, read_delta
+from profiling import profiled, stage
+
+# Load environment variables
+load_dotenv()
+
+def is_time_window(window):
+    """True for time windows like "1h" or "24h", False for post counts."""
+    return isinstance(window, str) and not window.isdigit()
+
+def rolling_trends(df, timestamp_column="timestamp", windows=(10,)):
+    """
+    Rolling share of bullish and bearish posts for several windows at once.
+
+    Integer windows cover the last N posts in file order; time windows
+    ("1h", "24h", any pandas offset) cover the posts in the trailing period
+    up to each post's timestamp. Posts are sorted by time once for all time
+    windows and the results put back in file order.
+
+    Returns:
+        Dict of window -> (bullish_trend, bearish_trend) NumPy arrays
+    """
+    bullish = (df["sentiment_label"] == "bullish").astype(float)
+    bearish = (df["sentiment_label"] == "bearish").astype(float)
+    trends = {}
+
+    time_windows = [window for window in windows if is_time_window(window)]
+    if time_windows:
+        order = np.argsort(df[timestamp_column].to_numpy(dtype="datetime64[ns]"), kind="stable")
+        flags = pd.DataFrame(
+            {"bullish": bullish.to_numpy()[order], "bearish": bearish.to_numpy()[order]},
+            index=pd.DatetimeIndex(df[timestamp_column].to_numpy(dtype="datetime64[ns]")[order])
+        )
+        inverse = np.empty_like(order)
+        inverse[order] = np.arange(len(order))
+        for window in time_windows:
+            rolled = flags.rolling(window, min_periods=1).mean()
+            trends[window] = (rolled["bullish"].to_numpy()[inverse], rolled["bearish"].to_numpy()[inverse])
+
+    for window in windows:
+        if not is_time_window(window):
+            trends[window] = (
+                bullish.rolling(window=int(window), min_periods=1).mean().to_numpy(),
+                bearish.rolling(window=int(window), min_periods=1).mean().to_numpy(),
+            )
+    return trends
+
+def signal_rules(bullish_trend, bearish_trend, buy_threshold=0.6, sell_threshold=0.6):
+    """
+    BUY where the bullish share is above `buy_threshold`, else SELL where the
+    bearish share is above `sell_threshold`, else HOLD (NaN trends HOLD).
+    """
+    return np.select(
+        [np.asarray(bullish_trend) > buy_threshold, np.asarray(bearish_trend) > sell_threshold],
+        ["BUY", "SELL"],
+        default="HOLD"
+    )
+
+def _count_reach(windows):
+    """Already-processed rows the post-count windows reach back to."""
+    return max([int(window) - 1 for window in windows if not is_time_window(window)] + [0])
+
+@profiled("generate_signals")
+def generate_trading_signals(
+    input_file="data/reddit_sentiment.csv",
+    output_file="data/trading_signals.csv",
+    window=10,
+    delta=False,
+    buy_threshold=0.6,
+    sell_threshold=0.6,
+    windows=None
+):
+    """
+    Generate Buy/Sell/Hold signals based on Reddit sentiment trends.
+
+    `window` (post count, or a time window like "1h") drives the
+    bullish_trend/bearish_trend/signal columns. Each extra window in
+    `windows` adds bullish_trend_<w>, bearish_trend_<w> and signal_<w>
+    columns from the same rules, all in one pass.
+
+    With `delta`, only rows appended to the input since the last delta run
+    get signals, which are appended to the output. The rows before them
+    that the windows reach back to are re-read so the rolling trends match
+    a full run (for time windows, as long as appended posts are newer than
+    the ones already processed).
+    """
+    extra_windows = [w for w in (windows or []) if w != window]
+    all_windows = [window] + extra_windows
+
+    # Load the data
+    context_rows = 0
+    with stage("load_data") as loaded:
+        if delta:
+            # Time windows may reach any number of rows back: the processed
+            # rows within the longest one of the checkpoint's last timestamp
+            # are read by a filter, and trimmed further below
+            time_windows = [pd.Timedelta(w) for w in all_windows if is_time_window(w)]
+            df, context, total_rows, reset = read_delta(
+                input_file, "generate_signals", parse_dates=["timestamp"],
+                context_rows=_count_reach(all_windows),
+                context_window=max(time_windows) if time_windows else None
+            )
+            if len(df) == 0 and not reset:
+                print("✅ No new sentiment rows since the last run.")
+                return
+            context_rows = len(context)
+            df = pd.concat([context, df], ignore_index=True)
+        else:
+            df = load_table(input_file)
+        loaded["rows"] = len(df)
+
+    # Debugging: Print columns to verify
+    print("Columns in the input file:", df.columns)
+
+    # Check if 'sentiment_label' column exists
+    if "sentiment_label" not in df.columns:
+        print("⚠️ No 'sentiment_label' column found. Run sentiment analysis first.")
+        return
+
+    # Check if 'timestamp' column exists (or an alternative name)
+    timestamp_column = "timestamp"  # Default column name
+    if timestamp_column not in df.columns:
+        # Look for alternative column names (e.g., 'date', 'time', 'created_at')
+        possible_timestamp_columns = ["date", "time", "created_at", "datetime"]
+        for col in possible_timestamp_columns:
+            if col in df.columns:
+                timestamp_column = col
+                print(f"⚠️ 'timestamp' column not found. Using '{col}' as the timestamp column.")
+                break
+        else:
+            raise KeyError(f"No timestamp column found. Expected one of: {['timestamp'] + possible_timestamp_columns}")
+
+    # Convert timestamp to datetime (if not already)
+    if not pd.api.types.is_datetime64_any_dtype(df[timestamp_column]):
+        df[timestamp_column] = pd.to_datetime(df[timestamp_column])
+
+    # Time windows only need the context rows inside the longest window
+    time_windows = [pd.Timedelta(w) for w in all_windows if is_time_window(w)]
+    if context_rows and time_windows:
+        new_times = df[timestamp_column].iloc[context_rows:]
+        if len(new_times):
+            earliest = new_times.min() - max(time_windows)
+            context = df.iloc[:context_rows]
+            keep = context[timestamp_column] >= earliest
+            keep.iloc[max(context_rows - _count_reach(all_windows), 0):] = True
+            df = pd.concat([context[keep], df.iloc[context_rows:]], ignore_index=True)
+            context_rows = int(keep.sum())
+
+    # Rolling sentiment trends (per window) and Buy/Sell/Hold signals
+    with stage("trends", rows=len(df)):
+        trends = rolling_trends(df, timestamp_column, all_windows)
+    with stage("signals", rows=len(df)):
+        columns = [timestamp_column, "sentiment_label", "bullish_trend", "bearish_trend", "signal"]
+        for w in all_windows:
+            bullish_trend, bearish_trend = trends[w]
+            suffix = "" if w == window else f"_{w}"
+            df[f"bullish_trend{suffix}"] = bullish_trend
+            df[f"bearish_trend{suffix}"] = bearish_trend
+            df[f"signal{suffix}"] = signal_rules(bullish_trend, bearish_trend, buy_threshold, sell_threshold)
+            if suffix:
+                columns += [f"bullish_trend{suffix}", f"bearish_trend{suffix}", f"signal{suffix}"]
+
+    # Save signals to file (context rows already have their signals)
+    output = df[columns].iloc[context_rows:]
+    with stage("write_results", rows=len(output)):
+        if delta and not reset:
+            append_table(output, output_file)
+        else:
+            save_table(output, output_file)
+    if delta:
+        mark_processed("generate_signals", input_file, total_rows, last_timestamp=df[timestamp_column].max())
+    print(f"✅ Trading signals saved to {output_file} ({len(output)} rows processed)")
+
+# Run trading signal generation
+if __name__ == "__main__":
+    generate_trading_signals()
@@ -0,0 +1,138 @@
+import os
+import hashlib
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from typing import Optional
+
+def calculate_rsi(prices: pd.Series, period: int = 14) -> pd.Series:
+    """Calculate Relative Strength Index."""
+    delta = prices.diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+
+    rs = gain / loss
+    return 100 - (100 / (1 + rs))
+
+def fingerprint(prices) -> str:
+    """Hash a price series (values, dtype and length) into a short cache key."""
+    values = np.ascontiguousarray(np.asarray(prices, dtype=float))
+    digest = hashlib.blake2b(values.view(np.uint8), digest_size=16)
+    digest.update(str(values.shape).encode())
+    return digest.hexdigest()
+
+def _rolling_mean(cache, prices, window, key):
+    return pd.Series(prices).rolling(window=window).mean().to_numpy()
+
+def _rolling_std(cache, prices, window, key):
+    return pd.Series(prices).rolling(window=window).std().to_numpy()
+
+def _upper_band(cache, prices, window, key):
+    return cache.get(prices, "sma", window, key) + (cache.get(prices, "std", window, key) * 2)
+
+def _lower_band(cache, prices, window, key):
+    return cache.get(prices, "sma", window, key) - (cache.get(prices, "std", window, key) * 2)
+
+def _rsi(cache, prices, window, key):
+    return calculate_rsi(pd.Series(prices), period=window).to_numpy()
+
+# Indicator name -> function(cache, prices, window, key) returning an array
+INDICATORS = {
+    "sma": _rolling_mean,
+    "std": _rolling_std,
+    "upper_band": _upper_band,
+    "lower_band": _lower_band,
+    "rsi": _rsi,
+}
+
+class IndicatorCache:
+    """
+    Memoize indicator arrays by (price fingerprint, indicator, window).
+
+    Arrays are kept in an in-memory LRU bounded by `max_bytes`. When
+    `cache_dir` is set, every computed array is also written there as .npy
+    so later runs (and other processes) load it instead of recomputing.
+    Returned arrays are read-only because they are shared between callers.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024, cache_dir: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def get(self, prices, indicator: str, window: int, key: Optional[str] = None) -> np.ndarray:
+        """
+        Return `indicator` over `prices` for `window`, computing it only on a miss.
+
+        Pass `key` (from fingerprint()) when querying the same series
+        repeatedly to skip re-hashing it.
+        """
+        if indicator not in INDICATORS:
+            raise ValueError(f"Unknown indicator '{indicator}'. Expected one of: {list(INDICATORS)}")
+        key = key or fingerprint(prices)
+        entry = (key, indicator, int(window))
+
+        if entry in self._entries:
+            self._entries.move_to_end(entry)
+            self.hits += 1
+            return self._entries[entry]
+
+        path = self._disk_path(entry)
+        if path and os.path.exists(path):
+            values = np.load(path)
+            self.disk_hits += 1
+        else:
+            values = np.asarray(INDICATORS[indicator](self, prices, window, key), dtype=float)
+            self.misses += 1
+            if path:
+                # Write atomically so concurrent workers never read a partial file
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    np.save(f, values)
+                os.replace(tmp_path, path)
+
+        values.flags.writeable = False
+        self._store(entry, values)
+        return values
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current memory usage."""
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+        }
+
+    def clear(self):
+        """Drop in-memory entries and reset counters (the disk tier is kept)."""
+        self._entries.clear()
+        self._bytes = 0
+        self.hits = self.disk_hits = self.misses = 0
+
+    def _disk_path(self, entry) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        key, indicator, window = entry
+        return os.path.join(self.cache_dir, f"{key}_{indicator}_{window}.npy")
+
+    def _store(self, entry, values: np.ndarray):
+        if values.nbytes > self.max_bytes:
+            return
+        self._entries[entry] = values
+        self._bytes += values.nbytes
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.nbytes
+
+# Process-wide cache used by backtest_strategy.add_indicators
+default_cache = IndicatorCache()
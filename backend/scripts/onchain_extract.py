@@ -0,0 +1,232 @@
+import os
+import json
+import asyncio
+import logging
+import pandas as pd
+from pathlib import Path
+from storage import load_table, save_table
+from collector import Collector, fetch_graphql
+from fetch_onchain_data import GRAPH_API_URL_AAVE, GRAPH_API_URL_UNISWAP
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# Entities the bulk extractor can page through. `timestamp` is the unix-seconds
+# field turned into the `timestamp` column combine_data joins on; `numeric`
+# fields arrive as GraphQL BigDecimal/BigInt strings and are cast to float.
+ENTITIES = {
+    "pools": {
+        "source": "uniswap",
+        "filter_type": "Pool_filter",
+        "fields": "id createdAtTimestamp feeTier volumeUSD totalValueLockedUSD txCount token0 { symbol } token1 { symbol }",
+        "timestamp": "createdAtTimestamp",
+        "numeric": ["feeTier", "volumeUSD", "totalValueLockedUSD", "txCount"],
+        "output": "data/onchain_uniswap_pools.csv",
+    },
+    "poolDayDatas": {
+        "source": "uniswap",
+        "filter_type": "PoolDayData_filter",
+        "fields": "id date pool { id } volumeUSD tvlUSD feesUSD txCount open high low close",
+        "timestamp": "date",
+        "numeric": ["volumeUSD", "tvlUSD", "feesUSD", "txCount", "open", "high", "low", "close"],
+        "output": "data/onchain_uniswap_pool_day_data.csv",
+    },
+    "poolHourDatas": {
+        "source": "uniswap",
+        "filter_type": "PoolHourData_filter",
+        "fields": "id periodStartUnix pool { id } volumeUSD tvlUSD feesUSD txCount open high low close",
+        "timestamp": "periodStartUnix",
+        "numeric": ["volumeUSD", "tvlUSD", "feesUSD", "txCount", "open", "high", "low", "close"],
+        "output": "data/onchain_uniswap_pool_hour_data.csv",
+    },
+    # One row per reserve with its current state: a snapshot, not history
+    # (lastUpdateTimestamp is when the reserve last changed)
+    "reserves": {
+        "source": "aave",
+        "filter_type": "Reserve_filter",
+        "fields": "id symbol name decimals totalLiquidity availableLiquidity liquidityRate variableBorrowRate lastUpdateTimestamp",
+        "timestamp": "lastUpdateTimestamp",
+        "numeric": ["decimals", "totalLiquidity", "availableLiquidity", "liquidityRate", "variableBorrowRate"],
+        "output": "data/onchain_aave_reserves.csv",
+    },
+    # Reserve history: one row per reserve update, what combine_data joins
+    # for Aave (rates are ray-scaled, amounts in the reserve's token units)
+    "reserveParamsHistoryItems": {
+        "source": "aave",
+        "filter_type": "ReserveParamsHistoryItem_filter",
+        "fields": "id timestamp reserve { id symbol } liquidityRate variableBorrowRate utilizationRate totalLiquidity availableLiquidity",
+        "timestamp": "timestamp",
+        "numeric": ["liquidityRate", "variableBorrowRate", "utilizationRate", "totalLiquidity", "availableLiquidity"],
+        "output": "data/onchain_aave_reserve_history.csv",
+    },
+}
+SOURCE_URLS = {"uniswap": GRAPH_API_URL_UNISWAP, "aave": GRAPH_API_URL_AAVE}
+EXTRACT_DIR = "data/onchain_extract"
+
+def shard_bounds(shards):
+    """
+    Split the id space into `shards` ranges that can be paged in parallel.
+
+    Subgraph ids are lowercase hex ("0x..." addresses, or addresses with a
+    suffix), so the ranges split on the first hex digit after "0x".
+
+    Returns:
+        List of (id_gt, id_lt) pairs; id_lt is None for the last range
+    """
+    if shards < 1 or 16 % shards:
+        raise ValueError(f"shards must divide 16, got {shards}")
+    edges = [f"0x{digit:x}" for digit in range(0, 16, 16 // shards)][1:]
+    return list(zip([""] + edges, edges + [None]))
+
+def page_query(entity, spec):
+    """GraphQL query for one id-ordered page of `entity` inside a where filter."""
+    return f"""
+    query Page($first: Int!, $where: {spec['filter_type']}) {{
+      {entity}(first: $first, orderBy: id, orderDirection: asc, where: $where) {{
+        {spec['fields']}
+      }}
+    }}
+    """
+
+def to_typed_frame(rows, spec):
+    """Flatten nested fields and cast numbers and the timestamp column."""
+    df = pd.json_normalize(rows, sep="_")
+    for column in spec["numeric"]:
+        if column in df.columns:
+            df[column] = pd.to_numeric(df[column], errors="coerce").astype(float)
+    if spec["timestamp"] in df.columns:
+        df[spec["timestamp"]] = pd.to_numeric(df[spec["timestamp"]]).astype("int64")
+        df["timestamp"] = pd.to_datetime(df[spec["timestamp"]], unit="s")
+    return df
+
+class Checkpoint:
+    """
+    Per-entity extraction progress: the last id fetched in each shard and
+    how many page files it wrote. Saved atomically after every page.
+    """
+
+    def __init__(self, directory, shards, page_size, where, resume=True):
+        self.path = Path(directory) / "checkpoint.json"
+        settings = {"shards": shards, "page_size": page_size, "where": where}
+        state = json.loads(self.path.read_text()) if self.path.exists() else None
+        if state is None or state["settings"] != settings or not resume:
+            if state is not None:
+                logging.info(f"⚠️ Restarting {directory} from scratch (new settings or resume=False).")
+                for part in Path(directory).glob("part-*"):
+                    part.unlink()
+            state = {
+                "settings": settings,
+                "shards": {str(i): {"last_id": None, "parts": 0, "done": False} for i in range(shards)},
+            }
+        self.state = state
+
+    def shard(self, index):
+        return self.state["shards"][str(index)]
+
+    @property
+    def done(self):
+        return all(shard["done"] for shard in self.state["shards"].values())
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self.state, indent=2))
+        os.replace(tmp_path, self.path)
+
+async def _extract_shard(collector, url, entity, spec, bounds, index, checkpoint, directory, page_size, where, max_pages):
+    """Page one id range with id_gt cursors, saving each page and the cursor as it goes."""
+    shard = checkpoint.shard(index)
+    lower, upper = bounds
+    query = page_query(entity, spec)
+    pages = 0
+    while not shard["done"]:
+        if max_pages is not None and pages >= max_pages:
+            return
+        page_where = {**where, "id_gt": shard["last_id"] or lower}
+        if upper is not None:
+            page_where["id_lt"] = upper
+        response = await fetch_graphql(collector, spec["source"], url, query, {"first": page_size, "where": page_where})
+        if "errors" in response:
+            raise RuntimeError(f"GraphQL Error ({entity}): {response['errors'][0]['message']}")
+
+        rows = response["data"][entity]
+        if rows:
+            save_table(
+                to_typed_frame(rows, spec),
+                Path(directory) / f"part-{index:02d}-{shard['parts']:06d}.csv",
+                export_csv=False
+            )
+            shard["parts"] += 1
+            shard["last_id"] = rows[-1]["id"]
+        shard["done"] = len(rows) < page_size
+        checkpoint.save()
+        pages += 1
+
+async def extract_entity(
+    entity,
+    url=None,
+    page_size=1000,
+    shards=4,
+    where=None,
+    output_file=None,
+    extract_dir=EXTRACT_DIR,
+    limits=None,
+    max_pages=None,
+    resume=True
+):
+    """
+    Bulk-extract every `entity` row from its subgraph with id_gt cursor paging.
+
+    The id space is split into `shards` ranges paged concurrently (each one
+    sequentially, since a page's cursor is the previous page's last id).
+    Every page is written to `extract_dir/<entity>/` and the cursors are
+    checkpointed, so an interrupted run resumes where it stopped. Once all
+    shards are exhausted the pages are combined into one typed table with a
+    `timestamp` column.
+
+    Args:
+        entity: Key of ENTITIES ("pools", "poolDayDatas", "poolHourDatas",
+            "reserves", "reserveParamsHistoryItems")
+        url: Subgraph endpoint (defaults to the source's GRAPH_API_URL_*)
+        page_size: Rows per request (The Graph allows up to 1000)
+        shards: Number of id ranges fetched in parallel (must divide 16)
+        where: Extra filter, e.g. {"date_gt": 1704067200}
+        output_file: Combined table (defaults to the entity's output)
+        extract_dir: Where pages and checkpoints are kept
+        limits: Collector rate/concurrency overrides
+        max_pages: Stop each shard after this many pages (the run can be resumed)
+        resume: Continue from the checkpoint; False starts over (e.g. to refresh)
+
+    Returns:
+        Combined DataFrame, or None if the extraction is not finished yet
+    """
+    spec = ENTITIES[entity]
+    url = url or SOURCE_URLS[spec["source"]]
+    where = where or {}
+    output_file = output_file or spec["output"]
+    directory = Path(extract_dir) / entity
+    checkpoint = Checkpoint(directory, shards, page_size, where, resume=resume)
+
+    async with Collector(limits=limits) as collector:
+        await asyncio.gather(*(
+            _extract_shard(collector, url, entity, spec, bounds, index, checkpoint, directory, page_size, where, max_pages)
+            for index, bounds in enumerate(shard_bounds(shards))
+        ))
+
+    if not checkpoint.done:
+        logging.info(f"⏸️ {entity}: stopped before the end; run again to resume.")
+        return None
+
+    parts = sorted(path for path in directory.glob("part-*") if path.suffix in (".parquet", ".feather", ".csv"))
+    frames = [load_table(part, parse_dates=["timestamp"]) for part in parts]
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=["id", "timestamp"])
+    save_table(df, output_file)
+    logging.info(f"✅ {len(df)} {entity} saved to {output_file}")
+    return df
+
+def extract_onchain_data(entities=("pools", "poolDayDatas", "poolHourDatas", "reserves", "reserveParamsHistoryItems"), **kwargs):
+    """Run extract_entity for several entities, one after another."""
+    return {entity: asyncio.run(extract_entity(entity, **kwargs)) for entity in entities}
+
+if __name__ == "__main__":
+    extract_onchain_data()
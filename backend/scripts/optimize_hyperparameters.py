@@ -1,88 +1,93 @@
-import pandas as pd
-import numpy as np
-from backtest_strategy import backtest_trading_strategy
-
-# Hyperparameter ranges
-atr_multipliers = [1.5, 2.0, 2.5, 3.0]  # ATR stop-loss factors
-take_profits = [0.05, 0.10, 0.15]  # Take-profit levels (5%, 10%, 15%)
-risk_per_trades = [0.01, 0.02]  # Risk 1% or 2% of balance per trade
-rsi_lowers = [30, 40]  # RSI lower thresholds for uptrend confirmation
-rsi_uppers = [60, 70]  # RSI upper thresholds for downtrend confirmation
-
-# Store results
-results = []
-
-# Ensure data files exist before running
-try:
-    sentiment_file = "data/reddit_sentiment.csv"
-    price_file = "data/historical_prices.csv"
-    sentiment_data = pd.read_csv(sentiment_file)
-    price_data = pd.read_csv(price_file)
-    print("✅ Data loaded successfully.")
-except Exception as e:
-    print(f"❌ Error loading data: {e}")
-    exit()
-
-# Loop through hyperparameter combinations
-for atr in atr_multipliers:
-    for tp in take_profits:
-        for risk in risk_per_trades:
-            for rsi_lower in rsi_lowers:
-                for rsi_upper in rsi_uppers:
-                    print(f"🔄 Testing ATR Multiplier: {atr}, Take-Profit: {tp*100}%, Risk per Trade: {risk*100}%, RSI Lower: {rsi_lower}, RSI Upper: {rsi_upper}")
-                    
-                    try:
-                        # Run backtest with current hyperparameters
-                        backtest_trading_strategy(
-                            sentiment_file=sentiment_file,
-                            price_file=price_file,
-                            output_file="data/backtest_results.csv",
-                            initial_balance=1000,
-                            risk_per_trade=risk,
-                            atr_multiplier=atr,
-                            take_profit=tp,
-                            rsi_lower=rsi_lower,
-                            rsi_upper=rsi_upper
-                        )
-
-                        # Load results and extract performance metrics
-                        results_df = pd.read_csv("data/backtest_results.csv")
-                        
-                        # Check if DataFrame is empty or missing required columns
-                        if results_df.empty or "price" not in results_df.columns:
-                            print("⚠️ No results found or 'price' column missing. Skipping this combination.")
-                            continue
-
-                        final_balance = results_df.iloc[-1]["price"]
-                        roi = ((final_balance - 1000) / 1000) * 100
-                        total_trades = len(results_df)
-
-                        # Calculate additional metrics
-                        returns = results_df["price"].pct_change().dropna()
-                        sharpe_ratio = (returns.mean() / returns.std()) * np.sqrt(252) if not returns.std() == 0 else 0
-                        max_drawdown = (results_df["price"].cummax() - results_df["price"]).max()
-
-                        results.append({
-                            "ATR Multiplier": atr,
-                            "Take-Profit (%)": tp * 100,
-                            "Risk per Trade (%)": risk * 100,
-                            "RSI Lower": rsi_lower,
-                            "RSI Upper": rsi_upper,
-                            "Final Balance": final_balance,
-                            "ROI (%)": roi,
-                            "Total Trades": total_trades,
-                            "Sharpe Ratio": sharpe_ratio,
-                            "Max Drawdown": max_drawdown
-                        })
-
-                    except Exception as e:
-                        print(f"❌ Error occurred with ATR={atr}, TP={tp}, Risk={risk}, RSI Lower={rsi_lower}, RSI Upper={rsi_upper}: {e}")
-
-# Convert results to DataFrame and save
-if results:
-    results_df = pd.DataFrame(results)
-    results_df.to_csv("data/hyperparameter_optimization_results.csv", index=False)
-    print("\n✅ Hyperparameter tuning complete! Results saved to data/hyperparameter_optimization_results.csv")
-    print(results_df)
-else:
-    print("\n❌ No results to save. Check for errors in the backtesting process.")
+from backtest_strategy import load_backtest_data
+from parallel_sweep import parameter_grid, run_parameter_sweep
+from walk_forward import PARAMETER_SPACE, run_search
+
+# Hyperparameter ranges (must match backtest_trading_strategy's arguments)
+stop_losses = [0.02, 0.03, 0.05, 0.08]  # Stop-loss levels (2% - 8%)
+take_profits = [0.05, 0.10, 0.15]  # Take-profit levels (5%, 10%, 15%)
+moving_avg_windows = [10, 20]  # SMA / Bollinger window
+min_confidences = [0.5, 0.6, 0.7, 0.8]  # Minimum sentiment confidence
+trades_dir = None  # e.g. "data/sweeps" to keep every combination's trades
+indicator_cache_dir = "data/indicator_cache"  # Reused across sweeps of the same prices
+
+# "grid" backtests every combination above on the whole history; "random"
+# and "halving" search walk-forward folds (see walk_forward.run_search),
+# sampling `search_configs` configs from PARAMETER_SPACE ("halving" prunes
+# poor ones early). Interrupted searches resume from their progress file.
+search_mode = "halving"
+search_configs = 81
+search_folds = 4
+
+if __name__ == "__main__":
+    # Load and merge the data once; every worker maps the same shared arrays
+    try:
+        sentiment_file = "data/trading_signals.csv"
+        price_file = "data/historical_prices.csv"
+        data = load_backtest_data(sentiment_file, price_file)
+        print(f"✅ Data loaded successfully ({len(data)} rows).")
+    except Exception as e:
+        print(f"❌ Error loading data: {e}")
+        exit()
+
+    if search_mode != "grid":
+        results_df = run_search(
+            data,
+            PARAMETER_SPACE,
+            method=search_mode,
+            n_configs=search_configs,
+            n_folds=search_folds,
+            initial_balance=1000,
+            cache_dir=indicator_cache_dir
+        )
+        print(f"🧮 {results_df.attrs['evaluations']} fold backtests run")
+        results_df.to_csv("data/hyperparameter_search_results.csv", index=False)
+        print("\n✅ Hyperparameter search complete! Results saved to data/hyperparameter_search_results.csv")
+        print(results_df.head(10))
+        print("\n📈 Walk-forward (best config so far, scored on the next fold):")
+        print(results_df.attrs["walk_forward"].to_string(index=False))
+        exit()
+
+    grid = parameter_grid(
+        stop_loss_pct=stop_losses,
+        take_profit_pct=take_profits,
+        moving_avg_window=moving_avg_windows,
+        min_confidence=min_confidences
+    )
+    print(f"🔄 Testing {len(grid)} hyperparameter combinations in parallel...")
+
+    results_df = run_parameter_sweep(
+        data,
+        grid,
+        initial_balance=1000,
+        output_dir=trades_dir,
+        cache_dir=indicator_cache_dir
+    )
+    cache_stats = results_df.attrs.get("indicator_cache", {})
+    print(f"🧮 Indicator cache: {cache_stats.get('hits', 0)} hits, "
+          f"{cache_stats.get('disk_hits', 0)} disk hits, {cache_stats.get('misses', 0)} misses")
+
+    # Save results
+    if not results_df.empty:
+        results_df = results_df.rename(columns={
+            "stop_loss_pct": "Stop-Loss (%)",
+            "take_profit_pct": "Take-Profit (%)",
+            "moving_avg_window": "MA Window",
+            "min_confidence": "Min Confidence",
+            "initial_balance": "Initial Balance",
+            "final_balance": "Final Balance",
+            "roi": "ROI (%)",
+            "total_trades": "Total Trades",
+            "win_rate": "Win Rate",
+            "max_drawdown": "Max Drawdown",
+            "profit_factor": "Profit Factor",
+            "sharpe_ratio": "Sharpe Ratio",
+            "sortino_ratio": "Sortino Ratio",
+            "exposure": "Exposure"
+        })
+        results_df["Stop-Loss (%)"] *= 100
+        results_df["Take-Profit (%)"] *= 100
+        results_df.to_csv("data/hyperparameter_optimization_results.csv", index=False)
+        print("\n✅ Hyperparameter tuning complete! Results saved to data/hyperparameter_optimization_results.csv")
+        print(results_df.sort_values("ROI (%)", ascending=False).head(10))
+    else:
+        print("\n❌ No results to save. Check for errors in the backtesting process.")
@@ -0,0 +1,212 @@
+import os
+import itertools
+import numpy as np
+import pandas as pd
+from multiprocessing import Pool, shared_memory
+from typing import Dict, List, Optional, Union
+from backtest_engine import ACTION_NAMES, build_signal_masks, run_event_loop
+from indicators import IndicatorCache, fingerprint
+from trade_metrics import ledger_from_prices, performance_metrics, periods_per_year
+
+# Columns of the merged frame that the backtest needs, and their shared dtypes
+SHARED_COLUMNS = {
+    "timestamp": "datetime64[ns]",
+    "close": "float64",
+    "signal": "<U4",
+    "confidence": "float64",
+}
+
+# Per-worker state, filled in by _init_worker
+_worker_arrays: Dict[str, np.ndarray] = {}
+_worker_segments: List[shared_memory.SharedMemory] = []
+_worker_cache: Optional[IndicatorCache] = None
+_worker_close_key: Optional[str] = None
+_worker_output_dir: Optional[str] = None
+_worker_periods = 1.0
+
+
+def _shared_column(data: pd.DataFrame, column: str, dtype: str) -> np.ndarray:
+    if column in data.columns:
+        return data[column].to_numpy(dtype=dtype)
+    if column == "confidence":
+        return np.ones(len(data))
+    raise KeyError(f"Merged data is missing the '{column}' column")
+
+
+def share_arrays(data: Union[pd.DataFrame, Dict[str, np.ndarray]]):
+    """
+    Copy arrays into shared memory blocks: the backtest columns of a merged
+    frame, or a dict of name -> NumPy array of any shape (e.g. the 2-D
+    arrays of portfolio_backtest; object arrays can't be shared).
+
+    Returns:
+        Tuple of (segments, spec). Keep the segments alive for the lifetime of
+        the pool and release them with release_arrays; pass the picklable spec
+        to workers so they can attach by name.
+    """
+    # One column in memory at a time next to its shared copy
+    if isinstance(data, pd.DataFrame):
+        columns = ((column, _shared_column(data, column, dtype)) for column, dtype in SHARED_COLUMNS.items())
+    else:
+        columns = ((name, np.asarray(values)) for name, values in data.items())
+
+    segments = []
+    spec = {}
+    for column, values in columns:
+        segment = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+        np.ndarray(values.shape, dtype=values.dtype, buffer=segment.buf)[:] = values
+        segments.append(segment)
+        spec[column] = (segment.name, values.shape, values.dtype.str)
+    return segments, spec
+
+
+def attach_arrays(spec: Dict[str, tuple]):
+    """Map shared memory blocks described by `spec` as read-only NumPy arrays."""
+    segments = []
+    arrays = {}
+    for column, (name, shape, dtype) in spec.items():
+        segment = shared_memory.SharedMemory(name=name)
+        array = np.ndarray(shape, dtype=dtype, buffer=segment.buf)
+        array.flags.writeable = False
+        segments.append(segment)
+        arrays[column] = array
+    return segments, arrays
+
+
+def release_arrays(segments: List[shared_memory.SharedMemory]):
+    """Close and unlink shared memory blocks created by share_arrays."""
+    for segment in segments:
+        segment.close()
+        segment.unlink()
+
+
+def _init_worker(spec, output_dir, close_key, cache_dir):
+    global _worker_segments, _worker_arrays, _worker_output_dir, _worker_cache, _worker_close_key, _worker_periods
+    _worker_segments, _worker_arrays = attach_arrays(spec)
+    _worker_periods = periods_per_year(_worker_arrays["timestamp"])
+    _worker_output_dir = output_dir
+    _worker_close_key = close_key
+    _worker_cache = IndicatorCache(cache_dir=cache_dir)
+
+
+def _run_combination(task):
+    combo_id, params = task
+    arrays = _worker_arrays
+    close = arrays["close"]
+    window = params["moving_avg_window"]
+    initial_balance = params["initial_balance"]
+    sma = _worker_cache.get(close, "sma", window, _worker_close_key)
+    rsi = _worker_cache.get(close, "rsi", 14, _worker_close_key)
+    upper_band = _worker_cache.get(close, "upper_band", window, _worker_close_key)
+
+    entry_mask, exit_mask = build_signal_masks(
+        close, arrays["signal"], arrays["confidence"], sma, rsi, upper_band,
+        min_confidence=params["min_confidence"],
+        warmup=window
+    )
+    balance, trade_idx, trade_codes = run_event_loop(
+        close, entry_mask, exit_mask,
+        initial_balance=initial_balance,
+        stop_loss_pct=params["stop_loss_pct"],
+        take_profit_pct=params["take_profit_pct"]
+    )
+    trade_units, trade_cash = ledger_from_prices(trade_codes, close[trade_idx], initial_balance)
+    metrics = performance_metrics(close, trade_idx, trade_units, trade_cash, initial_balance, _worker_periods)
+
+    if _worker_output_dir:
+        # Every worker writes under its own directory, so no two share a file
+        worker_dir = os.path.join(_worker_output_dir, f"worker_{os.getpid()}")
+        os.makedirs(worker_dir, exist_ok=True)
+        pd.DataFrame({
+            "action": [ACTION_NAMES[code] for code in trade_codes.tolist()],
+            "timestamp": pd.to_datetime(arrays["timestamp"][trade_idx]),
+            "price": close[trade_idx],
+        }).to_csv(os.path.join(worker_dir, f"trades_{combo_id:04d}.csv"), index=False)
+
+    return {
+        **params,
+        **metrics,
+        "final_balance": balance,
+        "roi": ((balance - initial_balance) / initial_balance) * 100,
+        "_worker": os.getpid(),
+        "_cache": _worker_cache.stats(),
+    }
+
+
+def parameter_grid(**ranges) -> List[dict]:
+    """Expand keyword lists into every combination, e.g. parameter_grid(a=[1, 2], b=[3])."""
+    keys = list(ranges)
+    return [dict(zip(keys, values)) for values in itertools.product(*ranges.values())]
+
+
+def run_parameter_sweep(
+    data: pd.DataFrame,
+    grid: List[dict],
+    initial_balance: float = 1000,
+    processes: Optional[int] = None,
+    output_dir: Optional[str] = None,
+    cache_dir: Optional[str] = None,
+    chunksize: int = 1
+) -> pd.DataFrame:
+    """
+    Backtest every parameter combination over one merged dataset in parallel.
+
+    The merged columns are placed in shared memory once and mapped read-only
+    by every worker, so tasks only carry their parameters. Each worker keeps
+    an IndicatorCache, so a window's indicators are computed once per worker
+    (or once overall when `cache_dir` is shared). Metrics come back in
+    memory; trade lists are written only when `output_dir` is given.
+
+    Args:
+        data: Merged signals/prices, as returned by load_backtest_data
+        grid: Parameter dicts with stop_loss_pct, take_profit_pct,
+              moving_avg_window and min_confidence
+        initial_balance: Starting capital for every run
+        processes: Worker count (default: all cores)
+        output_dir: Optional directory for per-worker trade files
+        cache_dir: Optional on-disk indicator cache shared by all workers
+        chunksize: Combinations handed to a worker at a time
+
+    Returns:
+        DataFrame with one row of metrics per combination; summed indicator
+        cache counters are in `.attrs["indicator_cache"]`
+    """
+    defaults = {
+        "stop_loss_pct": 0.05,
+        "take_profit_pct": 0.1,
+        "moving_avg_window": 20,
+        "min_confidence": 0.6,
+    }
+    tasks = [
+        (combo_id, {**defaults, **params, "initial_balance": initial_balance})
+        for combo_id, params in enumerate(grid)
+    ]
+    # Group equal windows together so each worker reuses its indicators
+    tasks.sort(key=lambda task: task[1]["moving_avg_window"])
+
+    segments, spec = share_arrays(data)
+    close_key = fingerprint(data["close"].to_numpy(dtype=float))
+    try:
+        initargs = (spec, output_dir, close_key, cache_dir)
+        with Pool(processes, initializer=_init_worker, initargs=initargs) as pool:
+            results = pool.map(_run_combination, tasks, chunksize=chunksize)
+    finally:
+        release_arrays(segments)
+
+    # Counters are cumulative per worker, so keep each worker's last snapshot
+    worker_stats = {}
+    for result in results:
+        worker = result.pop("_worker")
+        stats = result.pop("_cache")
+        worker_stats[worker] = max(
+            stats, worker_stats.get(worker, stats),
+            key=lambda s: s["hits"] + s["disk_hits"] + s["misses"]
+        )
+
+    order = np.argsort([combo_id for combo_id, _ in tasks])
+    results_df = pd.DataFrame([results[i] for i in order])
+    results_df.attrs["indicator_cache"] = {
+        counter: sum(stats[counter] for stats in worker_stats.values())
+        for counter in ("hits", "disk_hits", "misses")
+    }
+    return results_df
@@ -0,0 +1,104 @@
+import os
+import json
+from typing import List, Optional
+import pandas as pd
+from storage import filter_mask, load_table, table_exists
+
+# Per-stage checkpoints (rows of each append-only input already processed)
+# and ingestion high-water marks live in this file next to the data they
+# describe, so runs from any working directory share them
+STATE_NAME = "pipeline_state.json"
+
+def state_path(path) -> str:
+    """State file for a data file: STATE_NAME in the same directory."""
+    return os.path.join(os.path.dirname(os.path.abspath(path)), STATE_NAME)
+
+def checkpoint_key(stage: str, path) -> str:
+    """State key of `stage`'s checkpoint on one input, by its resolved path."""
+    return f"checkpoint:{stage}:{os.path.realpath(path)}"
+
+def load_state(state_file: str) -> dict:
+    """Load pipeline state, or an empty state if none was saved yet."""
+    if not os.path.exists(state_file):
+        return {}
+    with open(state_file) as f:
+        return json.load(f)
+
+def save_state(state: dict, state_file: str):
+    """Write pipeline state atomically."""
+    os.makedirs(os.path.dirname(state_file) or ".", exist_ok=True)
+    tmp_file = f"{state_file}.tmp"
+    with open(tmp_file, "w") as f:
+        json.dump(state, f, indent=2, default=str)
+    os.replace(tmp_file, state_file)
+
+def update_state(key: str, value, state_file: str):
+    """Set one entry of the pipeline state."""
+    state = load_state(state_file)
+    state[key] = value
+    save_state(state, state_file)
+
+def read_delta(
+    path,
+    stage: str,
+    columns: Optional[List[str]] = None,
+    parse_dates: Optional[List[str]] = None,
+    context_rows: int = 0,
+    context_window: Optional[str] = None,
+    state_file: Optional[str] = None
+):
+    """
+    Load the rows of an append-only table that `stage` hasn't processed yet.
+
+    Only the rows from the checkpoint on are read (see load_table's
+    `start`), so a delta costs about as much as the rows appended since.
+    `context_rows` already-processed rows just before the delta are returned
+    too, for stages with rolling windows. If the table shrank (it was
+    rewritten from scratch) the checkpoint is ignored and every row is new.
+
+    With `context_window` (e.g. "6h"), the processed rows whose timestamp is
+    within it of the checkpoint's last timestamp (see mark_processed) are
+    part of the context too, read with a timestamp filter rather than by
+    loading the whole history. `columns` must then include "timestamp".
+    Without a recorded last timestamp every processed row is context.
+    Checkpoints are kept per stage and input (see checkpoint_key) in the
+    input's state file (see state_path) unless `state_file` is given.
+
+    Returns:
+        Tuple of (new_rows, context_rows_df, total_rows, reset) where `reset`
+        means the stage's output must be rebuilt instead of appended to
+    """
+    if not table_exists(path):
+        raise FileNotFoundError(f"Input file not found: {path}")
+    checkpoint = load_state(state_file or state_path(path)).get(checkpoint_key(stage, path), {})
+    offset, last_timestamp = checkpoint.get("rows", 0), checkpoint.get("last_timestamp")
+    if context_window is not None and last_timestamp is None:
+        context_rows = offset
+    # Read at least the last processed row, to tell whether the table still reaches the checkpoint
+    start = max(0, offset - max(context_rows, 1))
+    df = load_table(path, columns=columns, parse_dates=parse_dates, start=start)
+    if start + len(df) < offset:
+        # The table shrank: it was rewritten, so every row is new
+        offset = start = 0
+        df = load_table(path, columns=columns, parse_dates=parse_dates)
+    reset = offset == 0
+    context = df.iloc[max(0, offset - context_rows - start):offset - start].reset_index(drop=True)
+
+    if context_window is not None and last_timestamp is not None and start > 0:
+        filters = [("timestamp", ">=", pd.Timestamp(last_timestamp) - pd.Timedelta(context_window))]
+        matched = load_table(path, columns=columns, parse_dates=parse_dates, filters=filters)
+        # The filtered read keeps the table's order, so it ends with the
+        # matching rows from `start` on, which were read above
+        earlier = matched.iloc[:len(matched) - int(filter_mask(df, filters).sum())]
+        context = pd.concat([earlier, context], ignore_index=True)
+    return df.iloc[offset - start:].reset_index(drop=True), context, start + len(df), reset
+
+def mark_processed(stage: str, path, rows: int, last_timestamp=None, state_file: Optional[str] = None):
+    """
+    Record that `stage` has processed the first `rows` rows of its input `path`.
+
+    `last_timestamp` (the newest timestamp among them) lets read_delta
+    bound a time-window context by a filter.
+    """
+    checkpoint = {"rows": int(rows), "last_timestamp": None if pd.isna(last_timestamp) else str(pd.Timestamp(last_timestamp))}
+    update_state(checkpoint_key(stage, path), checkpoint, state_file or state_path(path))
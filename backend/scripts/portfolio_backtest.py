@@ -0,0 +1,256 @@
+import os
+import numpy as np
+import pandas as pd
+from multiprocessing import Pool
+from typing import Dict, List, Optional, Tuple, Union
+from backtest_engine import build_signal_masks, equity_curve, simulate_positions
+from indicators import default_cache, fingerprint
+from parallel_sweep import attach_arrays, release_arrays, share_arrays
+from storage import load_table, save_table
+from trade_metrics import exposure, max_drawdown, round_trip_pnl, win_rate
+
+# Signal strings stored as small integer codes in the 2-D signal matrix
+SIGNAL_NAMES = np.array(["HOLD", "BUY", "SELL"])
+SIGNAL_CODES = {name: code for code, name in enumerate(SIGNAL_NAMES)}
+
+# Parameters of one strategy, with backtest_trading_strategy's defaults
+DEFAULT_STRATEGY = {
+    "stop_loss_pct": 0.05,
+    "take_profit_pct": 0.1,
+    "moving_avg_window": 20,
+    "min_confidence": 0.6,
+}
+
+# Arrays the sleeves read, shared with the workers instead of pickled to each
+WORKER_ARRAYS = ("close", "signal", "confidence")
+
+# Per-worker state, filled in by _init_worker
+_worker_arrays: Dict[str, np.ndarray] = {}
+_worker_segments = []
+
+
+def align_portfolio_data(
+    signals: Union[pd.DataFrame, Dict[str, pd.DataFrame]],
+    prices: Dict[str, pd.DataFrame]
+) -> Dict[str, np.ndarray]:
+    """
+    Align signals and every symbol's prices on one time grid as 2-D arrays.
+
+    `signals` is either one signal frame shared by all symbols (the grid is
+    its timestamps, exactly the rows the single-asset backtest walks) or a
+    frame per symbol (the grid is the union of their timestamps and a symbol
+    holds on rows that carry another symbol's signal). Closes are joined
+    as-of, like backtest_strategy.load_backtest_data.
+
+    Returns:
+        Dict with "timestamp" (T,), "close" and "confidence" (T, S) floats,
+        "signal" (T, S) int8 codes of SIGNAL_NAMES and "symbols" (S,)
+    """
+    symbols = list(prices)
+    shared = isinstance(signals, pd.DataFrame)
+    frames = {symbol: signals if shared else signals[symbol] for symbol in symbols}
+    if shared:
+        grid = signals["timestamp"].sort_values(kind="stable").reset_index(drop=True)
+    else:
+        grid = pd.Series(np.unique(np.concatenate([frame["timestamp"].to_numpy() for frame in frames.values()])))
+    grid = pd.to_datetime(grid).astype("datetime64[ns]")
+
+    n, s = len(grid), len(symbols)
+    close = np.full((n, s), np.nan)
+    signal = np.zeros((n, s), dtype=np.int8)
+    confidence = np.ones((n, s))
+    keys = pd.DataFrame({"timestamp": grid})
+    for j, symbol in enumerate(symbols):
+        symbol_prices = prices[symbol][["timestamp", "close"]].assign(
+            timestamp=lambda df: pd.to_datetime(df["timestamp"]).astype("datetime64[ns]")
+        ).sort_values("timestamp")
+        close[:, j] = pd.merge_asof(keys, symbol_prices, on="timestamp")["close"].to_numpy(dtype=float)
+
+        frame = frames[symbol].sort_values("timestamp", kind="stable")
+        codes = frame["signal"].map(SIGNAL_CODES).fillna(0).to_numpy(dtype=np.int8)
+        conf = frame["confidence"].to_numpy(dtype=float) if "confidence" in frame.columns else np.ones(len(frame))
+        if shared:
+            signal[:, j], confidence[:, j] = codes, conf
+        else:
+            rows = np.searchsorted(grid.to_numpy(), pd.to_datetime(frame["timestamp"]).to_numpy(dtype="datetime64[ns]"))
+            signal[rows, j], confidence[rows, j] = codes, conf
+
+    return {
+        "timestamp": grid.to_numpy(),
+        "close": close,
+        "signal": signal,
+        "confidence": confidence,
+        "symbols": np.array(symbols, dtype=object),
+    }
+
+
+def _init_worker(spec):
+    global _worker_segments, _worker_arrays
+    _worker_segments, _worker_arrays = attach_arrays(spec)
+
+
+def _simulate_sleeve(task):
+    """Backtest one (symbol column, strategy) sleeve of the aligned arrays."""
+    column, params, capital, position_size, fee_rate, slippage = task
+    close = np.ascontiguousarray(_worker_arrays["close"][:, column])
+    window = params["moving_avg_window"]
+    key = fingerprint(close)
+
+    # Same indicators and rules as backtest_strategy.add_indicators/run_backtest;
+    # strategies on the same symbol share the cached indicators
+    entry_mask, exit_mask = build_signal_masks(
+        close,
+        SIGNAL_NAMES[_worker_arrays["signal"][:, column]],
+        _worker_arrays["confidence"][:, column],
+        default_cache.get(close, "sma", window, key),
+        default_cache.get(close, "rsi", 14, key),
+        default_cache.get(close, "upper_band", window, key),
+        min_confidence=params["min_confidence"],
+        warmup=window
+    )
+    balance, trade_idx, trade_codes, trade_units, trade_cash = simulate_positions(
+        close, entry_mask, exit_mask,
+        initial_balance=capital,
+        stop_loss_pct=params["stop_loss_pct"],
+        take_profit_pct=params["take_profit_pct"],
+        position_size=position_size,
+        fee_rate=fee_rate,
+        slippage=slippage
+    )
+    equity = equity_curve(close, trade_idx, trade_units, trade_cash, capital)
+
+    pnl = round_trip_pnl(trade_cash, capital)
+    return {
+        "final_equity": balance,
+        "return_pct": (balance - capital) / capital * 100,
+        "trades": len(trade_idx),
+        "win_rate": win_rate(pnl),
+        "max_drawdown": max_drawdown(equity),
+        "exposure": exposure(trade_idx, trade_units, len(close)),
+        "_equity": equity,
+    }
+
+
+def run_portfolio_backtest(
+    signals: Union[pd.DataFrame, Dict[str, pd.DataFrame]],
+    prices: Dict[str, pd.DataFrame],
+    strategies: Optional[Dict[str, dict]] = None,
+    weights: Optional[Dict[str, float]] = None,
+    initial_capital: float = 10000,
+    position_size: float = 1.0,
+    fee_rate: float = 0.001,
+    slippage: float = 0.0005,
+    processes: Optional[int] = None
+) -> Tuple[pd.DataFrame, dict, pd.DataFrame]:
+    """
+    Backtest many symbols and strategies at once as a portfolio of sleeves.
+
+    Every (symbol, strategy) pair is a sleeve with its own slice of the
+    capital (`weights` per symbol, split evenly across strategies; default
+    equal weights) running the single-asset rules on the aligned 2-D
+    arrays. Sleeves don't share cash, so they are simulated independently,
+    in parallel across `processes` workers, and the portfolio equity is the
+    sum of the sleeves' mark-to-market equity curves.
+
+    Args:
+        signals: Shared signal frame or one per symbol (see align_portfolio_data)
+        prices: Dict of symbol -> price frame with timestamp/close
+        strategies: Dict of name -> parameter overrides of DEFAULT_STRATEGY
+        weights: Dict of symbol -> capital weight (normalized)
+        initial_capital: Total starting capital
+        position_size: Fraction of a sleeve's balance put into each entry
+        fee_rate: Fee per fill as a fraction of notional (0.001 = 10 bps)
+        slippage: Fill price penalty as a fraction of the close
+        processes: Worker processes (None: all cores, 1: in-process)
+
+    Returns:
+        Tuple of (per-sleeve metrics, portfolio metrics, equity curves)
+    """
+    arrays = align_portfolio_data(signals, prices)
+    symbols = list(arrays["symbols"])
+    strategies = {name: {**DEFAULT_STRATEGY, **params} for name, params in (strategies or {"default": {}}).items()}
+    weights = weights or {symbol: 1.0 for symbol in symbols}
+    total_weight = sum(weights.get(symbol, 0.0) for symbol in symbols)
+
+    sleeves, tasks = [], []
+    for column, symbol in enumerate(symbols):
+        for name, params in strategies.items():
+            capital = initial_capital * weights.get(symbol, 0.0) / total_weight / len(strategies)
+            sleeves.append({"symbol": symbol, "strategy": name, "allocation": capital})
+            tasks.append((column, params, capital, position_size, fee_rate, slippage))
+
+    # Workers map one shared copy of the 2-D arrays (as in parallel_sweep)
+    processes = processes or os.cpu_count()
+    segments, spec = share_arrays({name: arrays[name] for name in WORKER_ARRAYS})
+    try:
+        if processes == 1 or len(tasks) == 1:
+            _init_worker(spec)
+            results = [_simulate_sleeve(task) for task in tasks]
+        else:
+            with Pool(processes, initializer=_init_worker, initargs=(spec,)) as pool:
+                results = pool.map(_simulate_sleeve, tasks, chunksize=max(1, len(tasks) // (processes * 4)))
+    finally:
+        if processes == 1 or len(tasks) == 1:
+            for segment in _worker_segments:
+                segment.close()
+        release_arrays(segments)
+
+    equity = pd.DataFrame({
+        f"{sleeve['symbol']}:{sleeve['strategy']}": result.pop("_equity")
+        for sleeve, result in zip(sleeves, results)
+    })
+    equity["portfolio"] = equity.sum(axis=1)
+    equity.insert(0, "timestamp", arrays["timestamp"])
+
+    summary = pd.DataFrame([{**sleeve, **result} for sleeve, result in zip(sleeves, results)])
+    total = equity["portfolio"].to_numpy()
+    final_equity = float(summary["final_equity"].sum()) if len(summary) else initial_capital
+    portfolio = {
+        "initial_capital": initial_capital,
+        "final_equity": final_equity,
+        "return_pct": (final_equity - initial_capital) / initial_capital * 100,
+        "max_drawdown": max_drawdown(total),
+        "trades": int(summary["trades"].sum()) if len(summary) else 0,
+        "sleeves": len(sleeves),
+    }
+    return summary, portfolio, equity
+
+
+def load_symbol_prices(symbols: List[str], price_files: Optional[Dict[str, str]] = None, timeframe: str = "1h") -> Dict[str, pd.DataFrame]:
+    """
+    Load close prices per symbol, from explicit files or the partitioned
+    OHLCV store that bitcoin_prices.backfill_ohlcv fills.
+    """
+    if price_files:
+        return {
+            symbol: load_table(price_files[symbol], columns=["timestamp", "close"], parse_dates=["timestamp"])
+            for symbol in symbols
+        }
+    from bitcoin_prices import load_ohlcv  # needs ccxt, only for the store
+    return {symbol: load_ohlcv(symbol, timeframe)[["timestamp", "close"]] for symbol in symbols}
+
+
+def portfolio_backtest(
+    symbols: List[str] = ("BTC/USDT", "ETH/USDT"),
+    sentiment_file: str = "data/trading_signals.csv",
+    price_files: Optional[Dict[str, str]] = None,
+    output_file: str = "data/portfolio_results.csv",
+    equity_file: str = "data/portfolio_equity.csv",
+    **kwargs
+):
+    """Run run_portfolio_backtest on the signals file and save its results."""
+    signals = load_table(sentiment_file, parse_dates=["timestamp"])
+    prices = load_symbol_prices(list(symbols), price_files)
+    summary, portfolio, equity = run_portfolio_backtest(signals, prices, **kwargs)
+
+    save_table(summary, output_file)
+    save_table(equity, equity_file)
+    print(summary[["symbol", "strategy", "final_equity", "return_pct", "trades", "win_rate", "max_drawdown"]].to_string(index=False))
+    print(f"✅ Portfolio: ${portfolio['final_equity']:.2f} ({portfolio['return_pct']:.2f}% ROI), "
+          f"max drawdown {portfolio['max_drawdown']:.2%}, {portfolio['trades']} trades")
+    print(f"💾 Results saved to {output_file} and {equity_file}")
+    return summary, portfolio, equity
+
+
+if __name__ == "__main__":
+    portfolio_backtest()
@@ -1,47 +1,51 @@
-import os
-import pandas as pd
-import re
-import nltk
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-from dotenv import load_dotenv
-
-# Load NLTK stopwords
-nltk.download("stopwords")
-nltk.download("punkt")
-
-# Load environment variables
-load_dotenv()
-
-# Define stopwords
-STOPWORDS = set(stopwords.words("english"))
-
-def clean_text(text):
-    """Clean text by removing URLs, special characters, and stopwords."""
-    text = text.lower()  # Convert to lowercase
-    text = re.sub(r"http\S+|www\S+|https\S+", "", text)  # Remove URLs
-    text = re.sub(r"[^\w\s]", "", text)  # Remove special characters
-    words = word_tokenize(text)  # Tokenize text
-    words = [word for word in words if word not in STOPWORDS]  # Remove stopwords
-    return " ".join(words)
-
-def preprocess_reddit_data(input_file="data/reddit_data.csv", output_file="data/reddit_cleaned.csv"):
-    """Read, clean, and save preprocessed Reddit text data while retaining upvotes, comments, and timestamps."""
-    df = pd.read_csv(input_file)
-    
-    # Check if required columns exist
-    required_columns = {"title", "upvotes", "comments", "timestamp"}
-    if not required_columns.issubset(df.columns):
-        print(f"⚠️ Required columns {required_columns} not found in CSV. Check the dataset.")
-        return
-
-    # Clean the text in the 'title' column
-    df["cleaned_text"] = df["title"].astype(str).apply(clean_text)
-    
-    # Save cleaned text along with upvotes, comments, and timestamp
-    df[["cleaned_text", "upvotes", "comments", "timestamp"]].to_csv(output_file, index=False)
-    print(f"✅ Cleaned data saved to {output_file}")
-
-# Run preprocessing
-if __name__ == "__main__":
-    preprocess_reddit_data()
+import os
+import pandas as pd
+from dotenv import load_dotenv
+from storage import append_table, load_table, save_table
+from pipeline_state import mark_processed, read_delta
+from text_normalization import normalize_series, normalize_text
+
+# Load environment variables
+load_dotenv()
+
+def clean_text(text):
+    """Clean text by removing URLs, special characters and stopwords, and lemmatizing."""
+    return normalize_text(text)
+
+def preprocess_reddit_data(input_file="data/reddit_data.csv", output_file="data/reddit_cleaned.csv", delta=False):
+    """
+    Read, clean, and save preprocessed Reddit text data while retaining upvotes, comments, and timestamps.
+
+    With `delta`, only posts appended to the input since the last delta run
+    are cleaned, and they are appended to the output.
+    """
+    # Load only the columns this stage needs
+    required_columns = ["title", "upvotes", "comments", "timestamp"]
+    try:
+        if delta:
+            df, _, total_rows, reset = read_delta(
+                input_file, "preprocess_text", columns=required_columns, parse_dates=["timestamp"]
+            )
+        else:
+            df = load_table(input_file, columns=required_columns, parse_dates=["timestamp"])
+    except (KeyError, ValueError):
+        print(f"⚠️ Required columns {required_columns} not found in CSV. Check the dataset.")
+        return
+
+    # Clean the text in the 'title' column (this is the only cleaning pass;
+    # sentiment_analysis scores cleaned_text as-is)
+    df["cleaned_text"] = normalize_series(df["title"])
+    
+    # Save cleaned text along with upvotes, comments, and timestamp
+    output = df[["cleaned_text", "upvotes", "comments", "timestamp"]]
+    if delta and not reset:
+        append_table(output, output_file)
+    else:
+        save_table(output, output_file)
+    if delta:
+        mark_processed("preprocess_text", input_file, total_rows)
+    print(f"✅ Cleaned data saved to {output_file} ({len(output)} rows processed)")
+
+# Run preprocessing
+if __name__ == "__main__":
+    preprocess_reddit_data()
@@ -0,0 +1,259 @@
+import os
+import sys
+import json
+import time
+import cProfile
+import functools
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+
+try:
+    from pyinstrument import Profiler as PyinstrumentProfiler
+    HAS_PYINSTRUMENT = True
+except ImportError:
+    HAS_PYINSTRUMENT = False
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Load environment variables
+load_dotenv()
+
+# Runs are only instrumented when a report directory is set, here or per
+# call, e.g. PROFILE_DIR=data/profiles python backtest_strategy.py
+PROFILE_DIR_ENV = "PROFILE_DIR"
+# Optional whole-run profiler: "cprofile" or "pyinstrument"
+PROFILER_ENV = "PROFILER"
+SAMPLE_INTERVAL = 0.01
+
+_active = None
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def rss_bytes() -> Optional[int]:
+    """Resident memory of this process (lifetime peak where current RSS is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class RunProfile:
+    """
+    Stage timings and memory of one run, written as a JSON report.
+
+    Stages nest (their path is "outer/inner") and a stage entered several
+    times, e.g. once per chunk, is aggregated into one record with its call
+    count. A sampler thread polls RSS every `sample_interval` seconds, so
+    each stage gets the peak resident memory seen while it ran.
+    """
+
+    def __init__(self, name: str, report_dir: str, profiler: Optional[str] = None, sample_interval: float = SAMPLE_INTERVAL):
+        if profiler not in (None, "cprofile", "pyinstrument"):
+            raise ValueError(f"Unknown profiler '{profiler}'. Expected 'cprofile' or 'pyinstrument'.")
+        if profiler == "pyinstrument" and not HAS_PYINSTRUMENT:
+            raise ImportError("pyinstrument is not installed (pip install pyinstrument)")
+        self.name = name
+        self.report_dir = report_dir
+        self.profiler = profiler
+        self.sample_interval = sample_interval
+        self.stages: Dict[str, dict] = {}
+        self._open: List[dict] = []
+        self._stop = threading.Event()
+        self._sampler = None
+        self._profile = None
+        self.error = None
+
+    def _sample(self):
+        rss = rss_bytes()
+        if rss is None:
+            return
+        for frame in list(self._open):
+            frame["peak"] = max(frame["peak"], rss)
+
+    def _run_sampler(self):
+        while not self._stop.wait(self.sample_interval):
+            self._sample()
+
+    @contextmanager
+    def stage(self, name: str, rows: Optional[int] = None):
+        """Time a block as a stage; `rows` adds a throughput to the record."""
+        path = "/".join([parent["path"] for parent in self._open[-1:]] + [name])
+        rss = rss_bytes()
+        frame = {"path": path, "peak": rss or 0}
+        self._open.append(frame)
+        start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield frame
+        finally:
+            seconds = time.perf_counter() - start
+            cpu_seconds = time.process_time() - cpu_start
+            self._sample()
+            self._open.remove(frame)
+            record = self.stages.setdefault(path, {
+                "stage": path, "calls": 0, "seconds": 0.0, "cpu_seconds": 0.0,
+                "peak_rss_mb": None, "rss_delta_mb": 0.0, "rows": None,
+            })
+            record["calls"] += 1
+            record["seconds"] += seconds
+            record["cpu_seconds"] += cpu_seconds
+            if rss is not None:
+                end = rss_bytes()
+                record["peak_rss_mb"] = max(record["peak_rss_mb"] or 0.0, frame["peak"] / 2**20)
+                record["rss_delta_mb"] += (end - rss) / 2**20
+            rows = frame.get("rows", rows)
+            if rows is not None:
+                record["rows"] = (record["rows"] or 0) + int(rows)
+
+    def start(self):
+        self.started_at = datetime.now(timezone.utc)
+        self._sampler = threading.Thread(target=self._run_sampler, name=f"profile-{self.name}", daemon=True)
+        self._sampler.start()
+        if self.profiler == "cprofile":
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        elif self.profiler == "pyinstrument":
+            self._profile = PyinstrumentProfiler()
+            self._profile.start()
+
+    def stop(self):
+        if self.profiler == "cprofile":
+            self._profile.disable()
+        elif self.profiler == "pyinstrument":
+            self._profile.stop()
+        self._stop.set()
+        self._sampler.join()
+
+    def report(self) -> dict:
+        """The run as a JSON-ready dict (rounded, with rows/sec where rows are known)."""
+        stages = []
+        for record in self.stages.values():
+            record = dict(record)
+            if record["rows"] is not None and record["seconds"] > 0:
+                record["rows_per_sec"] = round(record["rows"] / record["seconds"], 1)
+            for key in ("seconds", "cpu_seconds"):
+                record[key] = round(record[key], 6)
+            for key in ("peak_rss_mb", "rss_delta_mb"):
+                record[key] = round(record[key], 2) if record[key] is not None else None
+            stages.append(record)
+        peaks = [stage["peak_rss_mb"] for stage in stages if stage["peak_rss_mb"] is not None]
+        return {
+            "run": self.name,
+            "started_at": self.started_at.isoformat(),
+            "pid": os.getpid(),
+            "python": sys.version.split()[0],
+            "total_seconds": next((stage["seconds"] for stage in stages if stage["stage"] == self.name), None),
+            "peak_rss_mb": max(peaks) if peaks else None,
+            "error": self.error,
+            "stages": stages,
+        }
+
+    def save(self) -> str:
+        """Write the JSON report (and the profiler dump next to it); returns the report path."""
+        os.makedirs(self.report_dir, exist_ok=True)
+        stem = os.path.join(self.report_dir, f"{self.name}-{self.started_at.strftime('%Y%m%dT%H%M%S%f')}")
+        report = self.report()
+        if self.profiler == "cprofile":
+            report["profile_file"] = f"{stem}.prof"
+            self._profile.dump_stats(report["profile_file"])
+        elif self.profiler == "pyinstrument":
+            report["profile_file"] = f"{stem}.html"
+            with open(report["profile_file"], "w", encoding="utf-8") as f:
+                f.write(self._profile.output_html())
+        with open(f"{stem}.json", "w") as f:
+            json.dump(report, f, indent=2)
+        return f"{stem}.json"
+
+
+@contextmanager
+def profile_run(name: str, report_dir: Optional[str] = None, profiler: Optional[str] = None):
+    """
+    Instrument a run: stages entered inside are recorded and a JSON report
+    is written to `report_dir` (default: $PROFILE_DIR) when it ends.
+
+    Without a report directory this does nothing, so instrumented code pays
+    only for a few no-op context managers. Inside an active run it is just
+    another stage.
+
+    Args:
+        name: Run name, used for the top-level stage and the report file
+        report_dir: Where reports go (None: $PROFILE_DIR, unset: disabled)
+        profiler: "cprofile" or "pyinstrument" for a full profile of the
+            run next to the report (None: $PROFILER)
+
+    Yields the run's top stage dict, which gets the report path as
+    "report_file" once the run has ended.
+    """
+    global _active
+    if _active is not None:
+        with _active.stage(name) as frame:
+            yield frame
+        return
+    report_dir = report_dir or os.getenv(PROFILE_DIR_ENV)
+    if not report_dir:
+        yield {}
+        return
+
+    run = RunProfile(name, report_dir, profiler or os.getenv(PROFILER_ENV) or None)
+    _active = run
+    run.start()
+    frame = {}
+    try:
+        with run.stage(name) as frame:
+            yield frame
+    except BaseException as error:
+        run.error = f"{type(error).__name__}: {error}"
+        raise
+    finally:
+        run.stop()
+        _active = None
+        path = run.save()
+        frame["report_file"] = path
+        print(f"⏱️ Profile of {name} saved to {path}")
+
+
+@contextmanager
+def stage(name: str, rows: Optional[int] = None):
+    """
+    Time a block as a stage of the active run (no-op outside one).
+
+    Yields a dict; set its "rows" key inside the block when the row count
+    is only known afterwards.
+    """
+    if _active is None:
+        yield {}
+        return
+    with _active.stage(name, rows) as frame:
+        yield frame
+
+
+def timed(name: Optional[str] = None):
+    """Decorator form of stage(), named after the function by default."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name or func.__name__):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def profiled(name: Optional[str] = None):
+    """Decorator form of profile_run(), for a script's entry point."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with profile_run(name or func.__name__):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
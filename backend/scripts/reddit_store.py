@@ -0,0 +1,76 @@
+import hashlib
+import pandas as pd
+from datetime import datetime
+from storage import append_table, load_table, table_columns, table_exists
+from pipeline_state import load_state, state_path, update_state
+
+# The Reddit post store, kept apart from fetch_reddit so collectors can
+# append to it without PRAW or Reddit credentials
+
+def content_hash(title):
+    """Hash of a title with case and whitespace normalized, to catch reposts."""
+    return hashlib.sha1(" ".join(str(title).lower().split()).encode("utf-8")).hexdigest()[:16]
+
+def load_seen(store_file="data/reddit_data.csv"):
+    """
+    Dedup index of the Reddit store: the post ids and title hashes it holds.
+
+    Only the id and content_hash columns are read; titles are read (and
+    hashed) only when rows from older stores have no hash. Build it once per
+    collection run and pass it to every ingest_posts call; they add the
+    posts they append to it.
+
+    Returns:
+        Tuple of (seen_ids, seen_hashes) sets
+    """
+    if not table_exists(store_file):
+        return set(), set()
+    if "content_hash" not in table_columns(store_file):
+        # Stores from before IDs and hashes were kept
+        return set(), set(load_table(store_file, columns=["title"])["title"].map(content_hash))
+    existing = load_table(store_file, columns=["id", "content_hash"])
+    seen_ids = set(existing["id"].dropna().astype(str))
+    hashes = existing["content_hash"]
+    seen_hashes = set(hashes.dropna())
+    if hashes.isna().any():
+        titles = load_table(store_file, columns=["title"])["title"]
+        seen_hashes.update(titles[hashes.isna()].map(content_hash))
+    return seen_ids, seen_hashes
+
+def ingest_posts(posts, subreddit_name, listing="hot", store_file="data/reddit_data.csv", seen=None):
+    """
+    Append the unseen posts of one subreddit listing to the Reddit store.
+
+    `posts` is any iterable of objects with PRAW's id, title, score,
+    num_comments and created_utc attributes, newest first for "new".
+    `seen` is the store's dedup index from load_seen (loaded here if None).
+    """
+    hwm_key = f"high_water_mark:reddit:{subreddit_name}:{listing}"
+    high_water_mark = load_state(state_path(store_file)).get(hwm_key)
+    seen_ids, seen_hashes = seen if seen is not None else load_seen(store_file)
+
+    rows = []
+    for post in posts:
+        if listing == "new" and high_water_mark is not None and post.created_utc <= high_water_mark:
+            break
+        digest = content_hash(post.title)
+        if post.id in seen_ids or digest in seen_hashes:
+            continue
+        seen_ids.add(post.id)
+        seen_hashes.add(digest)
+        rows.append({
+            "id": post.id,
+            "title": post.title,
+            "upvotes": post.score,
+            "comments": post.num_comments,
+            "timestamp": datetime.utcfromtimestamp(post.created_utc).replace(microsecond=0),
+            "content_hash": digest,
+            "created_utc": post.created_utc,
+        })
+
+    df = pd.DataFrame(rows)
+    if not df.empty:
+        append_table(df.drop(columns="created_utc"), store_file)
+        update_state(hwm_key, float(max(df["created_utc"].max(), high_water_mark or 0)), state_path(store_file))
+    print(f"✅ {len(df)} new posts appended to {store_file}")
+    return df
@@ -1,77 +1,198 @@
-import os
-import pandas as pd
-import nltk
-from nltk.sentiment import SentimentIntensityAnalyzer
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
-import re
-from dotenv import load_dotenv
-
-# Download NLTK resources
-nltk.download("vader_lexicon")
-nltk.download("stopwords")
-nltk.download("wordnet")
-
-# Load environment variables
-load_dotenv()
-
-# Initialize VADER Sentiment Analyzer
-sia = SentimentIntensityAnalyzer()
-
-# Add crypto-specific terms to VADER lexicon
-crypto_lexicon = {
-    "hodl": 0.8,  # Positive sentiment
-    "fud": -0.8,  # Negative sentiment
-    "moon": 0.9,  # Positive sentiment
-    "rekt": -0.9,  # Negative sentiment
-}
-sia.lexicon.update(crypto_lexicon)
-
-def preprocess_text(text):
-    """Preprocess text by removing noise, stopwords, and lemmatizing."""
-    # Remove URLs
-    text = re.sub(r"http\S+|www\S+|https\S+", "", text, flags=re.MULTILINE)
-    # Remove special characters and numbers
-    text = re.sub(r"[^a-zA-Z\s]", "", text)
-    # Convert to lowercase
-    text = text.lower()
-    # Remove stopwords
-    stop_words = set(stopwords.words("english"))
-    text = " ".join([word for word in text.split() if word not in stop_words])
-    # Lemmatization
-    lemmatizer = WordNetLemmatizer()
-    text = " ".join([lemmatizer.lemmatize(word) for word in text.split()])
-    return text
-
-def analyze_sentiment(input_file="data/reddit_cleaned.csv", output_file="data/reddit_sentiment.csv"):
-    """Analyze sentiment of Reddit posts using VADER while retaining upvotes, comments, and timestamps."""
-    df = pd.read_csv(input_file)
-    
-    # Check if required columns exist
-    required_columns = {"cleaned_text", "upvotes", "comments", "timestamp"}
-    if not required_columns.issubset(df.columns):
-        print(f"⚠️ Required columns {required_columns} not found in CSV. Check preprocessing.")
-        return
-
-    # Preprocess text
-    df["cleaned_text"] = df["cleaned_text"].astype(str).apply(preprocess_text)
-
-    # Apply VADER sentiment analysis
-    df["sentiment_score"] = df["cleaned_text"].apply(lambda text: sia.polarity_scores(text)["compound"])
-    
-    # Classify sentiment using dynamic thresholds
-    lower_threshold = df["sentiment_score"].quantile(0.25)
-    upper_threshold = df["sentiment_score"].quantile(0.75)
-    df["sentiment_label"] = df["sentiment_score"].apply(
-        lambda score: "bullish" if score > upper_threshold else 
-                      "bearish" if score < lower_threshold else 
-                      "bullish" if df.loc[df["sentiment_score"] == score, "upvotes"].values[0] > 10 else "bearish"
-    )
-
-    # Save results with upvotes, comments, and timestamp
-    df[["cleaned_text", "upvotes", "comments", "timestamp", "sentiment_score", "sentiment_label"]].to_csv(output_file, index=False)
-    print(f"✅ Sentiment analysis complete! Saved to {output_file}")
-
-# Run sentiment analysis
-if __name__ == "__main__":
-    analyze_sentiment()
+import os
+import numpy as np
+import pandas as pd
+import nltk
+from nltk.sentiment import SentimentIntensityAnalyzer
+from multiprocessing import Pool
+from pathlib import Path
+from dotenv import load_dotenv
+from storage import append_table, load_table, save_table, table_exists
+from pipeline_state import load_state, mark_processed, read_delta, save_state
+from profiling import profiled, stage
+
+# Download NLTK resources
+nltk.download("vader_lexicon")
+
+# Load environment variables
+load_dotenv()
+
+# Initialize VADER Sentiment Analyzer
+sia = SentimentIntensityAnalyzer()
+
+# Add crypto-specific terms to VADER lexicon
+crypto_lexicon = {
+    "hodl": 0.8,  # Positive sentiment
+    "fud": -0.8,  # Negative sentiment
+    "moon": 0.9,  # Positive sentiment
+    "rekt": -0.9,  # Negative sentiment
+}
+sia.lexicon.update(crypto_lexicon)
+
+# Score quantiles below/above which posts are labelled bearish/bullish
+LOWER_QUANTILE = 0.25
+UPPER_QUANTILE = 0.75
+
+def _score_chunk(texts):
+    """VADER compound scores for a list of distinct texts."""
+    return [sia.polarity_scores(text)["compound"] for text in texts]
+
+def score_texts(texts, processes=None, chunk_size=2000):
+    """
+    VADER-score many normalized posts in parallel batches.
+
+    Texts are expected to be normalized already (text_normalization, run by
+    preprocess_text). Duplicate texts (reposts, crossposts) are scored once:
+    texts are factorized first and only the distinct ones are split into
+    chunks for a process pool. Pass processes=1 to score in this process.
+
+    Returns:
+        NumPy array of compound scores aligned with `texts`
+    """
+    codes, uniques = pd.factorize(pd.Series(texts, dtype=object).astype(str))
+    chunks = [uniques[i:i + chunk_size].tolist() for i in range(0, len(uniques), chunk_size)]
+
+    if processes == 1 or len(chunks) <= 1:
+        results = [_score_chunk(chunk) for chunk in chunks]
+    else:
+        with Pool(processes) as pool:
+            results = pool.map(_score_chunk, chunks)
+
+    scores = np.array([score for chunk_scores in results for score in chunk_scores], dtype=float)
+    return scores[codes]
+
+def label_sentiment(
+    scores,
+    upvotes,
+    lower_quantile=LOWER_QUANTILE,
+    upper_quantile=UPPER_QUANTILE,
+    upvote_threshold=10,
+    reference=None,
+    thresholds=None
+):
+    """
+    Label posts bullish/bearish from their VADER scores in one vectorized pass.
+
+    Scores above the upper quantile are bullish and below the lower quantile
+    bearish. Posts in between are bullish when they have more than
+    `upvote_threshold` upvotes. Quantiles are taken over `reference` scores
+    when given, else over `scores`; `thresholds` (lower, upper) replaces
+    them altogether (delta runs pass the quantiles of their score tally).
+    """
+    scores = pd.Series(scores)
+    if thresholds is None:
+        reference = scores if reference is None else pd.Series(reference)
+        thresholds = (reference.quantile(lower_quantile), reference.quantile(upper_quantile))
+    lower_threshold, upper_threshold = thresholds
+    scores = scores.to_numpy()
+    return np.select(
+        [scores > upper_threshold, scores < lower_threshold, np.asarray(upvotes) > upvote_threshold],
+        ["bullish", "bearish", "bullish"],
+        default="bearish"
+    )
+
+def tally_scores(scores, tally=None):
+    """
+    Add scores to a (values, counts) tally of distinct scores.
+
+    VADER compound scores are rounded to 4 decimals, so a tally of every
+    score ever seen stays under 20001 entries.
+    """
+    scores = np.asarray(scores, dtype=float)
+    scores = scores[~np.isnan(scores)]
+    values, counts = scores, np.ones(len(scores), dtype=np.int64)
+    if tally is not None:
+        values = np.concatenate([tally[0], values])
+        counts = np.concatenate([tally[1], counts])
+    values, inverse = np.unique(values, return_inverse=True)
+    return values, np.bincount(inverse, weights=counts, minlength=len(values)).astype(np.int64)
+
+def tally_quantile(tally, q):
+    """Quantile of the tallied scores, interpolated like Series.quantile (linear)."""
+    values, counts = tally
+    n = int(counts.sum())
+    if n == 0:
+        return np.nan
+    # Same virtual index and interpolation as numpy's "linear" method
+    position = (n - 1) * q
+    below = int(np.floor(position))
+    cumulative = np.cumsum(counts)
+    lower, upper = values[np.searchsorted(cumulative, [below, min(below + 1, n - 1)], side="right")]
+    gamma = position - below
+    if gamma >= 0.5:
+        return upper - (upper - lower) * (1 - gamma)
+    return lower + (upper - lower) * gamma
+
+def tally_path(output_file):
+    """Where delta runs keep the score tally of an output table."""
+    return Path(output_file).with_suffix(".scores.json")
+
+@profiled("sentiment_analysis")
+def analyze_sentiment(input_file="data/reddit_cleaned.csv", output_file="data/reddit_sentiment.csv", processes=None, delta=False):
+    """
+    Analyze sentiment of Reddit posts using VADER while retaining upvotes, comments, and timestamps.
+
+    With `delta`, only posts appended to the input since the last delta run
+    are scored and appended to the output. Their labels use quantile
+    thresholds over all scores so far, taken from a tally of every score
+    kept next to the output (tally_path) so the history isn't re-read;
+    earlier labels are left as they are.
+
+    Delta labels therefore drift from a full run's, whose thresholds come
+    from every score including later ones, so a small share of labels (and
+    of the signals built on them) differ between the two. Like a live run,
+    a delta run only uses the posts seen so far.
+    """
+    # Load only the columns this stage needs
+    required_columns = ["cleaned_text", "upvotes", "comments", "timestamp"]
+    try:
+        with stage("load_data") as loaded:
+            if delta:
+                df, _, total_rows, reset = read_delta(
+                    input_file, "sentiment_analysis", columns=required_columns, parse_dates=["timestamp"]
+                )
+            else:
+                df = load_table(input_file, columns=required_columns, parse_dates=["timestamp"])
+            loaded["rows"] = len(df)
+    except (KeyError, ValueError):
+        print(f"⚠️ Required columns {required_columns} not found in CSV. Check preprocessing.")
+        return
+
+    # Apply VADER sentiment analysis in parallel batches (text was cleaned
+    # once by preprocess_text, so it is scored as-is)
+    with stage("score", rows=len(df)):
+        df["cleaned_text"] = df["cleaned_text"].fillna("").astype(str)
+        df["sentiment_score"] = score_texts(df["cleaned_text"], processes=processes)
+    
+    # Classify sentiment using dynamic thresholds
+    with stage("label", rows=len(df)):
+        thresholds = None
+        if delta:
+            # Tally of the scores already in the output, rebuilt from it if
+            # missing or out of step with the checkpoint
+            processed = total_rows - len(df)
+            saved = {} if reset else load_state(tally_path(output_file))
+            if saved.get("rows") == processed:
+                tally = (np.array(saved["values"], dtype=float), np.array(saved["counts"], dtype=np.int64))
+            elif processed and table_exists(output_file):
+                tally = tally_scores(load_table(output_file, columns=["sentiment_score"])["sentiment_score"])
+            else:
+                tally = None
+            tally = tally_scores(df["sentiment_score"], tally)
+            thresholds = (tally_quantile(tally, LOWER_QUANTILE), tally_quantile(tally, UPPER_QUANTILE))
+        df["sentiment_label"] = label_sentiment(df["sentiment_score"], df["upvotes"], thresholds=thresholds)
+
+    # Save results with upvotes, comments, and timestamp
+    output = df[["cleaned_text", "upvotes", "comments", "timestamp", "sentiment_score", "sentiment_label"]]
+    with stage("write_results", rows=len(output)):
+        if delta and not reset:
+            append_table(output, output_file)
+        else:
+            save_table(output, output_file)
+    if delta:
+        save_state({"rows": total_rows, "values": tally[0].tolist(), "counts": tally[1].tolist()}, tally_path(output_file))
+        mark_processed("sentiment_analysis", input_file, total_rows)
+    print(f"✅ Sentiment analysis complete! Saved to {output_file} ({len(output)} rows processed)")
+
+# Run sentiment analysis
+if __name__ == "__main__":
+    analyze_sentiment()
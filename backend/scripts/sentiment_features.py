@@ -0,0 +1,207 @@
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+from generate_signals import signal_rules
+from profiling import profiled, stage
+from storage import load_table, save_table, table_exists
+
+# Load environment variables
+load_dotenv()
+
+# Bar length when there are no price bars to take it from (bitcoin_prices' default timeframe)
+DEFAULT_BAR = "1h"
+# Weight of a comment relative to an upvote in a post's engagement
+COMMENT_WEIGHT = 2.0
+
+
+def post_weights(upvotes, comments, comment_weight=COMMENT_WEIGHT):
+    """
+    Engagement weight of each post: 1 + log1p(upvotes + comment_weight * comments).
+
+    The log keeps a single viral post from outweighing a bar's worth of
+    ordinary ones; posts without engagement still count once.
+    """
+    engagement = np.clip(np.asarray(upvotes, dtype=float), 0, None) + \
+        comment_weight * np.clip(np.asarray(comments, dtype=float), 0, None)
+    return 1.0 + np.log1p(np.nan_to_num(engagement))
+
+
+def bar_length(price_file="data/historical_prices.csv"):
+    """
+    Bar length and grid origin of the price bars (median spacing, first bar).
+
+    Returns:
+        Tuple of (Timedelta, first bar Timestamp), or (DEFAULT_BAR, None)
+        without price bars
+    """
+    if not table_exists(price_file):
+        return pd.Timedelta(DEFAULT_BAR), None
+    times = load_table(price_file, columns=["timestamp"], parse_dates=["timestamp"])["timestamp"].dropna()
+    times = times.sort_values().to_numpy(dtype="datetime64[ns]")
+    if len(times) < 2:
+        return pd.Timedelta(DEFAULT_BAR), (pd.Timestamp(times[0]) if len(times) else None)
+    return pd.Timedelta(np.median(np.diff(times))), pd.Timestamp(times[0])
+
+
+def decayed_sums(values, decay):
+    """
+    Exponentially decayed running sums over consecutive bars:
+    S[k] = decay * S[k-1] + values[k], for every column at once.
+
+    Runs as one pandas ewm pass: with alpha = 1 - decay and adjust=False,
+    ewm computes y[k] = decay * y[k-1] + alpha * x[k], so scaling the input
+    by 1 / alpha (and starting from a zero row) gives S.
+    """
+    alpha = 1.0 - decay
+    scaled = pd.DataFrame(np.vstack([np.zeros((1, values.shape[1])), values / alpha]))
+    return scaled.ewm(alpha=alpha, adjust=False).mean().to_numpy()[1:]
+
+
+def aggregate_sentiment(
+    posts,
+    bar="1h",
+    half_life="6h",
+    origin=None,
+    comment_weight=COMMENT_WEIGHT,
+    buy_threshold=0.6,
+    sell_threshold=0.6
+):
+    """
+    Resample scored posts into one engagement-weighted, time-decayed row per bar.
+
+    Every post is weighted by post_weights and decays by half every
+    `half_life` from its timestamp, so the features of a bar are taken over
+    all earlier posts: bar features decay to each bar's close, then carry
+    into the following bars. Posts are bucketed with one groupby and
+    the bars are chained with one ewm pass (decayed_sums).
+
+    Bars are labelled by their start (like price bars) and cover
+    [start, start + bar); a bar's features only use posts up to its close.
+
+    Args:
+        posts: Frame with timestamp and sentiment_label (optionally
+            sentiment_score, upvotes, comments), in any order
+        bar: Bar length, e.g. "1h" or "15min"
+        half_life: Time for a post's weight to halve, e.g. "6h"
+        origin: Timestamp the bar grid is aligned to (e.g. the first price
+            bar; default: midnight)
+        comment_weight: Weight of a comment relative to an upvote
+        buy_threshold, sell_threshold: signal_rules thresholds on the
+            decayed bullish/bearish shares
+
+    Returns:
+        One row per bar from the first post's bar to the last one's, with
+        timestamp, post_count, engagement (raw upvotes + comments),
+        activity (decayed weight), sentiment_score (decayed weighted mean,
+        when scores are given), bullish_trend, bearish_trend and signal
+    """
+    bar, half_life = pd.Timedelta(bar), pd.Timedelta(half_life)
+    if bar <= pd.Timedelta(0) or half_life <= pd.Timedelta(0):
+        raise ValueError(f"bar and half_life must be positive, got {bar} and {half_life}")
+    posts = posts.dropna(subset=["timestamp"])
+    times = pd.to_datetime(posts["timestamp"]).to_numpy(dtype="datetime64[ns]").astype(np.int64)
+    columns = ["timestamp", "post_count", "engagement", "activity"] + \
+        (["sentiment_score"] if "sentiment_score" in posts.columns else []) + \
+        ["bullish_trend", "bearish_trend", "signal"]
+    if not len(times):
+        return pd.DataFrame(columns=columns)
+
+    # Bucket every post into its bar (integer nanoseconds from the grid origin)
+    step = bar.value
+    origin = pd.Timestamp(origin).as_unit("ns").value if origin is not None else pd.Timestamp(times.min()).floor("D").value
+    bar_no = (times - origin) // step
+    first_bar = bar_no.min()
+    bar_no = bar_no - first_bar
+    n_bars = int(bar_no.max()) + 1
+
+    # Post weight, decayed from the post to its bar's close
+    upvotes = posts["upvotes"] if "upvotes" in posts.columns else np.zeros(len(posts))
+    comments = posts["comments"] if "comments" in posts.columns else np.zeros(len(posts))
+    bar_close = origin + (bar_no + first_bar + 1) * step
+    weight = post_weights(upvotes, comments, comment_weight) * \
+        np.exp2(-(bar_close - times) / half_life.value)
+    labels = posts["sentiment_label"].to_numpy(dtype=object)
+    per_post = {
+        "post_count": np.ones(len(times)),
+        "engagement": np.nan_to_num(np.asarray(upvotes, dtype=float)) + np.nan_to_num(np.asarray(comments, dtype=float)),
+        "weight": weight,
+        "bullish": weight * (labels == "bullish"),
+        "bearish": weight * (labels == "bearish"),
+    }
+    if "sentiment_score" in posts.columns:
+        score = posts["sentiment_score"].to_numpy(dtype=float)
+        # Posts without a score don't pull the mean towards 0
+        per_post["score_weight"] = np.where(np.isnan(score), 0.0, weight)
+        per_post["score"] = np.nan_to_num(score) * weight
+
+    # One groupby over all posts, then every bar of the grid (empty ones 0)
+    sums = pd.DataFrame(per_post).groupby(bar_no).sum().reindex(range(n_bars), fill_value=0.0)
+
+    # Carry the weighted sums from bar to bar, halving every half_life
+    decayed_columns = [column for column in sums.columns if column not in ("post_count", "engagement")]
+    decayed = pd.DataFrame(
+        decayed_sums(sums[decayed_columns].to_numpy(), np.exp2(-step / half_life.value)),
+        columns=decayed_columns
+    )
+    features = pd.DataFrame({
+        "timestamp": pd.to_datetime(origin + (np.arange(n_bars) + first_bar) * step),
+        "post_count": sums["post_count"].to_numpy(dtype=np.int64),
+        "engagement": sums["engagement"].to_numpy(),
+        "activity": decayed["weight"].to_numpy(),
+    })
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if "score" in decayed.columns:
+            features["sentiment_score"] = decayed["score"].to_numpy() / decayed["score_weight"].to_numpy()
+        bullish_trend = decayed["bullish"].to_numpy() / decayed["weight"].to_numpy()
+        bearish_trend = decayed["bearish"].to_numpy() / decayed["weight"].to_numpy()
+    features["bullish_trend"] = bullish_trend
+    features["bearish_trend"] = bearish_trend
+    features["signal"] = signal_rules(bullish_trend, bearish_trend, buy_threshold, sell_threshold)
+    return features[columns]
+
+
+@profiled("sentiment_features")
+def build_sentiment_features(
+    input_file="data/reddit_sentiment.csv",
+    price_file="data/historical_prices.csv",
+    output_file="data/sentiment_features.csv",
+    bar=None,
+    half_life="6h",
+    comment_weight=COMMENT_WEIGHT,
+    buy_threshold=0.6,
+    sell_threshold=0.6
+):
+    """
+    Aggregate scored posts into bar-aligned sentiment features.
+
+    The bars default to the price bars' timeframe and grid (bar_length), so
+    the output has one row per price bar the posts span and can be passed to
+    backtest_trading_strategy as its `sentiment_file` in place of the
+    per-post trading signals.
+    """
+    with stage("load_data") as loaded:
+        if not table_exists(input_file):
+            print(f"❌ Error: {input_file} file not found.")
+            return
+        posts = load_table(input_file, parse_dates=["timestamp"])
+        loaded["rows"] = len(posts)
+    if "sentiment_label" not in posts.columns:
+        print("⚠️ No 'sentiment_label' column found. Run sentiment analysis first.")
+        return
+
+    price_bar, origin = bar_length(price_file)
+    bar = pd.Timedelta(bar) if bar is not None else price_bar
+    with stage("aggregate", rows=len(posts)):
+        features = aggregate_sentiment(
+            posts, bar=bar, half_life=half_life, origin=origin, comment_weight=comment_weight,
+            buy_threshold=buy_threshold, sell_threshold=sell_threshold
+        )
+    with stage("write_results", rows=len(features)):
+        save_table(features, output_file)
+    print(f"✅ Sentiment features for {len(features)} bars of {bar} ({len(posts)} posts) saved to {output_file}")
+    return features
+
+
+# Run sentiment aggregation
+if __name__ == "__main__":
+    build_sentiment_features()
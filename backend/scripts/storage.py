@@ -0,0 +1,306 @@
+import os
+import shutil
+import logging
+import operator
+import pandas as pd
+from pathlib import Path
+from typing import List, Optional
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    from pyarrow import feather
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# Columnar format every stage writes: "parquet", "feather" or "csv"
+DATA_FORMAT = os.getenv("DATA_FORMAT", "parquet")
+# Also write the .csv next to the columnar file (the API and notebooks read CSV)
+EXPORT_CSV = os.getenv("DATA_EXPORT_CSV", "1") == "1"
+
+FORMAT_SUFFIXES = {"csv": ".csv", "parquet": ".parquet", "feather": ".feather"}
+
+# Columnar tables are appended to as part files next to the main file; once
+# this many have piled up, the next append compacts them into the main file
+MAX_PARTS = int(os.getenv("DATA_MAX_PARTS", "32"))
+
+_warned_no_pyarrow = False
+
+def resolve_format(fmt: Optional[str] = None) -> str:
+    """Pick the storage format, falling back to CSV when pyarrow is missing."""
+    global _warned_no_pyarrow
+    fmt = fmt or DATA_FORMAT
+    if fmt not in FORMAT_SUFFIXES:
+        raise ValueError(f"Unknown data format '{fmt}'. Expected one of: {list(FORMAT_SUFFIXES)}")
+    if fmt != "csv" and not HAS_PYARROW:
+        if not _warned_no_pyarrow:
+            logging.warning(f"⚠️ pyarrow is not installed; storing data as CSV instead of {fmt}.")
+            _warned_no_pyarrow = True
+        return "csv"
+    return fmt
+
+def table_path(path, fmt: str) -> Path:
+    """Swap a data file path's extension for the given format's."""
+    return Path(path).with_suffix(FORMAT_SUFFIXES[fmt])
+
+def parts_dir(path) -> Path:
+    """Directory holding the part files appended to a columnar table."""
+    return Path(path).with_suffix(".parts")
+
+def table_files(path, fmt: str) -> List[Path]:
+    """A columnar table's main file followed by its appended part files, in order."""
+    main = table_path(path, fmt)
+    if not main.exists():
+        return []
+    return [main] + sorted(parts_dir(path).glob(f"part-*{FORMAT_SUFFIXES[fmt]}"))
+
+def _write_columnar(df: pd.DataFrame, target: Path, fmt: str):
+    if fmt == "parquet":
+        df.to_parquet(target, index=False)
+    elif fmt == "feather":
+        df.reset_index(drop=True).to_feather(target)
+
+def _read_columnar(file: Path, fmt: str, columns=None, filters=None) -> pd.DataFrame:
+    if fmt == "parquet":
+        return pd.read_parquet(file, columns=columns, memory_map=True, filters=filters or None)
+    table = feather.read_table(file, columns=columns, memory_map=True)
+    if filters:
+        table = table.filter(pq.filters_to_expression(filters))
+    return table.to_pandas()
+
+def _columnar_shape(file: Path, fmt: str):
+    """(rows, column names) of a columnar file, from its metadata."""
+    if fmt == "parquet":
+        parquet_file = pq.ParquetFile(file)
+        return parquet_file.metadata.num_rows, parquet_file.schema_arrow.names
+    table = feather.read_table(file, memory_map=True)
+    return table.num_rows, table.column_names
+
+def _current_columnar(path, fmt: Optional[str] = None):
+    """
+    The columnar format and files load_table reads a table from, or
+    (None, []) when it reads the CSV.
+
+    A parquet/feather copy is used when it exists and is at least as new as
+    the CSV (so a hand-edited CSV still wins).
+    """
+    if not HAS_PYARROW:
+        return None, []
+    candidates = [resolve_format(fmt)] if fmt else [resolve_format(), "parquet", "feather"]
+    csv_path = table_path(path, "csv")
+    csv_mtime = csv_path.stat().st_mtime if csv_path.exists() else None
+    for candidate in dict.fromkeys(candidates):
+        if candidate == "csv":
+            continue
+        files = table_files(path, candidate)
+        if not files:
+            continue
+        if fmt is None and csv_mtime is not None and max(file.stat().st_mtime for file in files) < csv_mtime:
+            continue
+        return candidate, files
+    return None, []
+
+def save_table(df: pd.DataFrame, path, fmt: Optional[str] = None, export_csv: Optional[bool] = None) -> Path:
+    """
+    Save a pipeline table in the configured format.
+
+    `path` is the table's usual name (e.g. "data/trading_signals.csv"); the
+    extension is replaced by the format's. Columnar files keep dtypes, so
+    timestamps don't need re-parsing downstream. A CSV copy is written too
+    when `export_csv` (default: DATA_EXPORT_CSV) is set.
+
+    Returns:
+        Path of the primary file written
+    """
+    fmt = resolve_format(fmt)
+    export_csv = EXPORT_CSV if export_csv is None else export_csv
+    target = table_path(path, fmt)
+    target.parent.mkdir(parents=True, exist_ok=True)
+
+    # Write the CSV first so the columnar copy is never older than it
+    if fmt == "csv" or export_csv:
+        df.to_csv(table_path(path, "csv"), index=False)
+    _write_columnar(df, target, fmt)
+    # The new file holds every row: drop the parts appended to the old one
+    shutil.rmtree(parts_dir(path), ignore_errors=True)
+    return target
+
+def table_columns(path, fmt: Optional[str] = None) -> List[str]:
+    """Column names of a pipeline table, read from its schema or CSV header only."""
+    fmt_read, files = _current_columnar(path, fmt)
+    if fmt_read is not None:
+        return _columnar_shape(files[0], fmt_read)[1]
+    return list(pd.read_csv(table_path(path, "csv"), nrows=0).columns)
+
+def load_table(
+    path,
+    columns: Optional[List[str]] = None,
+    parse_dates: Optional[List[str]] = None,
+    fmt: Optional[str] = None,
+    filters: Optional[List[tuple]] = None,
+    start: int = 0
+) -> pd.DataFrame:
+    """
+    Load a pipeline table, preferring a columnar copy over the CSV.
+
+    A parquet/feather file (plus the part files appended to it) is used when
+    it exists and is at least as new as the CSV (so a hand-edited CSV still
+    wins). Only `columns` are read, and feather files are memory-mapped.
+    `parse_dates` columns are converted to datetime unless they already are.
+
+    `filters` are (column, op, value) tuples that must all hold, e.g.
+    [("timestamp", ">=", start)]. Parquet pushes them down so only matching
+    row groups are read and feather filters the memory-mapped table before
+    converting it; CSV is read in full and filtered afterwards. Filters on
+    columns the table doesn't have are skipped, so a time range can be
+    passed for a snapshot table without timestamps.
+
+    `start` skips the table's first rows (before `filters` apply). Columnar
+    files that lie wholly before it aren't read, so reading the rows
+    appended since a checkpoint doesn't load the whole table.
+    """
+    fmt_read, files = _current_columnar(path, fmt)
+    read_columns = columns
+    if filters:
+        available = table_columns(path, fmt)
+        filters = [condition for condition in filters if condition[0] in available]
+        if columns:
+            read_columns = list(dict.fromkeys(list(columns) + [column for column, _, _ in filters]))
+    filter_after = bool(filters) and (fmt_read is None or start > 0)
+
+    if fmt_read is not None:
+        frames = []
+        skip = start
+        for file in files:
+            if skip:
+                rows, _ = _columnar_shape(file, fmt_read)
+                if skip >= rows and file != files[-1]:
+                    skip -= rows
+                    continue
+            frame = _read_columnar(file, fmt_read, read_columns, None if filter_after else filters)
+            frames.append(frame.iloc[skip:] if skip else frame)
+            skip = 0
+        df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0].reset_index(drop=True)
+    else:
+        csv_path = table_path(path, "csv")
+        df = pd.read_csv(csv_path, usecols=read_columns, skiprows=range(1, start + 1) if start else None)
+
+    for column in parse_dates or []:
+        if column in df.columns and not pd.api.types.is_datetime64_any_dtype(df[column]):
+            df[column] = pd.to_datetime(df[column])
+
+    if filter_after:
+        df = df[filter_mask(df, filters)].reset_index(drop=True)
+    if columns:
+        df = df[columns]
+    return df
+
+def filter_mask(df: pd.DataFrame, filters: List[tuple]) -> pd.Series:
+    """Rows of `df` matching load_table-style filters (those on missing columns are skipped)."""
+    comparisons = {"==": operator.eq, "!=": operator.ne, "<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge}
+    mask = pd.Series(True, index=df.index)
+    for column, op, value in filters:
+        if column in df.columns:
+            mask &= comparisons[op](df[column], value)
+    return mask
+
+def table_exists(path) -> bool:
+    """True if the table exists in any supported format."""
+    return any(table_path(path, fmt).exists() for fmt in FORMAT_SUFFIXES)
+
+def append_table(df: pd.DataFrame, path, fmt: Optional[str] = None, export_csv: Optional[bool] = None) -> Path:
+    """
+    Append rows to a pipeline table, creating it if needed.
+
+    CSV tables with matching columns are appended in place. Columnar files
+    can't be appended to, so the rows are written as the table's next part
+    file (and appended to its CSV copy), which keeps an append proportional
+    to the new rows. Past MAX_PARTS parts, or when the columns differ, the
+    table is rewritten with the new rows added instead.
+    """
+    if not table_exists(path):
+        return save_table(df, path, fmt=fmt, export_csv=export_csv)
+
+    fmt = resolve_format(fmt)
+    export_csv = EXPORT_CSV if export_csv is None else export_csv
+    csv_path = table_path(path, "csv")
+    csv_matches = csv_path.exists() and list(pd.read_csv(csv_path, nrows=0).columns) == list(df.columns)
+    if fmt == "csv" and csv_matches:
+        df.to_csv(csv_path, mode="a", header=False, index=False)
+        return csv_path
+
+    current_fmt, files = _current_columnar(path, fmt)
+    if (
+        current_fmt == fmt
+        and len(files) <= MAX_PARTS
+        and _columnar_shape(files[0], fmt)[1] == list(df.columns)
+        and (csv_matches or not export_csv)
+    ):
+        # Write the CSV first so the columnar copy is never older than it
+        if export_csv:
+            df.to_csv(csv_path, mode="a", header=False, index=False)
+        part = parts_dir(path) / f"part-{len(files):05d}{FORMAT_SUFFIXES[fmt]}"
+        part.parent.mkdir(parents=True, exist_ok=True)
+        _write_columnar(df, part, fmt)
+        return part
+
+    combined = pd.concat([load_table(path), df], ignore_index=True)
+    return save_table(combined, path, fmt=fmt, export_csv=export_csv)
+
+class TableWriter:
+    """
+    Write a pipeline table chunk by chunk without holding it all in memory.
+
+    Parquet and feather chunks are streamed into one file with the schema of
+    the first chunk; CSV chunks are appended. Use as a context manager:
+
+        with TableWriter("data/merged_data.csv") as writer:
+            for chunk in chunks:
+                writer.write(chunk)
+    """
+
+    def __init__(self, path, fmt: Optional[str] = None, export_csv: Optional[bool] = None):
+        self.fmt = resolve_format(fmt)
+        self.export_csv = EXPORT_CSV if export_csv is None else export_csv
+        self.target = table_path(path, self.fmt)
+        self.csv_path = table_path(path, "csv")
+        self.rows = 0
+        self._writer = None
+        self._schema = None
+        self.target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.rmtree(parts_dir(path), ignore_errors=True)
+
+    def write(self, df: pd.DataFrame):
+        if self.fmt == "csv" or self.export_csv:
+            df.to_csv(self.csv_path, mode="w" if self.rows == 0 else "a", header=self.rows == 0, index=False)
+        if self.fmt != "csv":
+            table = pa.Table.from_pandas(df, schema=self._schema, preserve_index=False)
+            if self._writer is None:
+                self._schema = table.schema
+                if self.fmt == "parquet":
+                    self._writer = pq.ParquetWriter(self.target, self._schema)
+                else:
+                    self._writer = pa.ipc.new_file(self.target, self._schema)
+            if self.fmt == "parquet":
+                self._writer.write_table(table)
+            else:
+                self._writer.write(table)
+        self.rows += len(df)
+
+    def close(self) -> Path:
+        # Closing the columnar file last keeps it at least as new as the CSV
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        return self.target
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,298 @@
+import math
+from collections import deque
+from typing import Optional
+
+class RollingWindow:
+    """
+    Fixed-size ring buffer with O(1) rolling mean and sample std.
+
+    Mean and variance are updated incrementally (Welford add/remove) and
+    re-derived from the buffer every `resync_every` windows to stop
+    floating-point drift on long streams. NaNs occupy a slot but are left
+    out of the statistics, as in pandas' rolling().
+    """
+
+    def __init__(self, window: int, min_periods: Optional[int] = None, resync_every: int = 64):
+        self.window = window
+        self.min_periods = window if min_periods is None else min_periods
+        self._values = deque(maxlen=window)
+        self._count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._resync_at = window * resync_every
+        self._updates = 0
+
+    def update(self, value: float):
+        value = float(value)
+        if len(self._values) == self.window:
+            self._remove(self._values[0])
+        self._values.append(value)
+        self._add(value)
+
+        self._updates += 1
+        if self._updates >= self._resync_at:
+            self._resync()
+
+    def _add(self, value: float):
+        if math.isnan(value):
+            return
+        self._count += 1
+        delta = value - self._mean
+        self._mean += delta / self._count
+        self._m2 += delta * (value - self._mean)
+
+    def _remove(self, value: float):
+        if math.isnan(value):
+            return
+        self._count -= 1
+        if self._count == 0:
+            self._mean = self._m2 = 0.0
+            return
+        old_mean = self._mean
+        self._mean = (old_mean * (self._count + 1) - value) / self._count
+        self._m2 -= (value - old_mean) * (value - self._mean)
+
+    def _resync(self):
+        values = [v for v in self._values if not math.isnan(v)]
+        self._count = len(values)
+        self._mean = math.fsum(values) / self._count if values else 0.0
+        self._m2 = math.fsum((v - self._mean) ** 2 for v in values)
+        self._updates = 0
+
+    @property
+    def ready(self) -> bool:
+        return self._count >= max(self.min_periods, 1)
+
+    @property
+    def mean(self) -> float:
+        return self._mean if self.ready else math.nan
+
+    @property
+    def std(self) -> float:
+        if not self.ready or self._count < 2:
+            return math.nan
+        return math.sqrt(max(self._m2, 0.0) / (self._count - 1))
+
+class StreamingRSI:
+    """
+    Incremental RSI.
+
+    method="sma" (default) averages gains and losses over the last `period`
+    deltas, matching indicators.calculate_rsi. method="wilder" uses Wilder's
+    exponential smoothing, seeded with the first simple average.
+    """
+
+    def __init__(self, period: int = 14, method: str = "sma"):
+        if method not in ("sma", "wilder"):
+            raise ValueError(f"Unknown RSI method '{method}'. Expected 'sma' or 'wilder'.")
+        self.period = period
+        self.method = method
+        self._gains = RollingWindow(period)
+        self._losses = RollingWindow(period)
+        self._prev = None
+        self._avg_gain = None
+        self._avg_loss = None
+        self.value = math.nan
+
+    def update(self, price: float) -> float:
+        # The batch version turns the first (NaN) delta into a zero gain/loss
+        delta = 0.0 if self._prev is None else price - self._prev
+        self._prev = price
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+
+        self._gains.update(gain)
+        self._losses.update(loss)
+        if self.method == "sma" or self._avg_gain is None:
+            avg_gain, avg_loss = self._gains.mean, self._losses.mean
+            if self.method == "wilder" and self._gains.ready:
+                self._avg_gain, self._avg_loss = avg_gain, avg_loss
+        else:
+            self._avg_gain = (self._avg_gain * (self.period - 1) + gain) / self.period
+            self._avg_loss = (self._avg_loss * (self.period - 1) + loss) / self.period
+            avg_gain, avg_loss = self._avg_gain, self._avg_loss
+
+        self.value = _rsi_from_averages(avg_gain, avg_loss)
+        return self.value
+
+def _rsi_from_averages(avg_gain: float, avg_loss: float) -> float:
+    if math.isnan(avg_gain) or math.isnan(avg_loss):
+        return math.nan
+    if avg_loss == 0:
+        return math.nan if avg_gain == 0 else 100.0
+    return 100 - (100 / (1 + avg_gain / avg_loss))
+
+class StreamingSentimentTrend:
+    """
+    Rolling bullish/bearish share over the last `window` posts.
+
+    Mirrors generate_trading_signals: the share is averaged over however
+    many posts have arrived so far (min_periods=1), then thresholded.
+    """
+
+    def __init__(self, window: int = 10, buy_threshold: float = 0.6, sell_threshold: float = 0.6):
+        self.window = window
+        self.buy_threshold = buy_threshold
+        self.sell_threshold = sell_threshold
+        self._labels = deque(maxlen=window)
+        self._bullish = 0
+        self._bearish = 0
+
+    def update(self, sentiment_label: str) -> dict:
+        if len(self._labels) == self.window:
+            dropped = self._labels[0]
+            self._bullish -= dropped == "bullish"
+            self._bearish -= dropped == "bearish"
+        self._labels.append(sentiment_label)
+        self._bullish += sentiment_label == "bullish"
+        self._bearish += sentiment_label == "bearish"
+
+        bullish_trend = self._bullish / len(self._labels)
+        bearish_trend = self._bearish / len(self._labels)
+        if bullish_trend > self.buy_threshold:
+            signal = "BUY"
+        elif bearish_trend > self.sell_threshold:
+            signal = "SELL"
+        else:
+            signal = "HOLD"
+        return {"bullish_trend": bullish_trend, "bearish_trend": bearish_trend, "signal": signal}
+
+class StreamingStrategy:
+    """
+    Live counterpart of generate_trading_signals + backtest_trading_strategy.
+
+    Feed candles with on_candle() and sentiment posts with on_sentiment().
+    Each post is joined with the latest candle (as-of, like merge_asof),
+    updates the sentiment trend and the SMA/Bollinger/RSI state, and
+    immediately returns the signal plus any trade the backtest rules take
+    on that row. Replaying the same data gives the batch signals and trades.
+    """
+
+    def __init__(
+        self,
+        initial_balance: float = 1000,
+        stop_loss_pct: float = 0.05,
+        take_profit_pct: float = 0.1,
+        moving_avg_window: int = 20,
+        min_confidence: float = 0.6,
+        signal_window: int = 10,
+        rsi_period: int = 14
+    ):
+        self.stop_loss_pct = stop_loss_pct
+        self.take_profit_pct = take_profit_pct
+        self.moving_avg_window = moving_avg_window
+        self.min_confidence = min_confidence
+        self.trend = StreamingSentimentTrend(window=signal_window)
+        self.prices = RollingWindow(moving_avg_window)
+        self.rsi = StreamingRSI(rsi_period)
+
+        self.balance = initial_balance
+        self.btc_holdings = 0.0
+        self.entry_price = 0.0
+        self.trades = []
+        self.last_close = math.nan
+        self._rows = 0
+
+    def on_candle(self, timestamp, close: float):
+        """Record the latest closing price; it is used by the following posts."""
+        self.last_close = float(close)
+
+    def on_sentiment(self, timestamp, sentiment_label: str, confidence: float = 1.0) -> dict:
+        """Process one sentiment row and return its signal, indicators and trade (if any)."""
+        state = self.trend.update(sentiment_label)
+        current_price = self.last_close
+        self.prices.update(current_price)
+        sma = self.prices.mean
+        upper_band = sma + (self.prices.std * 2)
+        rsi = self.rsi.update(current_price)
+
+        trade = None
+        if self._rows >= self.moving_avg_window:
+            trade = self._apply_rules(state["signal"], current_price, sma, rsi, upper_band, confidence)
+            if trade:
+                self.trades.append((trade, timestamp, current_price))
+        self._rows += 1
+
+        state.update({
+            "timestamp": timestamp,
+            "close": current_price,
+            "SMA": sma,
+            "Upper_Band": upper_band,
+            "RSI": rsi,
+            "trade": trade,
+        })
+        return state
+
+    def close_position(self, timestamp=None):
+        """Close an open position at the latest price, like the end of a backtest."""
+        if self.btc_holdings > 0:
+            self.balance = self.btc_holdings * self.last_close
+            self.btc_holdings = 0.0
+            self.trades.append(("SELL", timestamp, self.last_close))
+        return self.balance
+
+    def _apply_rules(self, signal, current_price, sma, rsi, upper_band, confidence):
+        if self.btc_holdings > 0:
+            loss_pct = (current_price - self.entry_price) / self.entry_price
+            if loss_pct <= -self.stop_loss_pct:
+                return self._exit("STOP_LOSS", current_price)
+            if loss_pct >= self.take_profit_pct:
+                return self._exit("TAKE_PROFIT", current_price)
+
+        if signal == "BUY" and self.balance > 0:
+            if (
+                confidence >= self.min_confidence and
+                current_price > sma and
+                rsi < 70 and
+                current_price < upper_band
+            ):
+                self.btc_holdings = self.balance / current_price
+                self.balance = 0
+                self.entry_price = current_price
+                return "BUY"
+        elif signal == "SELL" and self.btc_holdings > 0:
+            if (
+                confidence >= self.min_confidence or
+                current_price < sma or
+                rsi > 70 or
+                current_price > upper_band
+            ):
+                return self._exit("SELL", current_price)
+        return None
+
+    def _exit(self, action, current_price):
+        self.balance = self.btc_holdings * current_price
+        self.btc_holdings = 0.0
+        return action
+
+def replay(sentiment, prices, **strategy_kwargs):
+    """
+    Stream historical sentiment rows and candles through a StreamingStrategy.
+
+    Events are processed in timestamp order with candles first on ties, which
+    is the as-of alignment backtest_strategy.load_backtest_data uses. The
+    sentiment trend therefore matches generate_trading_signals when its
+    input file is in time order, as a live feed is.
+
+    Returns:
+        Tuple of (strategy, list of per-row outputs)
+    """
+    strategy = StreamingStrategy(**strategy_kwargs)
+    has_confidence = "confidence" in sentiment.columns
+    sentiment = sentiment.sort_values("timestamp", kind="stable")
+    prices = prices.sort_values("timestamp", kind="stable")
+    price_times = prices["timestamp"].tolist()
+    price_closes = prices["close"].tolist()
+
+    outputs = []
+    p = 0
+    for row in sentiment.itertuples(index=False):
+        while p < len(price_times) and price_times[p] <= row.timestamp:
+            strategy.on_candle(price_times[p], price_closes[p])
+            p += 1
+        confidence = row.confidence if has_confidence else 1.0
+        outputs.append(strategy.on_sentiment(row.timestamp, row.sentiment_label, confidence))
+
+    if outputs:
+        strategy.close_position(outputs[-1]["timestamp"])
+    return strategy, outputs
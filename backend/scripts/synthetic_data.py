@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+
+def make_price_bars(n=1000, start="2025-01-01", freq="1min", start_price=95000.0, volatility=0.002, seed=42):
+    """Generate seeded random-walk OHLCV bars shaped like historical_prices.csv."""
+    rng = np.random.default_rng(seed)
+    close = start_price * np.exp(np.cumsum(rng.normal(0, volatility, n)))
+    open_ = np.concatenate(([start_price], close[:-1]))
+    spread = np.abs(rng.normal(0, volatility / 2, n)) * close
+    return pd.DataFrame({
+        "timestamp": pd.date_range(start, periods=n, freq=freq),
+        "open": open_,
+        "high": np.maximum(open_, close) + spread,
+        "low": np.minimum(open_, close) - spread,
+        "close": close,
+        "volume": rng.gamma(2.0, 150.0, n),
+    })
+
+def make_trading_signals(n=1000, start="2025-01-01", freq="1min", persistence=0.95, seed=42):
+    """Generate seeded BUY/SELL/HOLD rows shaped like trading_signals.csv."""
+    rng = np.random.default_rng(seed)
+    # Sticky regimes so signals come in runs, like rolling sentiment trends do
+    switch = rng.random(n) > persistence
+    regime = rng.integers(0, 3, n)
+    regime = regime[np.maximum.accumulate(np.where(switch | (np.arange(n) == 0), np.arange(n), 0))]
+    bullish_trend = np.clip(np.where(regime == 0, 0.75, 0.35) + rng.normal(0, 0.1, n), 0, 1)
+    bearish_trend = np.clip(np.where(regime == 1, 0.75, 0.35) + rng.normal(0, 0.1, n), 0, 1)
+    signal = np.where(bullish_trend > 0.6, "BUY", np.where(bearish_trend > 0.6, "SELL", "HOLD"))
+    return pd.DataFrame({
+        "timestamp": pd.date_range(start, periods=n, freq=freq),
+        "sentiment_label": np.where(bullish_trend >= bearish_trend, "bullish", "bearish"),
+        "bullish_trend": bullish_trend,
+        "bearish_trend": bearish_trend,
+        "signal": signal,
+    })
+
+def make_sentiment_posts(n=1000, start="2025-01-01", freq="1min", bullish_share=0.55, seed=42):
+    """Generate seeded scored posts shaped like reddit_sentiment.csv."""
+    rng = np.random.default_rng(seed)
+    words = np.array(["bitcoin", "moon", "hodl", "fud", "rekt", "pump", "dump", "bull", "bear", "eth"])
+    text = pd.Series(words[rng.integers(0, len(words), n)]) + " " + pd.Series(words[rng.integers(0, len(words), n)])
+    score = np.clip(rng.normal(0.1, 0.4, n), -1, 1).round(4)
+    return pd.DataFrame({
+        "cleaned_text": text,
+        "upvotes": rng.poisson(20, n),
+        "comments": rng.poisson(8, n),
+        "timestamp": pd.date_range(start, periods=n, freq=freq) + pd.to_timedelta(rng.integers(0, 60, n), unit="s"),
+        "sentiment_score": score,
+        "sentiment_label": np.where(rng.random(n) < bullish_share, "bullish", "bearish"),
+    })
+
+def make_reddit_posts(n=1000, start="2025-01-01", freq="1min", seed=42):
+    """Generate seeded cleaned posts shaped like reddit_cleaned.csv (mostly distinct texts)."""
+    rng = np.random.default_rng(seed)
+    words = np.array([
+        "bitcoin", "moon", "hodl", "fud", "rekt", "pump", "dump", "bull", "bear", "eth",
+        "price", "market", "crash", "rally", "buy", "sell", "whale", "altcoin", "halving", "etf",
+        "good", "bad", "great", "scam", "love", "hate", "today", "week", "new", "high",
+        "low", "support", "resistance", "breakout", "fear", "greed", "long", "short", "profit", "loss",
+    ])
+    text = pd.Series(words[rng.integers(0, len(words), n)], dtype=object)
+    for _ in range(4):
+        text = text + " " + words[rng.integers(0, len(words), n)]
+    return pd.DataFrame({
+        "cleaned_text": text,
+        "upvotes": rng.poisson(20, n),
+        "comments": rng.poisson(8, n),
+        "timestamp": pd.date_range(start, periods=n, freq=freq) + pd.to_timedelta(rng.integers(0, 60, n), unit="s"),
+    })
+
+def make_onchain_rows(n=1000, start="2025-01-01", freq="1h", entities=5, columns=("volumeUSD", "totalValueLockedUSD"), seed=42):
+    """
+    Generate seeded timestamped on-chain rows (e.g. pool day/hour data):
+    `entities` ids per timestamp, each with random-walk value columns.
+    """
+    rng = np.random.default_rng(seed)
+    steps = -(-n // entities)
+    frame = pd.DataFrame({
+        "timestamp": np.repeat(pd.date_range(start, periods=steps, freq=freq).to_numpy(), entities)[:n],
+        "id": np.tile([f"0x{i:040x}" for i in range(entities)], steps)[:n],
+    })
+    for column in columns:
+        frame[column] = 1e6 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    return frame
+
+def make_backtest_results(n=1000, start="2025-01-01", freq="1min", initial_balance=1000.0, seed=42):
+    """Generate seeded alternating BUY/SELL trade rows shaped like backtest_results.csv."""
+    prices = make_price_bars(n, start=start, freq=freq, seed=seed)
+    action = np.where(np.arange(n) % 2 == 0, "BUY", "SELL")
+    price = prices["close"].to_numpy()
+    profit_loss = np.where(action == "SELL", price - np.roll(price, 1), 0.0)
+    return pd.DataFrame({
+        "metric_name": "Trade",
+        "timestamp": prices["timestamp"],
+        "value": price.astype(str),
+        "details": "Trade execution",
+        "action": action,
+        "price": price,
+        "profit_loss": profit_loss,
+        "running_balance": initial_balance + np.cumsum(profit_loss),
+    })
@@ -0,0 +1,63 @@
+import re
+import nltk
+import pandas as pd
+from functools import lru_cache
+from nltk.corpus import stopwords
+from nltk.stem import WordNetLemmatizer
+
+# Download NLTK resources
+nltk.download("stopwords")
+nltk.download("wordnet")
+
+# Patterns are compiled once and applied after lowercasing
+URL_PATTERN = re.compile(r"http\S+|www\S+|https\S+")
+NON_LETTER_PATTERN = re.compile(r"[^a-z\s]+")
+
+STOP_WORDS = frozenset(stopwords.words("english"))
+_lemmatizer = WordNetLemmatizer()
+
+@lru_cache(maxsize=200_000)
+def lemmatize(word):
+    """WordNet lemma of a word, memoized (post vocabularies are small)."""
+    return _lemmatizer.lemmatize(word)
+
+def tokenize(text, lemmatize_words=True):
+    """
+    Split raw text into normalized tokens in a single pass.
+
+    Lowercases, drops URLs and everything but ASCII letters and whitespace,
+    splits on whitespace, removes English stopwords and (optionally)
+    lemmatizes what is left.
+    """
+    text = NON_LETTER_PATTERN.sub("", URL_PATTERN.sub("", text.lower()))
+    if lemmatize_words:
+        return [lemmatize(word) for word in text.split() if word not in STOP_WORDS]
+    return [word for word in text.split() if word not in STOP_WORDS]
+
+def normalize_text(text, lemmatize_words=True):
+    """Normalize one post title into the space-joined tokens the sentiment stage scores."""
+    return " ".join(tokenize(text, lemmatize_words))
+
+def normalize_series(texts: pd.Series, lemmatize_words=True, vectorized=False) -> pd.Series:
+    """
+    Normalize a column of texts.
+
+    With `vectorized`, lowercasing and both regex passes run as pandas .str
+    operations over the whole column and only stopword filtering and
+    lemmatization are done per token. Which is faster depends on the pandas
+    string backend, so benchmark_text.py times both.
+    """
+    texts = texts.astype(str)
+    if not vectorized:
+        return texts.map(lambda text: normalize_text(text, lemmatize_words))
+
+    stripped = (
+        texts.str.lower()
+        .str.replace(URL_PATTERN, "", regex=True)
+        .str.replace(NON_LETTER_PATTERN, "", regex=True)
+    )
+    if lemmatize_words:
+        keep = lambda text: " ".join([lemmatize(word) for word in text.split() if word not in STOP_WORDS])
+    else:
+        keep = lambda text: " ".join([word for word in text.split() if word not in STOP_WORDS])
+    return stripped.map(keep)
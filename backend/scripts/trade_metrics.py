@@ -0,0 +1,156 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Tuple
+from backtest_engine import ACTION_NAMES, BUY, equity_curve
+
+# Crypto trades around the clock: a year is 365 days of bars
+SECONDS_PER_YEAR = 365 * 24 * 3600
+ACTION_CODES = {name: code for code, name in ACTION_NAMES.items()}
+
+
+def action_codes(actions) -> np.ndarray:
+    """
+    Map action names to backtest_engine codes ("TAKE-PROFIT" style names
+    from older result files included); unknown actions become -1.
+    """
+    names = pd.Series(actions, dtype=object).str.upper().str.replace("-", "_", regex=False)
+    return names.map(ACTION_CODES).fillna(-1).to_numpy(dtype=np.int8)
+
+
+def ledger_from_prices(
+    trade_codes: np.ndarray,
+    trade_prices: np.ndarray,
+    initial_balance: float = 1000
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Units and cash after each trade for run_event_loop's trades, which put the
+    whole balance into every entry at no cost (simulate_positions reports
+    these itself). Trades must alternate entry/exit, starting with a BUY.
+
+    Returns:
+        Tuple of (units_held_after_each_trade, cash_after_each_trade)
+    """
+    prices = np.asarray(trade_prices, dtype=float)
+    is_entry = np.asarray(trade_codes) == BUY
+    # Every exit multiplies the balance by exit price / entry price
+    growth = np.ones(len(prices))
+    exits = np.flatnonzero(~is_entry)
+    exits = exits[exits > 0]
+    growth[exits] = prices[exits] / prices[exits - 1]
+    balance = initial_balance * np.cumprod(growth)
+    units = np.where(is_entry, balance / np.where(is_entry, prices, 1.0), 0.0)
+    cash = np.where(is_entry, 0.0, balance)
+    return units, cash
+
+
+def round_trip_pnl(trade_cash: np.ndarray, initial_balance: float = 1000) -> np.ndarray:
+    """
+    Cash P&L of each closed round trip: cash after the exit minus cash after
+    the previous exit (the balance the entry was sized from).
+    """
+    exit_cash = np.asarray(trade_cash, dtype=float)[1::2]
+    return exit_cash - np.concatenate(([initial_balance], exit_cash[:-1]))
+
+
+def periods_per_year(timestamps) -> float:
+    """Bars per year from the median bar spacing (1.0, i.e. per bar, if unknown)."""
+    times = np.asarray(timestamps, dtype="datetime64[ns]").astype(np.int64)
+    if len(times) < 2:
+        return 1.0
+    spacing = np.median(np.diff(times)) / 1e9
+    return SECONDS_PER_YEAR / spacing if spacing > 0 else 1.0
+
+
+def bar_returns(equity: np.ndarray) -> np.ndarray:
+    """Simple returns between consecutive equity values (undefined ones dropped)."""
+    equity = np.asarray(equity, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = equity[1:] / equity[:-1] - 1
+    return returns[np.isfinite(returns)]
+
+
+def sharpe_ratio(returns: np.ndarray, periods: float = 1.0) -> float:
+    """Annualized mean over standard deviation of per-bar returns (risk-free rate 0)."""
+    if len(returns) < 2:
+        return 0.0
+    std = returns.std(ddof=1)
+    return float(returns.mean() / std * np.sqrt(periods)) if std > 0 else 0.0
+
+
+def sortino_ratio(returns: np.ndarray, periods: float = 1.0) -> float:
+    """Like sharpe_ratio, but only penalizing downside deviation."""
+    if len(returns) < 2:
+        return 0.0
+    downside = np.sqrt(np.mean(np.minimum(returns, 0.0) ** 2))
+    return float(returns.mean() / downside * np.sqrt(periods)) if downside > 0 else 0.0
+
+
+def max_drawdown(equity: np.ndarray) -> float:
+    """Largest peak-to-trough decline of an equity curve, as a fraction."""
+    equity = np.asarray(equity, dtype=float)
+    if not len(equity):
+        return 0.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drawdown = 1 - equity / np.fmax.accumulate(equity)
+    return float(np.nanmax(drawdown)) if np.isfinite(drawdown).any() else 0.0
+
+
+def win_rate(pnl: np.ndarray) -> float:
+    """Fraction of round trips that made money."""
+    return float((pnl > 0).mean()) if len(pnl) else 0.0
+
+
+def profit_factor(pnl: np.ndarray) -> float:
+    """Gross profit over gross loss (inf without losing trades, 0 without trades)."""
+    gross_profit = pnl[pnl > 0].sum()
+    gross_loss = -pnl[pnl < 0].sum()
+    if gross_loss > 0:
+        return float(gross_profit / gross_loss)
+    return float("inf") if gross_profit > 0 else 0.0
+
+
+def exposure(trade_idx: np.ndarray, trade_units: np.ndarray, n_bars: int) -> float:
+    """Fraction of bars spent holding a position."""
+    if not n_bars or not len(trade_idx):
+        return 0.0
+    held = np.diff(np.append(trade_idx, n_bars)) * (np.asarray(trade_units) > 0)
+    return float(held.sum() / n_bars)
+
+
+def performance_metrics(
+    close: np.ndarray,
+    trade_idx: np.ndarray,
+    trade_units: np.ndarray,
+    trade_cash: np.ndarray,
+    initial_balance: float = 1000,
+    periods: float = 1.0
+) -> Dict[str, float]:
+    """
+    All trade metrics from one backtest, on its mark-to-market equity curve.
+
+    Args:
+        close: Close of every bar
+        trade_idx, trade_units, trade_cash: simulate_positions output (or
+            trade_idx plus ledger_from_prices for run_event_loop trades)
+        initial_balance: Starting capital
+        periods: Bars per year for annualizing Sharpe/Sortino (see periods_per_year)
+
+    Returns:
+        Dict with final_balance, roi (%), total_trades, win_rate,
+        max_drawdown, profit_factor, sharpe_ratio, sortino_ratio, exposure
+    """
+    equity = equity_curve(close, trade_idx, trade_units, trade_cash, initial_balance)
+    returns = bar_returns(equity)
+    pnl = round_trip_pnl(trade_cash, initial_balance)
+    final_balance = float(trade_cash[-1]) if len(trade_cash) else float(initial_balance)
+    return {
+        "final_balance": final_balance,
+        "roi": (final_balance - initial_balance) / initial_balance * 100,
+        "total_trades": len(trade_idx),
+        "win_rate": win_rate(pnl),
+        "max_drawdown": max_drawdown(equity),
+        "profit_factor": profit_factor(pnl),
+        "sharpe_ratio": sharpe_ratio(returns, periods),
+        "sortino_ratio": sortino_ratio(returns, periods),
+        "exposure": exposure(trade_idx, trade_units, len(close)),
+    }
@@ -0,0 +1,279 @@
+import os
+import json
+import math
+import numpy as np
+import pandas as pd
+from multiprocessing import Pool
+from typing import Dict, List, Optional, Tuple
+from backtest_engine import build_signal_masks, run_event_loop
+from indicators import IndicatorCache, fingerprint
+from parallel_sweep import attach_arrays, release_arrays, share_arrays
+
+# Search space over backtest_trading_strategy's parameters: lists are
+# sampled as choices, (low, high) tuples uniformly (ints stay ints)
+PARAMETER_SPACE = {
+    "stop_loss_pct": (0.01, 0.1),
+    "take_profit_pct": (0.03, 0.2),
+    "moving_avg_window": [10, 20, 30, 50],
+    "min_confidence": (0.5, 0.9),
+}
+PROGRESS_FILE = "data/optimizer_progress.jsonl"
+
+# Per-worker state, filled in by _init_worker
+_worker_arrays: Dict[str, np.ndarray] = {}
+_worker_segments = []
+_worker_cache: Optional[IndicatorCache] = None
+_worker_close_key: Optional[str] = None
+
+
+def sample_configs(space: Dict[str, object], n: int, seed: int = 42) -> List[dict]:
+    """Draw `n` distinct parameter sets from a search space, reproducibly."""
+    rng = np.random.default_rng(seed)
+    configs, seen = [], set()
+    for _ in range(n * 20):
+        if len(configs) == n:
+            break
+        config = {}
+        for name, values in space.items():
+            if isinstance(values, tuple):
+                low, high = values
+                if isinstance(low, int) and isinstance(high, int):
+                    config[name] = int(rng.integers(low, high + 1))
+                else:
+                    config[name] = round(float(rng.uniform(low, high)), 4)
+            else:
+                config[name] = values[int(rng.integers(len(values)))]
+        key = tuple(sorted(config.items()))
+        if key not in seen:
+            seen.add(key)
+            configs.append(config)
+    return configs
+
+
+def make_folds(n_rows: int, n_folds: int = 4) -> List[Tuple[int, int]]:
+    """Split rows into `n_folds` consecutive (start, end) test windows, oldest first."""
+    edges = np.linspace(0, n_rows, n_folds + 1).astype(int)
+    return list(zip(edges[:-1].tolist(), edges[1:].tolist()))
+
+
+def _init_worker(spec, close_key, cache_dir):
+    global _worker_segments, _worker_arrays, _worker_cache, _worker_close_key
+    _worker_segments, _worker_arrays = attach_arrays(spec)
+    _worker_close_key = close_key
+    _worker_cache = IndicatorCache(cache_dir=cache_dir)
+
+
+def _evaluate(task):
+    """Backtest one config on one fold, with the bars before the fold as indicator history."""
+    config_id, fold, (start, end), params, initial_balance = task
+    arrays = _worker_arrays
+    close = arrays["close"]
+    window = params["moving_avg_window"]
+    entry_mask, exit_mask = build_signal_masks(
+        close, arrays["signal"], arrays["confidence"],
+        _worker_cache.get(close, "sma", window, _worker_close_key),
+        _worker_cache.get(close, "rsi", 14, _worker_close_key),
+        _worker_cache.get(close, "upper_band", window, _worker_close_key),
+        min_confidence=params["min_confidence"],
+        warmup=window
+    )
+    balance, trade_idx, _ = run_event_loop(
+        close[start:end], entry_mask[start:end], exit_mask[start:end],
+        initial_balance=initial_balance,
+        stop_loss_pct=params["stop_loss_pct"],
+        take_profit_pct=params["take_profit_pct"]
+    )
+    return {
+        "config_id": config_id,
+        "fold": fold,
+        "roi": (balance - initial_balance) / initial_balance * 100,
+        "trades": len(trade_idx),
+    }
+
+
+class SearchProgress:
+    """
+    Append-only log of finished (config, fold) evaluations.
+
+    The first line holds the search settings; a rerun with the same settings
+    reuses every logged evaluation, other settings start a new log.
+    """
+
+    def __init__(self, path: Optional[str], settings: dict):
+        self.path = path
+        self.results: Dict[Tuple[int, int], dict] = {}
+        settings = json.loads(json.dumps(settings))  # compare as stored (tuples become lists)
+        if not path:
+            return
+        header = None
+        if os.path.exists(path):
+            with open(path) as f:
+                lines = [json.loads(line) for line in f if line.strip()]
+            if lines and lines[0].get("settings") == settings:
+                header = lines[0]
+                self.results = {(r["config_id"], r["fold"]): r for r in lines[1:]}
+        if header is None:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "w") as f:
+                f.write(json.dumps({"settings": settings}) + "\n")
+
+    def record(self, result: dict):
+        self.results[(result["config_id"], result["fold"])] = result
+        if self.path:
+            with open(self.path, "a") as f:
+                f.write(json.dumps(result) + "\n")
+
+
+def run_search(
+    data: pd.DataFrame,
+    space: Dict[str, object] = PARAMETER_SPACE,
+    method: str = "halving",
+    n_configs: int = 81,
+    n_folds: int = 4,
+    eta: int = 3,
+    initial_balance: float = 1000,
+    configs: Optional[List[dict]] = None,
+    seed: int = 42,
+    processes: Optional[int] = None,
+    progress_file: Optional[str] = PROGRESS_FILE,
+    cache_dir: Optional[str] = None
+) -> pd.DataFrame:
+    """
+    Search strategy parameters with walk-forward folds and early pruning.
+
+    The data is split into `n_folds` consecutive folds; a config's score is
+    its mean ROI over the folds it was backtested on (each fold is traded
+    on its own, with earlier bars only feeding the indicators).
+
+    method="random" backtests every sampled config on every fold.
+    method="halving" (successive halving) starts every config on the oldest
+    fold only, keeps the best 1/eta, adds folds for the survivors and
+    repeats until the survivors have seen all folds, so poor configs are
+    pruned after a fraction of the data. Pass `configs` (e.g. a
+    parameter_grid) instead of sampling from `space`.
+
+    Evaluations run in parallel over shared arrays (as in parallel_sweep) and
+    are logged to `progress_file` as they finish, so an interrupted search
+    resumes without redoing them.
+
+    Returns:
+        DataFrame with one row per config: parameters, folds evaluated,
+        mean/min ROI and trades, best first. `.attrs["evaluations"]` counts
+        the backtests run, `.attrs["walk_forward"]` holds the walk-forward
+        out-of-sample results on the folds no pruning saw (see
+        walk_forward_report)
+    """
+    if method not in ("random", "halving"):
+        raise ValueError(f"Unknown search method '{method}'. Expected 'random' or 'halving'.")
+    configs = configs if configs is not None else sample_configs(space, n_configs, seed)
+    folds = make_folds(len(data), n_folds)
+    settings = {
+        "method": method, "configs": configs, "folds": folds, "eta": eta,
+        "initial_balance": initial_balance, "rows": len(data),
+        "close_key": fingerprint(data["close"].to_numpy(dtype=float)),
+    }
+    progress = SearchProgress(progress_file, settings)
+    resumed = len(progress.results)
+
+    if method == "random":
+        rungs = [n_folds]
+    else:
+        rungs = sorted({min(n_folds, eta ** r) for r in range(int(math.log(n_folds, eta)) + 2)})
+
+    segments, spec = share_arrays(data)
+    pool = None
+    try:
+        initargs = (spec, settings["close_key"], cache_dir)
+        if processes == 1:
+            _init_worker(*initargs)
+        else:
+            pool = Pool(processes, initializer=_init_worker, initargs=initargs)
+
+        survivors = list(range(len(configs)))
+        for rung, budget in enumerate(rungs):
+            tasks = [
+                (config_id, fold, folds[fold], configs[config_id], initial_balance)
+                for config_id in survivors
+                for fold in range(budget)
+                if (config_id, fold) not in progress.results
+            ]
+            # Equal windows next to each other so workers reuse indicators
+            tasks.sort(key=lambda task: task[3]["moving_avg_window"])
+            results = pool.imap_unordered(_evaluate, tasks, chunksize=4) if pool else map(_evaluate, tasks)
+            for result in results:
+                progress.record(result)
+
+            scores = {
+                config_id: np.mean([progress.results[(config_id, fold)]["roi"] for fold in range(budget)])
+                for config_id in survivors
+            }
+            print(f"🔎 Rung {rung}: {len(survivors)} configs on {budget}/{n_folds} folds, "
+                  f"best mean ROI {max(scores.values()):.2f}%")
+            if budget < n_folds:
+                keep = max(1, math.ceil(len(survivors) / eta))
+                survivors = sorted(survivors, key=lambda config_id: scores[config_id], reverse=True)[:keep]
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        else:
+            for segment in _worker_segments:
+                segment.close()
+        release_arrays(segments)
+
+    rows = []
+    for config_id, config in enumerate(configs):
+        evaluated = sorted(fold for (cid, fold) in progress.results if cid == config_id)
+        if not evaluated:
+            continue
+        rois = [progress.results[(config_id, fold)]["roi"] for fold in evaluated]
+        rows.append({
+            **config,
+            "config_id": config_id,
+            "folds": len(evaluated),
+            "mean_roi": float(np.mean(rois)),
+            "min_roi": float(np.min(rois)),
+            "trades": int(sum(progress.results[(config_id, fold)]["trades"] for fold in evaluated)),
+        })
+    results_df = pd.DataFrame(rows).sort_values(["folds", "mean_roi"], ascending=False, ignore_index=True)
+    results_df.attrs["evaluations"] = len(progress.results) - resumed
+    # Survivors were chosen on the folds of the last pruning rung, so those
+    # folds are in-sample for every config left in the report
+    pruned_on = max((budget for budget in rungs if budget < n_folds), default=0)
+    results_df.attrs["walk_forward"] = walk_forward_report(progress.results, configs, n_folds, pruned_on=pruned_on)
+    return results_df
+
+
+def walk_forward_report(
+    results: Dict[Tuple[int, int], dict],
+    configs: List[dict],
+    n_folds: int,
+    pruned_on: int = 0
+) -> pd.DataFrame:
+    """
+    Walk-forward validation from fold results: for every fold after the
+    first, pick the config with the best mean ROI on the earlier folds and
+    report its ROI on that fold, which it was not selected on. Only configs
+    evaluated on all folds take part.
+
+    With successive halving those configs are the survivors of pruning on
+    the first `pruned_on` folds, so their ROI there is in-sample too: only
+    folds from `pruned_on` on are reported.
+    """
+    complete = [
+        config_id for config_id in range(len(configs))
+        if all((config_id, fold) in results for fold in range(n_folds))
+    ]
+    rows = []
+    for fold in range(max(1, pruned_on), n_folds):
+        if not complete:
+            break
+        best = max(complete, key=lambda config_id: np.mean([results[(config_id, f)]["roi"] for f in range(fold)]))
+        rows.append({
+            "fold": fold,
+            "config_id": best,
+            **configs[best],
+            "in_sample_roi": float(np.mean([results[(best, f)]["roi"] for f in range(fold)])),
+            "out_of_sample_roi": results[(best, fold)]["roi"],
+        })
+    return pd.DataFrame(rows)
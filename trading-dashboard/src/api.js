@@ -1,11 +1,69 @@
-const API_BASE_URL = "http://localhost:5000/api"; // Flask Backend
-
-export const fetchTradeSignals = async () => {
-  const res = await fetch(`${API_BASE_URL}/trade-signals`);
-  return res.json();
-};
-
-export const fetchBacktestResults = async () => {
-  const res = await fetch(`${API_BASE_URL}/backtest-results`);
-  return res.json();
-};
+const API_BASE_URL = "http://localhost:5000/api"; // Flask Backend
+
+// With no params the full signal list is returned as an array. Passing any of
+// { since, until, cursor, limit, fields } returns { signals, next_cursor, has_more };
+// pass the previous next_cursor to fetch only rows appended since then (it is
+// set even when the page is empty; has_more means the range isn't exhausted).
+// Once the file is rewritten a cursor is stale: the reply is a 409 with
+// { stale_cursor: true }, and the client should refetch without it.
+export const fetchTradeSignals = async (params = {}) => {
+  const query = new URLSearchParams(
+    Object.entries(params).filter(([, value]) => value !== undefined && value !== null)
+  ).toString();
+  const res = await fetch(`${API_BASE_URL}/trade-signals${query ? `?${query}` : ""}`);
+  return res.json();
+};
+
+export const fetchBacktestResults = async () => {
+  const res = await fetch(`${API_BASE_URL}/backtest-results`);
+  return res.json();
+};
+
+// Live updates pushed by /api/stream (server-sent events). All subscribers
+// share one EventSource, opened with the first and closed with the last.
+// handlers: { signals(rows), backtest(results), reset() } - reset means
+// updates were missed (or the signals file was rewritten): refetch.
+// A server with all its streams taken answers 503 and the browser closes
+// the EventSource; it is reopened after STREAM_RETRY_MS, with a reset.
+const STREAM_RETRY_MS = 30000;
+const subscribers = new Set();
+let eventSource = null;
+let retryTimer = null;
+
+const dispatch = (name, payload) => {
+  subscribers.forEach(handlers => handlers[name] && handlers[name](payload));
+};
+
+const openStream = (retried = false) => {
+  const source = new EventSource(`${API_BASE_URL}/stream`);
+  source.addEventListener("signals", event => dispatch("signals", JSON.parse(event.data).signals));
+  source.addEventListener("backtest", event => dispatch("backtest", JSON.parse(event.data)));
+  source.addEventListener("signals_reset", () => dispatch("reset"));
+  source.addEventListener("reset", () => dispatch("reset"));
+  if (retried) source.addEventListener("open", () => dispatch("reset"), { once: true });
+  source.onerror = () => {
+    if (source.readyState !== EventSource.CLOSED || eventSource !== source) return;
+    eventSource = null;
+    retryTimer = setTimeout(() => {
+      retryTimer = null;
+      if (subscribers.size) openStream(true);
+    }, STREAM_RETRY_MS);
+  };
+  eventSource = source;
+};
+
+export const subscribeToUpdates = (handlers) => {
+  subscribers.add(handlers);
+  if (!eventSource && !retryTimer) openStream();
+  return () => {
+    subscribers.delete(handlers);
+    if (!subscribers.size && eventSource) {
+      eventSource.close();
+      eventSource = null;
+    }
+    if (!subscribers.size && retryTimer) {
+      clearTimeout(retryTimer);
+      retryTimer = null;
+    }
+  };
+};
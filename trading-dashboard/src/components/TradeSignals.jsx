@@ -1,25 +1,31 @@
-import { useState, useEffect } from "react";
-import { fetchTradeSignals } from "../api";
-
-const TradeSignals = () => {
-  const [signals, setSignals] = useState([]);
-
-  useEffect(() => {
-    fetchTradeSignals().then(data => setSignals(data));
-  }, []);
-
-  return (
-    <div className="p-4 bg-gray-800 text-white rounded-lg">
-      <h2 className="text-lg font-bold">📊 Trade Signals</h2>
-      <ul>
-        {signals.map((signal, index) => (
-          <li key={index} className="border-b p-2">
-            {signal.timestamp} - <span className="font-bold">{signal.signal}</span>
-          </li>
-        ))}
-      </ul>
-    </div>
-  );
-};
-
-export default TradeSignals;
+import { useState, useEffect } from "react";
+import { fetchTradeSignals, subscribeToUpdates } from "../api";
+
+const TradeSignals = () => {
+  const [signals, setSignals] = useState([]);
+
+  useEffect(() => {
+    const load = () => fetchTradeSignals({ fields: "timestamp,signal" }).then(data => setSignals(data.signals || []));
+    load();
+    // New signals are pushed as they are written instead of polling
+    return subscribeToUpdates({
+      signals: rows => setSignals(current => [...current, ...rows.map(({ timestamp, signal }) => ({ timestamp, signal }))]),
+      reset: load
+    });
+  }, []);
+
+  return (
+    <div className="p-4 bg-gray-800 text-white rounded-lg">
+      <h2 className="text-lg font-bold">📊 Trade Signals</h2>
+      <ul>
+        {signals.map((signal, index) => (
+          <li key={index} className="border-b p-2">
+            {signal.timestamp} - <span className="font-bold">{signal.signal}</span>
+          </li>
+        ))}
+      </ul>
+    </div>
+  );
+};
+
+export default TradeSignals;